@@ -0,0 +1,50 @@
+# backend/apps/core/http.py
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+
+from .renderers import dumps
+
+
+class JsonResponse(HttpResponse):
+    """
+    Drop-in replacement for django.http.JsonResponse that encodes the data
+    with apps.core.renderers.dumps, like the API responses.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
+
+
+async def iterate_in_thread(iterable):
+    """
+    Iterate a sync iterable, e.g. one reading a database cursor, from async
+    code, one item at a time.
+
+    Django buffers a StreamingHttpResponse with sync content entirely before
+    sending it under ASGI, so streamed responses need async content there.
+    Every item is fetched in the request's sync thread, where its database
+    connection lives.
+
+    Args:
+        iterable: The sync iterable.
+
+    Yields:
+        The items of the iterable, in order.
+    """
+    iterator = iter(iterable)
+    done = object()
+    fetch = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (item := await fetch(iterator, done)) is not done:
+            yield item
+    finally:
+        # E.g. when the client disconnects, so the cursor is closed
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close, thread_sensitive=True)()
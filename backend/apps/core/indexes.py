@@ -0,0 +1,76 @@
+# backend/apps/core/indexes.py
+
+from django.contrib.postgres.fields import DateRangeField, DateTimeRangeField
+from django.contrib.postgres.indexes import GistIndex
+from django.db import models
+from django.db.models import F, Func
+from django.db.models.functions import Greatest
+
+RANGE_FIELDS = {
+    "daterange": DateRangeField,
+    "tstzrange": DateTimeRangeField,
+}
+
+
+def span(start, end, range_function):
+    """
+    Return the inclusive range between two columns as a PostgreSQL range
+    expression, for overlap (`__overlap`) queries and RangeIndex.
+
+    The upper bound is clamped to the lower one, because rows with the end
+    before the start would make the range constructor raise an error.
+
+    Args:
+        start: The name of the column with the lower bound.
+        end: The name of the column with the upper bound.
+        range_function: "daterange" or "tstzrange".
+
+    Returns:
+        Func: The range expression.
+    """
+    return Func(
+        F(start),
+        Greatest(F(start), F(end)),
+        function=range_function,
+        # The bounds are inlined rather than a parameter, so queries with
+        # server-side binding still match the indexed expression
+        template="%(function)s(%(expressions)s, '[]')",
+        output_field=RANGE_FIELDS[range_function](),
+    )
+
+
+class RangeIndex(models.Index):
+    """
+    Index for queries on the range between the last two of its fields.
+
+    On PostgreSQL it is a GiST index of the leading fields and the `span()` of
+    the last two, which serves `&&` overlap queries on that expression. The
+    leading fields need the btree_gist extension. Other databases get a btree
+    index of all the fields, which serves comparisons of the bounds.
+    """
+
+    def __init__(self, *, fields, range_function, **kwargs):
+        if len(fields) < 2:
+            raise ValueError("RangeIndex.fields needs the two range bounds.")
+        if range_function not in RANGE_FIELDS:
+            raise ValueError(f"Unknown range function: {range_function}.")
+        self.range_function = range_function
+        super().__init__(fields=fields, **kwargs)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        kwargs["range_function"] = self.range_function
+        return path, args, kwargs
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+        *columns, start, end = self.fields
+        index = GistIndex(
+            *[F(column) for column in columns],
+            span(start, end, self.range_function),
+            name=self.name,
+            condition=self.condition,
+        )
+        return index.create_sql(model, schema_editor, **kwargs)
@@ -0,0 +1,206 @@
+# backend/apps/core/instrumentation.py
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds of the histogram buckets, in milliseconds and queries
+DURATION_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, math.inf)
+
+# Metrics of the request being handled, None outside of instrumented requests
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """The timings and query count of a single request, in seconds."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.timings = {}
+        self.queries = 0
+
+    def add(self, name: str, duration: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + duration
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+
+def current_metrics() -> RequestMetrics | None:
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """Collect the metrics of the code in the block, e.g. a request."""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timer(name: str):
+    """
+    Add the time spent in the block to the current request's `name` timing.
+    Does nothing outside of instrumented requests, e.g. when REQUEST_METRICS
+    is disabled.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(name, time.perf_counter() - start)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper, see connection.execute_wrapper, that counts and
+    times the queries of the current request.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.add("db", time.perf_counter() - start)
+
+
+def install_query_recorder(connection, **kwargs):
+    """
+    Add record_query to the connection's execute wrappers. Connected to
+    `connection_created`, so the connections of the worker threads async
+    views run their queries in are instrumented too.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    """Counts observations in fixed buckets, like a Prometheus histogram."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in, or
+        the largest finite bound for the last bucket.
+        """
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if count and cumulative >= rank:
+                return bound if bound != math.inf else self.buckets[-2]
+        return 0.0
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets.append(["+Inf" if bound == math.inf else bound, cumulative])
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe histograms of the request metrics, by view and metric, and
+    the counters of in-process caches. Every process keeps its own, so each
+    worker reports only its requests.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, view: str, metrics: RequestMetrics, total: float) -> None:
+        """Record a finished request's timings, in milliseconds."""
+        values = {
+            "total": (total * 1000, DURATION_BUCKETS),
+            "queries": (metrics.queries, COUNT_BUCKETS),
+        }
+        for name, duration in metrics.timings.items():
+            values[name] = (duration * 1000, DURATION_BUCKETS)
+
+        with self._lock:
+            histograms = self._histograms.setdefault(view, {})
+            for name, (value, buckets) in values.items():
+                if name not in histograms:
+                    histograms[name] = Histogram(buckets)
+                histograms[name].observe(value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                view: {name: h.snapshot() for name, h in sorted(histograms.items())}
+                for view, histograms in sorted(self._histograms.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def register_stats(self, name: str, stats) -> None:
+        """
+        Report the counters returned by `stats()`, e.g. the hits and misses
+        of a cache, under `name`. Registered from AppConfig.ready, so they
+        outlive reset().
+        """
+        with self._lock:
+            self._stats[name] = stats
+
+    def stats_snapshot(self) -> dict:
+        with self._lock:
+            stats = sorted(self._stats.items())
+        return {name: get_stats() for name, get_stats in stats}
+
+
+registry = MetricsRegistry()
+
+
+def server_timing(metrics: RequestMetrics, total: float) -> str:
+    """Format the request's timings as a Server-Timing header value."""
+    queries = "1 query" if metrics.queries == 1 else f"{metrics.queries} queries"
+    entries = [
+        f"total;dur={total * 1000:.1f}",
+        f'db;dur={metrics.timings.get("db", 0.0) * 1000:.1f};desc="{queries}"',
+    ]
+    entries += [
+        f"{name};dur={duration * 1000:.1f}"
+        for name, duration in metrics.timings.items()
+        if name != "db"
+    ]
+    return ", ".join(entries)
@@ -0,0 +1,58 @@
+# backend/apps/core/management/commands/purge_sessions.py
+
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions from the database in bounded batches. "
+        "Meant to be run periodically, e.g. from a scheduled machine."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Maximum number of sessions deleted per statement.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches to spread out the writes.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        model = self._get_session_model()
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+
+        deleted = 0
+        while True:
+            pks = list(expired.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            deleted += model.objects.filter(pk__in=pks).delete()[0]
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(f"Deleted {deleted} expired session(s).")
+
+    @staticmethod
+    def _get_session_model():
+        """
+        Return the model of the configured database-backed session engine.
+        Pure cache sessions expire on their own, so only rows left over from a
+        database-backed engine are purged in that case.
+        """
+        engine = import_module(settings.SESSION_ENGINE)
+        if hasattr(engine.SessionStore, "get_model_class"):
+            return engine.SessionStore.get_model_class()
+        return Session
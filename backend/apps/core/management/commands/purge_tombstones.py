@@ -0,0 +1,84 @@
+# backend/apps/core/management/commands/purge_tombstones.py
+
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.models import BaseModel
+
+
+class Command(BaseCommand):
+    help = (
+        "Hard delete rows that were soft deleted more than --older-than days "
+        "ago, with the rows that cascade from them, in bounded batches. "
+        "Meant to be run periodically, e.g. from a scheduled machine."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            metavar="app_label.Model",
+            help="Models to purge. Defaults to all soft-deletable models.",
+        )
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=30,
+            help="Minimum number of days since a row was soft deleted.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Maximum number of tombstones deleted per statement.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches to spread out the writes.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        before = timezone.now() - timedelta(days=options["older_than"])
+
+        deleted = {}
+        for model in self._get_models(options["models"]):
+            tombstones = model.all_objects.tombstones(before)
+            while True:
+                pks = list(tombstones.values_list("pk", flat=True)[:batch_size])
+                if not pks:
+                    break
+                _, counts = model.all_objects.filter(pk__in=pks).erase()
+                for label, count in counts.items():
+                    deleted[label] = deleted.get(label, 0) + count
+                if options["pause"]:
+                    time.sleep(options["pause"])
+
+        for label, count in sorted(deleted.items()):
+            self.stdout.write(f"Deleted {count} {label} row(s).")
+        self.stdout.write(f"Deleted {sum(deleted.values())} row(s) in total.")
+
+    @staticmethod
+    def _get_models(labels):
+        """Return the models to purge, all BaseModel subclasses by default."""
+        if not labels:
+            return [
+                model for model in apps.get_models() if issubclass(model, BaseModel)
+            ]
+
+        models = []
+        for label in labels:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError):
+                raise CommandError(f"Unknown model: {label}.")
+            if not issubclass(model, BaseModel):
+                raise CommandError(f"{label} is not soft-deletable.")
+            models.append(model)
+        return models
@@ -0,0 +1,94 @@
+# backend/apps/core/middleware.py
+
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .instrumentation import (
+    collect,
+    install_query_recorder,
+    registry,
+    server_timing,
+)
+
+logger = logging.getLogger("apps.core.instrumentation")
+
+
+def view_name(request) -> str:
+    """
+    Name the view that handled the request, e.g. `TripViewSet.list` for
+    viewset actions, `AsyncTripView.get` for class-based views and
+    `login_view` for functions.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+
+    func = match.func
+    method = request.method.lower()
+    view_class = getattr(func, "cls", None) or getattr(func, "view_class", None)
+    if view_class is not None:
+        actions = getattr(func, "actions", None) or {}
+        return f"{view_class.__name__}.{actions.get(method, method)}"
+    if func.__name__ == "<lambda>":
+        return match.url_name or match.view_name
+    return func.__name__
+
+
+class RequestMetricsMiddleware:
+    """
+    Records the wall time, database query count and time, and the timings
+    collected with `instrumentation.timer`, e.g. token verification and
+    serialization, of every request.
+
+    The timings are returned in a Server-Timing header and aggregated per view
+    in `instrumentation.registry`. The middleware removes itself when
+    REQUEST_METRICS is disabled, so it costs nothing then. Add it first, so
+    the other middleware is measured too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+        connection_created.connect(
+            install_query_recorder, dispatch_uid="request_metrics"
+        )
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        with collect() as metrics:
+            response = self.get_response(request)
+            return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        with collect() as metrics:
+            response = await self.get_response(request)
+            return self.finish(request, response, metrics)
+
+    @staticmethod
+    def finish(request, response, metrics):
+        total = metrics.elapsed()
+        name = view_name(request)
+        registry.record(name, metrics, total)
+
+        header = server_timing(metrics, total)
+        response["Server-Timing"] = header
+        logger.debug("%s %s %s: %s", request.method, request.path, name, header)
+        return response
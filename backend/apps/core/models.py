@@ -1,9 +1,184 @@
-from django.db import models  # noqa: F401
+from datetime import datetime, timedelta
+
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 
+from .signals import bulk_changed
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    QuerySet of BaseModel rows with bulk counterparts of the instance methods.
+
+    `soft_delete()`, `restore()` and `erase()` run one UPDATE or DELETE per
+    table instead of one save() or delete() per row. They cascade to the rows
+    of BaseModel subclasses that reference these rows with a CASCADE foreign
+    key, e.g. from trips to their flights, and send `bulk_changed` instead of
+    the per-row signals.
+    """
+
+    def soft_delete(self) -> int:
+        """
+        Soft delete the rows that aren't deleted yet, and their related rows.
+
+        Returns:
+            int: The number of rows deleted, not counting related rows.
+        """
+        with transaction.atomic(using=self.db):
+            return self.filter(is_deleted=False)._soft_delete(timezone.now())
+
+    def restore(self) -> int:
+        """
+        Restore the deleted rows, and the related rows that were soft deleted
+        together with them.
+
+        Returns:
+            int: The number of rows restored, not counting related rows.
+        """
+        with transaction.atomic(using=self.db):
+            return self.filter(is_deleted=True)._restore(timezone.now())
+
+    def erase(self) -> tuple[int, dict]:
+        """
+        Hard delete the rows and cascade to their related rows with one DELETE
+        per table, without loading them. Falls back to QuerySet.delete() when
+        the model has relations that need more than a cascade.
+
+        Returns:
+            tuple: The number of rows deleted and a dict with the number of
+                rows deleted per model, like QuerySet.delete().
+        """
+        if not _can_raw_delete(self.model):
+            return super().delete()
+
+        with transaction.atomic(using=self.db):
+            counts = self._erase()
+        return sum(counts.values()), counts
+
+    def purge(self, older_than: timedelta | datetime = timedelta(0)) -> tuple:
+        """
+        Erase the rows soft deleted before a time or longer than a duration
+        ago, see `erase()`.
+        """
+        if isinstance(older_than, timedelta):
+            older_than = timezone.now() - older_than
+        return self.tombstones(older_than).erase()
+
+    def tombstones(self, before: datetime):
+        """Return the rows soft deleted before the given time."""
+        return self.filter(is_deleted=True, deleted_at__lt=before)
+
+    def _changed_rows(self) -> dict:
+        """
+        Return the `bulk_changed` arguments for the rows: their primary keys,
+        the ids of their owners, and for every foreign key to another
+        BaseModel, e.g. a flight's trip, the set of referenced ids by name.
+        """
+        parents = _parent_fields(self.model)
+        rows = list(
+            self.values_list("pk", "created_by_id", *(f.attname for f in parents))
+        )
+        return {
+            "pks": [row[0] for row in rows],
+            "created_by_ids": {row[1] for row in rows},
+            "parent_ids": {
+                field.name: {row[i] for row in rows} - {None}
+                for i, field in enumerate(parents, start=2)
+            },
+        }
 
-class ActiveManager(models.Manager):
+    def _soft_delete(self, now) -> int:
+        changed = self._changed_rows()
+        self._soft_delete_related(now)
+        count = self.update(is_deleted=True, deleted_at=now, updated_at=now)
+        if count:
+            bulk_changed.send(sender=self.model, action="soft_delete", **changed)
+        return count
+
+    def _restore(self, now) -> int:
+        changed = self._changed_rows()
+        self._restore_related(now)
+        count = self.update(is_deleted=False, deleted_at=None, updated_at=now)
+        if count:
+            bulk_changed.send(sender=self.model, action="restore", **changed)
+        return count
+
+    def _soft_delete_related(self, now) -> None:
+        for field, related_model in _cascade_relations(self.model):
+            related_model.all_objects.filter(
+                **{f"{field.name}__in": self.values("pk"), "is_deleted": False}
+            )._soft_delete(now)
+
+    def _restore_related(self, now) -> None:
+        for field, related_model in _cascade_relations(self.model):
+            # Only rows deleted together with their parent, not before it
+            related_model.all_objects.filter(
+                **{
+                    f"{field.name}__in": self.values("pk"),
+                    "is_deleted": True,
+                    "deleted_at": models.F(f"{field.name}__deleted_at"),
+                }
+            )._restore(now)
+
+    def _erase(self) -> dict:
+        changed = self._changed_rows()
+        counts = {}
+        for field, related_model in _cascade_relations(self.model):
+            related = related_model.all_objects.filter(
+                **{f"{field.name}__in": self.values("pk")}
+            )
+            for label, count in related._erase().items():
+                counts[label] = counts.get(label, 0) + count
+
+        count = self._raw_delete(self.db)
+        counts[self.model._meta.label] = counts.get(self.model._meta.label, 0) + count
+        if count:
+            bulk_changed.send(sender=self.model, action="erase", **changed)
+        return counts
+
+
+def _cascade_relations(model):
+    """
+    Return (foreign key, model) pairs of the BaseModel subclasses that
+    reference the model with on_delete=CASCADE.
+    """
+    return [
+        (relation.field, relation.related_model)
+        for relation in model._meta.related_objects
+        if relation.one_to_many
+        and relation.on_delete is models.CASCADE
+        and issubclass(relation.related_model, BaseModel)
+    ]
+
+
+def _parent_fields(model):
+    """Return the foreign keys of the model to other BaseModel subclasses."""
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if field.many_to_one and issubclass(field.related_model, BaseModel)
+    ]
+
+
+def _can_raw_delete(model) -> bool:
+    """
+    Return True if deleting the model's rows only has to cascade to BaseModel
+    rows, which `_erase` does itself, and no other relations need handling.
+    """
+    if model._meta.many_to_many:
+        return False
+    for relation in model._meta.related_objects:
+        if relation.related_model is model:
+            return False
+        if (relation.field, relation.related_model) not in _cascade_relations(model):
+            return False
+        if not _can_raw_delete(relation.related_model):
+            return False
+    return True
+
+
+class ActiveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(is_deleted=False)
 
@@ -31,7 +206,7 @@ class BaseModel(models.Model):
     )
 
     objects = ActiveManager()
-    all_objects = models.Manager()
+    all_objects = SoftDeleteQuerySet.as_manager()
     active = ActiveManager()
 
     class Meta:
@@ -42,15 +217,24 @@ class BaseModel(models.Model):
             return
         self.is_deleted = True
         self.deleted_at = timezone.now()
-        self.save()
+        with transaction.atomic(using=self._state.db):
+            self.save()
+            # Related rows share the deletion time, so restore() finds them
+            self._related_rows()._soft_delete_related(self.deleted_at)
 
     def erase(self, *args, **kwargs):
-        super().delete(*args, **kwargs)
+        return self._related_rows().erase()
 
     def restore(self):
-        self.is_deleted = False
-        self.deleted_at = None
-        self.save()
+        with transaction.atomic(using=self._state.db):
+            self._related_rows()._restore_related(timezone.now())
+            self.is_deleted = False
+            self.deleted_at = None
+            self.save()
+
+    def _related_rows(self) -> SoftDeleteQuerySet:
+        """Return a queryset of this row, to cascade with its bulk methods."""
+        return type(self).all_objects.filter(pk=self.pk)
 
 
 class SampleBaseModel(BaseModel):
@@ -0,0 +1,24 @@
+# backend/apps/core/parsers.py
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import orjson, use_orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser that decodes with orjson. Falls back to JSONParser when orjson
+    is not installed, FAST_JSON is disabled, or the body is not UTF-8.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8")
+        if not use_orjson() or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,152 @@
+# backend/apps/core/renderers.py
+
+import csv
+import io
+import json
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .instrumentation import timer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Types orjson can't serialize natively, e.g. Decimal, lazy translation
+# strings and timedeltas, are converted the same way DRF's encoder does
+_default = JSONEncoder().default
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z) if orjson else 0
+
+
+def use_orjson() -> bool:
+    """Return True if JSON should be encoded and decoded with orjson."""
+    return orjson is not None and settings.FAST_JSON
+
+
+def dumps(data) -> bytes:
+    """
+    Encode data as compact, UTF-8 encoded JSON.
+
+    Dates and datetimes are encoded in ISO 8601 with `Z` for UTC, and
+    Decimals as numbers, like DRF's JSONRenderer does.
+
+    Args:
+        data: The data to encode.
+
+    Returns:
+        bytes: The encoded JSON.
+    """
+    if use_orjson():
+        return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson, which serializes dates, datetimes
+    and UUIDs natively in C. Falls back to JSONRenderer when orjson is not
+    installed, FAST_JSON is disabled, or indented output was requested,
+    e.g. by the browsable API.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timer("serialize"):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (
+            not use_orjson()
+            or indent is not None
+            or not api_settings.UNICODE_JSON
+            or not api_settings.COMPACT_JSON
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        # Escape the line and paragraph separators like JSONRenderer does,
+        # so the output is also valid JavaScript
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renders a list as newline delimited JSON, one item per line. `stream`
+    renders chunks of items lazily, for StreamingHttpResponse.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return b"".join(self.stream([data if isinstance(data, list) else [data]]))
+
+    @staticmethod
+    def stream(chunks):
+        """
+        Args:
+            chunks: An iterable of lists of items.
+
+        Yields:
+            bytes: The lines of each chunk.
+        """
+        for chunk in chunks:
+            yield b"".join(dumps(item) + b"\n" for item in chunk)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renders a list of flat dicts as CSV with a header row. `stream` renders
+    chunks of rows lazily, for StreamingHttpResponse.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+        return b"".join(self.stream([rows], fieldnames))
+
+    @staticmethod
+    def stream(chunks, fieldnames):
+        """
+        Args:
+            chunks: An iterable of lists of dicts.
+            fieldnames: The columns, in order.
+
+        Yields:
+            bytes: The header, then the rows of each chunk.
+        """
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames, extrasaction="ignore")
+
+        def flush():
+            value = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            return value
+
+        writer.writeheader()
+        yield flush()
+        for chunk in chunks:
+            writer.writerows(chunk)
+            yield flush()
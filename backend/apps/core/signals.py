@@ -0,0 +1,11 @@
+# backend/apps/core/signals.py
+
+from django.dispatch import Signal
+
+# Sent by SoftDeleteQuerySet after a bulk soft_delete(), restore() or erase(),
+# which don't send post_save or post_delete for every row. Receivers get the
+# model as `sender`, the `action` ("soft_delete", "restore" or "erase"), the
+# `pks` and the set of `created_by_ids` of the changed rows, and `parent_ids`,
+# the ids the rows referenced by foreign key name, e.g. {"trip": {1, 2}}.
+# All of them are read before the change, so they are known after an erase.
+bulk_changed = Signal()
@@ -1,8 +1,29 @@
 import pytest
+from asgiref.sync import async_to_sync
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
 from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+import json
 import time
+from unittest.mock import patch
 
+import orjson
+
+from .http import JsonResponse
+from .instrumentation import Histogram, collect, registry, timer
+from .middleware import RequestMetricsMiddleware
 from .models import SampleBaseModel
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
 
 User = get_user_model()
 
@@ -135,3 +156,276 @@ class TestActiveManager:
 
         # Ensure the object is included in the default manager again
         assert SampleBaseModel.objects.filter(id=test_model.id).exists()
+
+
+class TestPurgeSessionsCommand:
+
+    @pytest.mark.django_db
+    def test_deletes_only_expired_sessions(self):
+        """Test that expired sessions are purged in batches"""
+        for _ in range(5):
+            session = SessionStore()
+            session.create()
+        Session.objects.update(expire_date=timezone.now() - timedelta(days=1))
+        active_session = SessionStore()
+        active_session.create()
+
+        out = StringIO()
+        call_command("purge_sessions", batch_size=2, stdout=out)
+
+        assert "Deleted 5 expired session(s)." in out.getvalue()
+        assert list(Session.objects.values_list("session_key", flat=True)) == [
+            active_session.session_key
+        ]
+
+
+class TestSoftDeleteQuerySet:
+
+    @pytest.mark.django_db
+    def test_bulk_soft_delete_and_restore(self, user, django_assert_num_queries):
+        """Test that rows are soft deleted and restored with one UPDATE"""
+        SampleBaseModel.objects.bulk_create(
+            SampleBaseModel(name=f"Instance {i}", created_by=user) for i in range(3)
+        )
+
+        # Owner lookup and UPDATE, inside a savepoint in the test transaction
+        with django_assert_num_queries(4):
+            assert SampleBaseModel.objects.all().soft_delete() == 3
+        assert not SampleBaseModel.objects.exists()
+        assert SampleBaseModel.all_objects.filter(deleted_at__isnull=False).count() == 3
+        assert SampleBaseModel.all_objects.all().soft_delete() == 0
+
+        with django_assert_num_queries(4):
+            assert SampleBaseModel.all_objects.all().restore() == 3
+        assert SampleBaseModel.objects.count() == 3
+
+    @pytest.mark.django_db
+    def test_purge_only_old_tombstones(self, user):
+        """Test that purge erases rows deleted before the cutoff only"""
+        old, recent, active = SampleBaseModel.objects.bulk_create(
+            SampleBaseModel(name=name, created_by=user)
+            for name in ("old", "recent", "active")
+        )
+        SampleBaseModel.all_objects.filter(pk__in=[old.pk, recent.pk]).soft_delete()
+        SampleBaseModel.all_objects.filter(pk=old.pk).update(
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+
+        total, counts = SampleBaseModel.all_objects.purge(older_than=timedelta(30))
+
+        assert total == 1
+        assert counts == {"core.SampleBaseModel": 1}
+        assert set(SampleBaseModel.all_objects.values_list("name", flat=True)) == {
+            "recent",
+            "active",
+        }
+
+
+class TestPurgeTombstonesCommand:
+
+    @pytest.mark.django_db
+    def test_purges_old_tombstones_in_batches(self, user):
+        """Test that old tombstones are purged in batches"""
+        SampleBaseModel.objects.bulk_create(
+            SampleBaseModel(name=f"Instance {i}", created_by=user) for i in range(6)
+        )
+        SampleBaseModel.objects.filter(name__in=["Instance 0", "Instance 1"]).update(
+            is_deleted=True, deleted_at=timezone.now()
+        )
+        SampleBaseModel.objects.exclude(name="Instance 5").update(
+            is_deleted=True, deleted_at=timezone.now() - timedelta(days=40)
+        )
+
+        out = StringIO()
+        call_command(
+            "purge_tombstones", "core.SampleBaseModel", batch_size=2, stdout=out
+        )
+
+        assert "Deleted 3 core.SampleBaseModel row(s)." in out.getvalue()
+        assert SampleBaseModel.all_objects.count() == 3
+
+    def test_rejects_models_without_soft_delete(self):
+        """Test that only soft-deletable models can be purged"""
+        with pytest.raises(CommandError):
+            call_command("purge_tombstones", "users.User", stdout=StringIO())
+
+
+class TestFastJSON:
+    DATA = {
+        "id": 1,
+        "name": "Trip to Zürich \u2028",
+        "description": None,
+        "start_date": "2023-01-01",
+        "flights": [{"id": 2, "departure_time": "2023-01-01T08:00:00Z"}],
+        "ratio": 0.5,
+        "is_deleted": False,
+        # Bulk validation errors are keyed by item position
+        "errors": {1: ["Invalid."]},
+    }
+
+    def test_renders_like_json_renderer(self):
+        """Test that the fast renderer's output matches JSONRenderer."""
+        assert FastJSONRenderer().render(self.DATA) == JSONRenderer().render(self.DATA)
+
+    def test_renders_dates_and_decimals_natively(self):
+        """Test that dates, UTC datetimes and Decimals keep DRF's formats."""
+        data = {
+            "date": date(2023, 1, 1),
+            "datetime": datetime(2023, 1, 1, 8, 0, tzinfo=dt_timezone.utc),
+            "price": Decimal("12.50"),
+        }
+
+        assert json.loads(FastJSONRenderer().render(data)) == {
+            "date": "2023-01-01",
+            "datetime": "2023-01-01T08:00:00Z",
+            "price": 12.5,
+        }
+
+    @pytest.mark.parametrize("fast_json", [True, False])
+    def test_setting_selects_encoder(self, settings, fast_json):
+        """Test that disabling FAST_JSON falls back to the stdlib encoder."""
+        settings.FAST_JSON = fast_json
+
+        with patch("apps.core.renderers.orjson.dumps", wraps=orjson.dumps) as dumps:
+            FastJSONRenderer().render(self.DATA)
+
+        assert dumps.called is fast_json
+
+    def test_indented_output_falls_back(self):
+        """Test that indented output, e.g. for the browsable API, still works."""
+        ret = FastJSONRenderer().render(self.DATA, "application/json; indent=4", {})
+
+        assert ret == JSONRenderer().render(self.DATA, "application/json; indent=4", {})
+
+    def test_parser_parses_json(self):
+        """Test that the fast parser decodes request bodies."""
+        stream = BytesIO(json.dumps(self.DATA["flights"]).encode("utf-8"))
+
+        assert FastJSONParser().parse(stream) == self.DATA["flights"]
+
+    def test_parser_rejects_invalid_json(self):
+        """Test that malformed bodies raise a ParseError."""
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(BytesIO(b"{invalid"))
+
+    def test_json_response(self):
+        """Test that JsonResponse encodes dicts and rejects other values."""
+        response = JsonResponse({"message": "Hello, world!"})
+
+        assert response["Content-Type"] == "application/json"
+        assert json.loads(response.content) == {"message": "Hello, world!"}
+        with pytest.raises(TypeError):
+            JsonResponse(["not", "a", "dict"])
+
+
+@pytest.fixture
+def request_metrics(settings):
+    settings.REQUEST_METRICS = True
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+class TestRequestMetrics:
+
+    def test_middleware_is_not_used_when_disabled(self, settings):
+        """Test that the middleware removes itself when disabled."""
+        settings.REQUEST_METRICS = False
+        with pytest.raises(MiddlewareNotUsed):
+            RequestMetricsMiddleware(lambda request: HttpResponse())
+
+    @pytest.mark.django_db
+    def test_no_server_timing_when_disabled(self, client, settings):
+        """Test that responses have no Server-Timing header when disabled."""
+        settings.REQUEST_METRICS = False
+        response = client.get("/health_check/")
+        assert "Server-Timing" not in response
+
+    def test_timer_outside_of_requests(self):
+        """Test that timers do nothing outside of instrumented requests."""
+        with timer("serialize"):
+            pass
+
+        with collect() as metrics:
+            with timer("serialize"):
+                pass
+            with timer("serialize"):
+                pass
+        assert list(metrics.timings) == ["serialize"]
+
+    @pytest.mark.django_db
+    def test_records_viewset_actions(self, client, user, request_metrics):
+        """Test that query counts and timings are recorded per action."""
+        client.force_login(user)
+
+        response = client.get("/trips/")
+
+        assert response.status_code == 200
+        header = response["Server-Timing"]
+        assert header.startswith("total;dur=")
+        assert "db;dur=" in header and " queries" in header
+        assert "serialize;dur=" in header
+
+        metrics = request_metrics.snapshot()["TripViewSet.list"]
+        assert metrics["total"]["count"] == 1
+        assert metrics["queries"]["sum"] > 0
+        assert metrics["serialize"]["count"] == 1
+
+    @pytest.mark.django_db
+    def test_records_token_verification(self, client, request_metrics):
+        """Test that Firebase token verification is timed."""
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify:
+            mock_verify.return_value = {"uid": "firebase123"}
+            response = client.get(
+                "/trips/", headers={"Authorization": "Bearer valid_token"}
+            )
+
+        assert response.status_code == 200
+        assert "auth;dur=" in response["Server-Timing"]
+        assert "auth" in request_metrics.snapshot()["TripViewSet.list"]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_records_async_views(self, async_client, request_metrics):
+        """Test that the queries of async views are counted too."""
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify:
+            mock_verify.return_value = {"uid": "firebase123"}
+            response = async_to_sync(async_client.get)(
+                "/async/trips/", headers={"Authorization": "Bearer valid_token"}
+            )
+
+        assert response.status_code == 200
+        metrics = request_metrics.snapshot()["AsyncTripView.get"]
+        assert metrics["queries"]["sum"] > 0
+        assert "auth" in metrics
+
+    @pytest.mark.django_db
+    def test_metrics_endpoint(self, client, settings, request_metrics):
+        """Test that the histograms are served to allowed addresses only."""
+        client.get("/health_check/")
+
+        response = client.get("/metrics/")
+        assert response.status_code == 200
+        views = response.json()["views"]
+        assert views["health_check"]["total"]["count"] == 1
+        assert views["health_check"]["queries"]["buckets"][0] == [0, 1]
+        caches = response.json()["caches"]
+        assert {"hits", "misses", "hit_rate"} <= set(caches["trip_responses"])
+        assert {"hits", "misses", "hit_rate"} <= set(caches["firebase_tokens"])
+
+        assert client.get("/metrics/", REMOTE_ADDR="10.0.0.1").status_code == 404
+
+        settings.REQUEST_METRICS = False
+        assert client.get("/metrics/").status_code == 404
+
+    def test_histogram(self):
+        """Test bucket counts and quantile estimates."""
+        histogram = Histogram((1, 10, 100, float("inf")))
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 5
+        assert snapshot["sum"] == 560.5
+        assert snapshot["buckets"] == [[1, 1], [10, 3], [100, 4], ["+Inf", 5]]
+        assert snapshot["p50"] == 10
+        assert snapshot["p99"] == 100
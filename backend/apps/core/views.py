@@ -1,8 +1,14 @@
+import os
+
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import render  # noqa: F401
-from django.http import JsonResponse
 from django.views.decorators.http import require_POST, require_safe
 from django.middleware.csrf import get_token
 
+from .http import JsonResponse
+from .instrumentation import registry
+
 
 @require_safe
 def get_csrf_token(request):
@@ -12,3 +18,25 @@ def get_csrf_token(request):
 @require_POST
 def test_post(request):
     return JsonResponse({"message": "Hello, world!"})
+
+
+@require_safe
+def request_metrics(request):
+    """
+    Return this process's request metrics histograms by view, see
+    RequestMetricsMiddleware, and the counters of its caches. Only served
+    when REQUEST_METRICS is enabled and to the addresses in
+    REQUEST_METRICS_ALLOWED_IPS.
+    """
+    if (
+        not settings.REQUEST_METRICS
+        or request.META.get("REMOTE_ADDR") not in settings.REQUEST_METRICS_ALLOWED_IPS
+    ):
+        raise Http404
+    return JsonResponse(
+        {
+            "pid": os.getpid(),
+            "views": registry.snapshot(),
+            "caches": registry.stats_snapshot(),
+        }
+    )
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TripsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.trips"
+
+    def ready(self):
+        from apps.core.instrumentation import registry
+
+        from . import signals  # noqa: F401
+        from .cache import response_cache
+
+        registry.register_stats("trip_responses", response_cache.stats)
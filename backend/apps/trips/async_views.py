@@ -0,0 +1,114 @@
+# backend/apps/trips/async_views.py
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from apps.users.authentication import FirebaseAuthentication
+from .views import TripViewSet, FlightViewSet
+
+
+class AsyncOwnerView(View):
+    """
+    Read-only, ASGI-native counterpart of an OwnerViewSet.
+
+    Authentication, the database access and the response are handled without
+    tying up a worker thread, while the queryset, pagination and serializer are
+    taken from the wrapped viewset so both stacks return the same payloads.
+    """
+
+    viewset_class = None
+    http_method_names = ["get", "options"]
+
+    async def get(self, request, pk=None):
+        try:
+            user = await self.authenticate(request)
+        except exceptions.AuthenticationFailed as e:
+            return self.render({"detail": e.detail}, e.status_code)
+
+        if user is None:
+            return self.render(
+                {"detail": "Authentication credentials were not provided."},
+                status.HTTP_403_FORBIDDEN,
+            )
+
+        viewset = self.get_viewset(request, user, pk)
+        try:
+            queryset = viewset.get_queryset()
+
+            if pk is not None:
+                try:
+                    obj = await queryset.aget(pk=pk)
+                except (queryset.model.DoesNotExist, ValueError):
+                    raise Http404
+                return self.render(viewset.get_serializer(obj).data)
+
+            # DRF pagination and the list serializer query the database
+            # synchronously, so run them in a worker thread the same way
+            # Django's async ORM methods do.
+            data = await sync_to_async(self.get_page_data)(viewset, queryset)
+        except exceptions.APIException as e:
+            # e.g. an invalid filter or cursor, answered like DRF's handler
+            detail = e.detail
+            if not isinstance(detail, (list, dict)):
+                detail = {"detail": detail}
+            return self.render(detail, e.status_code)
+        return self.render(viewset.paginator.get_paginated_response(data).data)
+
+    @staticmethod
+    def get_page_data(viewset, queryset):
+        """Paginate the queryset and serialize the page."""
+        page = viewset.paginate_queryset(queryset)
+        return viewset.get_serializer(page, many=True).data
+
+    @staticmethod
+    async def authenticate(request):
+        """
+        Authenticate the request with a Firebase Bearer token, falling back
+        to the session user.
+
+        Returns:
+            The authenticated user or None.
+        """
+        result = await FirebaseAuthentication().aauthenticate(request)
+        if result is not None:
+            return result[0]
+
+        auser = getattr(request, "auser", None)
+        if auser is None:
+            return None
+        user = await auser()
+        return user if user.is_authenticated else None
+
+    def get_viewset(self, request, user, pk):
+        """Instantiate the wrapped viewset for the current request and user."""
+        drf_request = Request(request)
+        drf_request.user = user
+        return self.viewset_class(
+            request=drf_request,
+            args=(),
+            kwargs={"pk": pk} if pk is not None else {},
+            format_kwarg=None,
+            action="retrieve" if pk is not None else "list",
+        )
+
+    @staticmethod
+    def render(data, status_code=status.HTTP_200_OK):
+        # The first default renderer is the JSON one, see REST_FRAMEWORK
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        return HttpResponse(
+            renderer.render(data),
+            content_type="application/json",
+            status=status_code,
+        )
+
+
+class AsyncTripView(AsyncOwnerView):
+    viewset_class = TripViewSet
+
+
+class AsyncFlightView(AsyncOwnerView):
+    viewset_class = FlightViewSet
@@ -0,0 +1,160 @@
+# backend/apps/trips/cache.py
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+
+class ResponseCache:
+    """
+    Per-user cache of serialized API responses, backed by Django's cache.
+
+    Every user has a version key that is part of all their entry keys, so
+    bumping it on writes invalidates all of the user's responses at once.
+    Entries also store the ETag they were serialized for, and are only served
+    while it still matches, so a missed invalidation, e.g. from another worker
+    with a process-local cache, can never serve stale data.
+    """
+
+    def __init__(self, timeout: int = 300, prefix: str = "trips:responses"):
+        self.timeout = timeout
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _version_key(self, user_id) -> str:
+        return f"{self.prefix}:version:{user_id}"
+
+    def _key(self, user_id, name: str) -> str:
+        version = cache.get(self._version_key(user_id))
+        if version is None:
+            version = time.time_ns()
+            cache.add(self._version_key(user_id), version, None)
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+        return f"{self.prefix}:{user_id}:{version}:{digest}"
+
+    def get(self, user_id, name: str, etag: str):
+        """
+        Return the cached response data for the given request.
+
+        Args:
+            user_id: The id of the user the response belongs to.
+            name: Identifies the request, e.g. its absolute URI.
+            etag: The current ETag of the response.
+
+        Returns:
+            The cached response data, or None if it is not cached or stale.
+        """
+        if self.timeout <= 0:
+            return None
+
+        entry = cache.get(self._key(user_id, name))
+        hit = entry is not None and entry["etag"] == etag
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry["data"] if hit else None
+
+    def set(self, user_id, name: str, etag: str, data) -> None:
+        """
+        Cache the response data of the given request.
+
+        Args:
+            user_id: The id of the user the response belongs to.
+            name: Identifies the request, e.g. its absolute URI.
+            etag: The ETag the data was serialized for.
+            data: The serialized response data.
+        """
+        if self.timeout <= 0:
+            return
+        cache.set(self._key(user_id, name), {"etag": etag, "data": data}, self.timeout)
+
+    def invalidate_user(self, user_id) -> None:
+        """
+        Invalidate all cached responses of the given user.
+
+        The invalidation is repeated when the current transaction commits, so
+        a response serialized from data read before the commit is dropped too.
+
+        Args:
+            user_id: The id of the user whose data changed.
+        """
+        if user_id is None:
+            return
+        self._bump_version(user_id)
+        transaction.on_commit(lambda: self._bump_version(user_id))
+
+    def _bump_version(self, user_id) -> None:
+        cache.set(self._version_key(user_id), time.time_ns(), None)
+        with self._lock:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Reset the counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def stats(self) -> dict:
+        """
+        Return the hit/miss/invalidation counters of this process, served at
+        /metrics/.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "timeout": self.timeout,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache(timeout=settings.TRIP_RESPONSE_CACHE_TIMEOUT)
+
+
+def invalidate_user_responses(user_id) -> None:
+    """
+    Invalidate all cached responses of a user whose trips or flights changed.
+
+    Args:
+        user_id: The id of the user whose data changed.
+    """
+    response_cache.invalidate_user(user_id)
+
+
+class CachedResponseMixin:
+    """
+    Serves the list and retrieve responses of a ConditionalGetMixin viewset
+    from the response cache while their ETag is unchanged.
+    """
+
+    def conditional_response(self, request, validators, get_response, *args, **kwargs):
+        user_id = request.user.pk
+        name = "|".join(
+            [type(self).__name__, self.action, request.build_absolute_uri()]
+        )
+
+        def get_cached_response(*args, **kwargs):
+            data = response_cache.get(user_id, name, validators.etag)
+            if data is not None:
+                return Response(data)
+            response = get_response(*args, **kwargs)
+            if response.status_code == 200:
+                response_cache.set(user_id, name, validators.etag, response.data)
+            return response
+
+        return super().conditional_response(
+            request, validators, get_cached_response, *args, **kwargs
+        )
@@ -0,0 +1,282 @@
+# backend/apps/trips/calendar.py
+
+from datetime import timedelta, timezone
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+
+from .conditional import compute_validators
+from .models import CalendarFeed, Flight, Trip
+
+PRODID = "-//Travel Stream//Trips and Flights//EN"
+UID_DOMAIN = "travel-stream"
+# Prefix of the non-standard properties that let imports recreate the rows
+X_PREFIX = "X-TRAVEL-STREAM-"
+
+# Bump to rebuild all cached events after changing their format
+EVENT_FORMAT_VERSION = 1
+EVENT_CACHE_TIMEOUT = 60 * 60 * 24
+TOKEN_CACHE_TIMEOUT = 60 * 60
+
+TRIP_COLUMNS = ["id", "name", "description", "destination", "start_date", "end_date"]
+FLIGHT_COLUMNS = [
+    "id",
+    "trip_id",
+    "airline",
+    "confirmation_number",
+    "flight_number",
+    "departure_airport",
+    "arrival_airport",
+    "departure_time",
+    "arrival_time",
+]
+
+
+def escape_text(value) -> str:
+    """Escape a TEXT property value, see RFC 5545 section 3.3.11."""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """
+    Fold a content line into lines of at most 75 octets, see RFC 5545
+    section 3.1. Multi-byte characters are never split.
+    """
+    if len(line.encode("utf-8")) <= 75:
+        return line + "\r\n"
+
+    lines = []
+    current, size, limit = [], 0, 75
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if size + char_size > limit:
+            lines.append("".join(current))
+            # Continuation lines start with a space, which counts too
+            current, size, limit = [], 0, 74
+        current.append(char)
+        size += char_size
+    lines.append("".join(current))
+    return "\r\n ".join(lines) + "\r\n"
+
+
+def format_datetime(value) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def format_date(value) -> str:
+    return value.strftime("%Y%m%d")
+
+
+def uid(kind: str, pk) -> str:
+    return f"{kind}-{pk}@{UID_DOMAIN}"
+
+
+def render_event(properties) -> str:
+    """Render a VEVENT from (name, value) pairs, skipping empty values."""
+    lines = ["BEGIN:VEVENT"]
+    lines += [
+        f"{name}:{value}" for name, value in properties if value not in ("", None)
+    ]
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
+
+
+def render_trip(trip, updated_at) -> str:
+    """Render a trip as an all-day event spanning its dates."""
+    return render_event(
+        [
+            ("UID", uid("trip", trip["id"])),
+            ("DTSTAMP", format_datetime(updated_at)),
+            ("LAST-MODIFIED", format_datetime(updated_at)),
+            ("DTSTART;VALUE=DATE", format_date(trip["start_date"])),
+            # The end date of all-day events is exclusive
+            ("DTEND;VALUE=DATE", format_date(trip["end_date"] + timedelta(days=1))),
+            ("SUMMARY", escape_text(trip["name"])),
+            ("LOCATION", escape_text(trip["destination"])),
+            ("DESCRIPTION", escape_text(trip["description"] or "")),
+            ("CATEGORIES", "TRIP"),
+        ]
+    )
+
+
+def render_flight(flight, updated_at) -> str:
+    """Render a flight as an event from departure to arrival."""
+    summary = (
+        f"{flight['flight_number']}: "
+        f"{flight['departure_airport']} → {flight['arrival_airport']}"
+    )
+    description = f"Airline: {flight['airline']}"
+    if flight["confirmation_number"]:
+        description += f"\nConfirmation number: {flight['confirmation_number']}"
+
+    return render_event(
+        [
+            ("UID", uid("flight", flight["id"])),
+            ("DTSTAMP", format_datetime(updated_at)),
+            ("LAST-MODIFIED", format_datetime(updated_at)),
+            ("DTSTART", format_datetime(flight["departure_time"])),
+            ("DTEND", format_datetime(flight["arrival_time"])),
+            ("SUMMARY", escape_text(summary)),
+            ("LOCATION", escape_text(flight["departure_airport"])),
+            ("DESCRIPTION", escape_text(description)),
+            ("CATEGORIES", "FLIGHT"),
+            ("RELATED-TO", uid("trip", flight["trip_id"])),
+            (f"{X_PREFIX}AIRLINE", escape_text(flight["airline"])),
+            (f"{X_PREFIX}FLIGHT-NUMBER", escape_text(flight["flight_number"])),
+            (
+                f"{X_PREFIX}DEPARTURE-AIRPORT",
+                escape_text(flight["departure_airport"]),
+            ),
+            (f"{X_PREFIX}ARRIVAL-AIRPORT", escape_text(flight["arrival_airport"])),
+            (
+                f"{X_PREFIX}CONFIRMATION-NUMBER",
+                escape_text(flight["confirmation_number"] or ""),
+            ),
+        ]
+    )
+
+
+def get_feed_user_id(token: str):
+    """
+    Return the id of the user owning the feed token, or None.
+    Tokens are cached so polling clients don't query the feed table.
+    """
+    key = f"trips:calendar:token:{token}"
+    user_id = cache.get(key)
+    if user_id is None:
+        user_id = (
+            CalendarFeed.objects.filter(token=token)
+            .values_list("created_by_id", flat=True)
+            .first()
+        )
+        if user_id is not None:
+            cache.set(key, user_id, TOKEN_CACHE_TIMEOUT)
+    return user_id
+
+
+def forget_feed_token(token: str) -> None:
+    """Stop accepting a rotated or deleted token from the cache."""
+    cache.delete(f"trips:calendar:token:{token}")
+
+
+def get_or_create_feed(user) -> CalendarFeed:
+    """
+    Return the user's feed, creating it on the first request.
+
+    Only one active feed per user is allowed by the database, so when
+    concurrent first requests race, get_or_create's insert fails with an
+    IntegrityError for all but one of them, and they read the winner's feed.
+    """
+    feed, _ = CalendarFeed.objects.get_or_create(created_by=user)
+    return feed
+
+
+def rotate_feed_token(user) -> CalendarFeed:
+    """Give the user's feed a new token, revoking the old URL."""
+    feed = get_or_create_feed(user)
+    forget_feed_token(feed.token)
+    feed.token = CalendarFeed._meta.get_field("token").default()
+    feed.save()
+    return feed
+
+
+def feed_validators(user_id):
+    """
+    Compute the feed's validators with one aggregate query over the user's
+    trips and their flights.
+    """
+    return compute_validators(
+        Trip.objects.filter(created_by_id=user_id),
+        {
+            "flights_last_modified": Max("flights__updated_at"),
+            "flights_count": Count(
+                "flights", filter=Q(flights__is_deleted=False), distinct=True
+            ),
+        },
+        key=f"calendar|{EVENT_FORMAT_VERSION}|{user_id}",
+    )
+
+
+def get_feed(user_id, etag: str) -> str:
+    """
+    Return the user's feed, cached as a whole for the given ETag, so clients
+    that poll without conditional headers don't rebuild it either.
+    """
+    key = f"trips:calendar:feed:{user_id}:{etag}"
+    feed = cache.get(key)
+    if feed is None:
+        feed = build_feed(user_id)
+        cache.set(key, feed, EVENT_CACHE_TIMEOUT)
+    return feed
+
+
+def build_feed(user_id) -> str:
+    """
+    Build the iCalendar feed of the user's trips and the flights of those trips.
+
+    Every event is cached on its own, keyed on the row's `updated_at`, so only
+    the events of changed rows are rendered again. Full rows are only loaded
+    for those.
+
+    Args:
+        user_id: The id of the user.
+
+    Returns:
+        str: The VCALENDAR object.
+    """
+    trips = Trip.objects.filter(created_by_id=user_id).order_by("start_date", "id")
+    flights = Flight.objects.filter(
+        created_by_id=user_id, trip__in=trips.values("id")
+    ).order_by("departure_time", "id")
+
+    events = []
+    for kind, queryset, columns, render in (
+        ("trip", trips, TRIP_COLUMNS, render_trip),
+        ("flight", flights, FLIGHT_COLUMNS, render_flight),
+    ):
+        versions = list(queryset.values_list("id", "updated_at"))
+        keys = {
+            pk: f"trips:calendar:event:{EVENT_FORMAT_VERSION}:{kind}:{pk}:"
+            f"{updated_at.timestamp()}"
+            for pk, updated_at in versions
+        }
+        cached = cache.get_many(keys.values())
+
+        missing = {pk for pk, key in keys.items() if key not in cached}
+        if missing:
+            updated = dict(versions)
+            # Skip the long IN list when most events have to be rendered anyway
+            if len(missing) * 2 < len(versions):
+                queryset = queryset.filter(id__in=missing)
+            rendered = {
+                keys[row["id"]]: render(row, updated[row["id"]])
+                for row in queryset.values(*columns)
+                if row["id"] in missing
+            }
+            cache.set_many(rendered, EVENT_CACHE_TIMEOUT)
+            cached.update(rendered)
+
+        events += [cached[keys[pk]] for pk, _ in versions]
+
+    return (
+        "".join(
+            fold_line(line)
+            for line in (
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                f"PRODID:{PRODID}",
+                "CALSCALE:GREGORIAN",
+                "METHOD:PUBLISH",
+                "X-WR-CALNAME:Travel Stream",
+            )
+        )
+        + "".join(events)
+        + "END:VCALENDAR\r\n"
+    )
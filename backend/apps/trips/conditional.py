@@ -0,0 +1,107 @@
+# backend/apps/trips/conditional.py
+
+import hashlib
+from collections import namedtuple
+from datetime import datetime
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+Validators = namedtuple("Validators", ["etag", "last_modified"])
+
+
+def compute_validators(queryset, aggregates=None, key="") -> Validators:
+    """
+    Compute the ETag and Last-Modified validators of a queryset's
+    representation with a single aggregate query, without loading or
+    serializing any rows.
+
+    Args:
+        queryset: The queryset whose representation is validated.
+        aggregates: Extra aggregates that the representation depends on, e.g.
+            the latest update of nested rows.
+        key: Anything else the representation depends on, e.g. the query string.
+
+    Returns:
+        Validators: A strong ETag, and the latest update time as a timestamp
+            or None for an empty queryset.
+    """
+    values = queryset.order_by().aggregate(
+        count=Count("pk", distinct=True),
+        last_modified=Max("updated_at"),
+        **(aggregates or {}),
+    )
+
+    fingerprint = "|".join(
+        [key] + [f"{name}={values[name]!r}" for name in sorted(values)]
+    )
+    etag = quote_etag(hashlib.sha256(fingerprint.encode("utf-8")).hexdigest())
+
+    timestamps = [v for v in values.values() if isinstance(v, datetime)]
+    # HTTP dates have a resolution of one second
+    last_modified = int(max(timestamps).timestamp()) if timestamps else None
+
+    return Validators(etag, last_modified)
+
+
+class ConditionalGetMixin:
+    """
+    Adds conditional request support to the list and retrieve actions of a
+    viewset. Responses carry a strong ETag and a Last-Modified header, and
+    requests with a matching If-None-Match or If-Modified-Since header get
+    a 304 Not Modified response without the body ever being serialized.
+    """
+
+    # Extra aggregates the serialized representation depends on
+    validator_aggregates = {}
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = self.get_validators(queryset)
+        return self.conditional_response(
+            request, validators, super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = self.get_queryset().filter(pk=self.kwargs["pk"])
+        validators = self.get_validators(queryset)
+        if validators.last_modified is None:
+            # Let the missing object raise a 404, whatever the request headers
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            request, validators, super().retrieve, request, *args, **kwargs
+        )
+
+    def get_validators(self, queryset) -> Validators:
+        """Compute the validators of the current request's response."""
+        key = "|".join(
+            [
+                type(self).__name__,
+                self.action,
+                str(self.request.user.pk),
+                self.request.get_full_path(),
+            ]
+        )
+        return compute_validators(queryset, self.get_validator_aggregates(), key)
+
+    def get_validator_aggregates(self) -> dict:
+        """Return the extra aggregates of the current request's response."""
+        return self.validator_aggregates
+
+    @staticmethod
+    def conditional_response(request, validators, get_response, *args, **kwargs):
+        not_modified = get_conditional_response(
+            request,
+            etag=validators.etag,
+            last_modified=validators.last_modified,
+        )
+        response = not_modified or get_response(*args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response.headers["ETag"] = validators.etag
+            if validators.last_modified is not None:
+                response.headers["Last-Modified"] = http_date(validators.last_modified)
+            # Make browsers revalidate instead of reusing a stale list
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,167 @@
+# backend/apps/trips/conflicts.py
+
+import heapq
+
+from .models import Flight, Trip
+from .timeline import flights_overlapping, window_times
+
+
+def is_outside_trip(departure_time, arrival_time, start_date, end_date) -> bool:
+    """
+    Return whether a flight departs before its trip's first day or arrives
+    after its last day, in the current time zone.
+    """
+    lower, upper = window_times(start_date, max(start_date, end_date))
+    return departure_time < lower or max(departure_time, arrival_time) > upper
+
+
+def flight_conflicts(flight) -> list[dict]:
+    """
+    Check a saved flight against its trip and the user's other flights.
+
+    The overlapping flights are found with an indexed range query, without
+    loading the rest of the user's schedule. Flights overlap when one departs
+    before the other arrives, so a connection departing at the arrival time
+    of the previous flight is not a conflict.
+
+    Args:
+        flight: The Flight to check.
+
+    Returns:
+        list: The conflicts, like the ones of account_conflicts.
+    """
+    conflicts = []
+
+    trip = Trip.objects.filter(pk=flight.trip_id)
+    for start_date, end_date in trip.values_list("start_date", "end_date"):
+        if is_outside_trip(
+            flight.departure_time, flight.arrival_time, start_date, end_date
+        ):
+            conflicts.append(
+                {"type": "outside_trip", "flight": flight.pk, "trip": flight.trip_id}
+            )
+
+    others = overlapping_flights(flight).order_by("departure_time", "id")
+    conflicts.extend(
+        {"type": "overlap", "flight": flight.pk, "other": pk}
+        for pk in others.values_list("pk", flat=True)
+    )
+    return conflicts
+
+
+def overlapping_flights(flight):
+    """
+    Return the user's other flights that overlap a flight, as an indexed
+    range query.
+
+    Args:
+        flight: The Flight to check.
+
+    Returns:
+        QuerySet: The overlapping flights.
+    """
+    others = Flight.objects.filter(created_by_id=flight.created_by_id).exclude(
+        pk=flight.pk
+    )
+    # Clamped like the indexed range, for flights arriving before they depart
+    departure_time = flight.departure_time
+    arrival_time = max(flight.departure_time, flight.arrival_time)
+    if departure_time < arrival_time:
+        return flights_overlapping(others, departure_time, arrival_time, "()")
+
+    # An open range of zero length is empty and overlaps nothing on
+    # PostgreSQL, so an instant is looked up as a closed range, without the
+    # flights that only touch it
+    return (
+        flights_overlapping(others, departure_time, arrival_time, "[]")
+        .exclude(departure_time=departure_time)
+        .exclude(arrival_time=departure_time)
+    )
+
+
+def overlapping_pairs(intervals, closed=False):
+    """
+    Find every pair of overlapping intervals with a sweep, in
+    O(n log n + k) time for n intervals and k pairs.
+
+    Args:
+        intervals: (start, end, key) tuples, ordered by start.
+        closed: Whether intervals sharing only an endpoint overlap, e.g. trips
+            ending on the day another one starts.
+
+    Yields:
+        tuple: The keys of the earlier and the later interval of each pair.
+    """
+    # (end, start, key) of the intervals still open at the current start
+    active = []
+    for start, end, key in intervals:
+        while active and (active[0][0] < start if closed else active[0][0] <= start):
+            heapq.heappop(active)
+        for _, other_start, other in active:
+            # Only fails for an empty interval at the start of an open one
+            if closed or other_start < end:
+                yield other, key
+        heapq.heappush(active, (end, start, key))
+
+
+def account_conflicts(user) -> list[dict]:
+    """
+    Find all conflicts in a user's schedule, with one query for the flights
+    and one for the trips, each read in order and swept once.
+
+    Returns:
+        list: The conflicts, grouped by type, each a dict with the `type`
+            and the ids involved:
+            - "arrival_before_departure": a `flight` arriving before it departs
+            - "outside_trip": a `flight` outside the dates of its `trip`
+            - "overlap": a `flight` and an `other` one overlapping it
+            - "trip_overlap": a `trip` and an `other` one sharing a day
+    """
+    flights = list(
+        Flight.objects.filter(created_by=user)
+        .order_by("departure_time", "id")
+        .values_list(
+            "pk",
+            "trip_id",
+            "departure_time",
+            "arrival_time",
+            "trip__start_date",
+            "trip__end_date",
+        )
+    )
+    trips = (
+        Trip.objects.filter(created_by=user)
+        .order_by("start_date", "id")
+        .values_list("pk", "start_date", "end_date")
+    )
+
+    conflicts = []
+    for pk, trip_id, departure_time, arrival_time, start_date, end_date in flights:
+        if arrival_time < departure_time:
+            conflicts.append({"type": "arrival_before_departure", "flight": pk})
+        if is_outside_trip(departure_time, arrival_time, start_date, end_date):
+            conflicts.append({"type": "outside_trip", "flight": pk, "trip": trip_id})
+
+    flight_pairs = overlapping_pairs(
+        (departure_time, max(departure_time, arrival_time), pk)
+        for pk, _, departure_time, arrival_time, *_ in flights
+    )
+    conflicts.extend(
+        {"type": "overlap", "flight": flight, "other": other}
+        for flight, other in sorted(flight_pairs)
+    )
+    trip_pairs = overlapping_pairs(
+        (
+            (start_date, max(start_date, end_date), pk)
+            for pk, start_date, end_date in trips
+        ),
+        closed=True,
+    )
+    conflicts.extend(
+        {"type": "trip_overlap", "trip": trip, "other": other}
+        for trip, other in sorted(trip_pairs)
+    )
+
+    order = ["arrival_before_departure", "outside_trip", "overlap", "trip_overlap"]
+    conflicts.sort(key=lambda conflict: order.index(conflict["type"]))
+    return conflicts
@@ -0,0 +1,173 @@
+# backend/apps/trips/fast_serializers.py
+
+from collections import defaultdict
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from apps.core.instrumentation import timer
+
+
+class FastSerializer:
+    """
+    Read-only serialization engine for list endpoints.
+
+    Compiles the readable fields of a DRF ModelSerializer instance into plain
+    converter functions once, then builds the representation straight from
+    `values()` rows, without instantiating models or running DRF's per-field
+    machinery. The output is identical to the DRF serializer's.
+
+    Nested many=True model serializers are loaded with one query per list,
+    from the queryset given for them in `nested_querysets`.
+
+    Usage:
+        fast = FastSerializer(TripSerializer(context=context), nested_querysets)
+        data = fast.serialize(fast.values(queryset))
+    """
+
+    def __init__(self, serializer, nested_querysets=None, queryset=None):
+        """
+        Args:
+            serializer: The DRF ModelSerializer instance to replicate.
+            nested_querysets: Querysets of the nested serializers, by field name.
+            queryset: The queryset nested rows are loaded from, when this
+                serializer is nested in another one.
+        """
+        nested_querysets = nested_querysets or {}
+        model = serializer.Meta.model
+
+        self.queryset = queryset
+        # (field name, values() column, converter), in representation order
+        self.fields = []
+        # (field name, nested FastSerializer, its foreign key column)
+        self.nested = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if isinstance(field, serializers.ListSerializer):
+                relation = model._meta.get_field(field.source)
+                child_queryset = nested_querysets.get(
+                    name, relation.related_model._default_manager.all()
+                )
+                child = FastSerializer(field.child, queryset=child_queryset)
+                self.nested.append((name, child, relation.field.attname))
+                # The converter is bound to the loaded rows in serialize()
+                self.fields.append((name, "pk", None))
+                continue
+
+            column = field.source
+            if isinstance(field, serializers.RelatedField):
+                column = model._meta.get_field(field.source).attname
+            self.fields.append((name, column, self._compile(field)))
+
+        self.columns = list(dict.fromkeys(["pk"] + [c for _, c, _ in self.fields]))
+
+    @staticmethod
+    def _compile(field):
+        """Return a function converting a non-null column value like `field`."""
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+            if output_format is not None and output_format.lower() == ISO_8601:
+                enforce_timezone = field.enforce_timezone
+                # Resolved once instead of for every value
+                field_timezone = getattr(field, "timezone", field.default_timezone())
+
+                def convert_datetime(value):
+                    if field_timezone is not None and value.utcoffset() is not None:
+                        value = value.astimezone(field_timezone).isoformat()
+                    else:
+                        value = enforce_timezone(value).isoformat()
+                    if value.endswith("+00:00"):
+                        value = value[:-6] + "Z"
+                    return value
+
+                return convert_datetime
+        elif isinstance(field, serializers.DateField):
+            output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+            if output_format is not None and output_format.lower() == ISO_8601:
+                return lambda value: value.isoformat()
+        elif isinstance(field, serializers.CharField):
+            return str
+        elif isinstance(field, serializers.IntegerField):
+            return int
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is None:
+                return lambda value: value
+
+        return field.to_representation
+
+    def values(self, queryset, extra_columns=()):
+        """
+        Return the rows needed for the representation as a `values()` queryset.
+
+        Args:
+            queryset: The queryset of the serializer's model.
+            extra_columns: Other columns to select, e.g. the pagination ordering.
+
+        Returns:
+            QuerySet: The rows as dicts.
+        """
+        columns = list(dict.fromkeys(self.columns + list(extra_columns)))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def serialize(self, rows):
+        """
+        Build the representation of the given `values()` rows.
+
+        Args:
+            rows: Dicts with the columns selected by `values()`.
+
+        Returns:
+            list: The representation of every row, in order.
+        """
+        rows = list(rows)
+        nested = {
+            name: self._load_nested(child, foreign_key, rows)
+            for name, child, foreign_key in self.nested
+        }
+        fields = [
+            (name, column, convert if name not in nested else nested[name].__getitem__)
+            for name, column, convert in self.fields
+        ]
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in fields:
+                value = row[column]
+                item[name] = None if value is None else convert(value)
+            data.append(item)
+        return data
+
+    @staticmethod
+    def _load_nested(child, foreign_key, rows):
+        """Load and serialize the nested rows of all given rows in one query."""
+        children = defaultdict(list)
+        if not rows:
+            return children
+
+        queryset = child.queryset.filter(
+            **{f"{foreign_key}__in": [row["pk"] for row in rows]}
+        )
+        child_rows = list(child.values(queryset, [foreign_key]))
+        for child_row, item in zip(child_rows, child.serialize(child_rows)):
+            children[child_row[foreign_key]].append(item)
+        return children
+
+
+class FastListSerializer:
+    """
+    Stands in for a many=True DRF serializer in generic views, serializing a
+    page of `values()` rows with a FastSerializer.
+    """
+
+    def __init__(self, fast_serializer, rows):
+        self.fast_serializer = fast_serializer
+        self.rows = rows
+
+    @property
+    def data(self):
+        with timer("serialize"):
+            return self.fast_serializer.serialize(self.rows)
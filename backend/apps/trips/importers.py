@@ -0,0 +1,339 @@
+# backend/apps/trips/importers.py
+
+import csv
+import itertools
+import json
+from datetime import datetime, timedelta, timezone
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .cache import invalidate_user_responses
+from .calendar import X_PREFIX
+from .models import Flight, Trip
+from .serializers import TripImportSerializer
+from .summaries import refresh_flight_summaries
+
+FORMATS = ["csv", "ics", "json"]
+
+TRIP_FIELDS = ["name", "description", "destination", "start_date", "end_date"]
+FLIGHT_FIELDS = [
+    "airline",
+    "confirmation_number",
+    "flight_number",
+    "departure_airport",
+    "arrival_airport",
+    "departure_time",
+    "arrival_time",
+]
+
+
+def detect_format(filename: str) -> str | None:
+    """Return the import format for a file name, e.g. `csv` for `trips.csv`."""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension in ("ndjson", "jsonl"):
+        return "json"
+    return extension if extension in FORMATS else None
+
+
+def parse_json(stream):
+    """
+    Yield trip records from a JSON array or from NDJSON with one trip per
+    line, e.g. the export. NDJSON is parsed one line at a time.
+    """
+    first_line = next(stream, "")
+    if first_line.lstrip().startswith("["):
+        # A JSON array can only be parsed as a whole
+        yield from json.loads(first_line + "".join(stream))
+        return
+
+    for line in itertools.chain([first_line], stream):
+        if line.strip():
+            yield json.loads(line)
+
+
+def parse_csv(stream):
+    """
+    Yield trip records from CSV with `trip_` and `flight_` prefixed columns,
+    e.g. the export. Consecutive rows of the same trip are grouped.
+    """
+    rows = csv.DictReader(stream)
+
+    def trip_key(row):
+        return row.get("trip_id") or tuple(
+            row.get(f"trip_{name}") for name in TRIP_FIELDS
+        )
+
+    for _, trip_rows in itertools.groupby(rows, key=trip_key):
+        trip_rows = list(trip_rows)
+        record = _non_empty(
+            {name: trip_rows[0].get(f"trip_{name}") for name in TRIP_FIELDS}
+        )
+        record["flights"] = [
+            _non_empty({name: row.get(f"flight_{name}") for name in FLIGHT_FIELDS})
+            for row in trip_rows
+            if any(row.get(f"flight_{name}") for name in FLIGHT_FIELDS)
+        ]
+        yield record
+
+
+def parse_ics(stream):
+    """
+    Yield trip records from an iCalendar feed exported by Travel Stream.
+
+    Trips are the events in the TRIP category and flights the events with
+    X-TRAVEL-STREAM- properties, linked to their trip with RELATED-TO. Other
+    events are ignored. Flights without their trip in the file are returned
+    as one invalid record. Events are grouped by trip, so the whole file is
+    read before the first record is returned.
+    """
+    trips = {}
+    flights = []
+    for event in _ics_events(stream):
+        if event.get("CATEGORIES") == "TRIP":
+            trips[event.get("UID") or len(trips)] = {
+                "name": event.get("SUMMARY"),
+                "description": event.get("DESCRIPTION"),
+                "destination": event.get("LOCATION"),
+                "start_date": _ics_date(event.get("DTSTART")),
+                # The end date of all-day events is exclusive
+                "end_date": _ics_date(event.get("DTEND"), days=-1),
+                "flights": [],
+            }
+        elif f"{X_PREFIX}FLIGHT-NUMBER" in event:
+            flight = {
+                "airline": event.get(f"{X_PREFIX}AIRLINE"),
+                "confirmation_number": event.get(f"{X_PREFIX}CONFIRMATION-NUMBER"),
+                "flight_number": event.get(f"{X_PREFIX}FLIGHT-NUMBER"),
+                "departure_airport": event.get(f"{X_PREFIX}DEPARTURE-AIRPORT"),
+                "arrival_airport": event.get(f"{X_PREFIX}ARRIVAL-AIRPORT"),
+                "departure_time": _ics_datetime(event.get("DTSTART")),
+                "arrival_time": _ics_datetime(event.get("DTEND")),
+            }
+            flights.append((event.get("RELATED-TO"), _non_empty(flight)))
+
+    unmatched = []
+    for trip_uid, flight in flights:
+        if trip_uid in trips:
+            trips[trip_uid]["flights"].append(flight)
+        else:
+            unmatched.append(flight)
+
+    yield from trips.values()
+    if unmatched:
+        yield {"flights": unmatched}
+
+
+def _ics_events(stream):
+    """Yield the properties of each VEVENT as a dict, unescaping TEXT values."""
+    event = None
+    for line in _unfold(stream):
+        name, _, value = line.partition(":")
+        name = name.split(";", 1)[0].upper()
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event = {}
+        elif name == "END" and value.upper() == "VEVENT":
+            if event is not None:
+                yield event
+            event = None
+        elif event is not None:
+            event[name] = _unescape(value)
+
+
+def _unfold(stream):
+    """Join folded iCalendar content lines, see RFC 5545 section 3.1."""
+    current = None
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _unescape(value: str) -> str:
+    return (
+        value.replace("\\n", "\n")
+        .replace("\\N", "\n")
+        .replace("\\,", ",")
+        .replace("\\;", ";")
+        .replace("\\\\", "\\")
+    )
+
+
+def _ics_date(value, days=0):
+    if not value:
+        return None
+    try:
+        return (datetime.strptime(value[:8], "%Y%m%d") + timedelta(days=days)).date()
+    except ValueError:
+        return value
+
+
+def _ics_datetime(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    except ValueError:
+        return value
+    return parsed.replace(tzinfo=timezone.utc) if value.endswith("Z") else parsed
+
+
+def _non_empty(data: dict) -> dict:
+    """Drop missing and empty values, so serializer defaults apply."""
+    return {key: value for key, value in data.items() if value not in ("", None)}
+
+
+PARSERS = {"csv": parse_csv, "ics": parse_ics, "json": parse_json}
+
+
+class ItineraryImporter:
+    """
+    Imports trip records into a user's account.
+
+    Records are validated `batch_size` at a time with TripImportSerializer and
+    each batch is written with bulk_create in its own transaction. Trips that
+    match an existing trip by name, destination and dates are reused, and
+    flights that already exist by (`flight_number`, `departure_time`), in the
+    account or earlier in the file, are skipped. Invalid records are reported
+    and don't stop the import. A file that can't be parsed to the end, e.g. a
+    truncated one, stops it after importing the records before the error.
+    """
+
+    def __init__(self, user, batch_size: int = 500):
+        self.user = user
+        self.batch_size = batch_size
+        self.result = {
+            "trips_created": 0,
+            "trips_matched": 0,
+            "flights_created": 0,
+            "flights_skipped": 0,
+            "errors": [],
+            "parse_error": None,
+        }
+        self._seen_flights = set()
+        # One serializer validates every record, like ListSerializer does
+        self._serializer = TripImportSerializer()
+
+    def run(self, stream, file_format: str) -> dict:
+        """
+        Import all records of a text stream.
+
+        Args:
+            stream: The file to import, as an iterable of lines.
+            file_format: One of FORMATS.
+
+        Returns:
+            dict: The number of created, matched and skipped rows, the
+                errors of invalid records by their position in the file, and
+                the `parse_error` that stopped the import, with the position
+                of the record that couldn't be parsed, or None.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if file_format not in PARSERS:
+            raise ValueError(f"Unsupported format: {file_format}.")
+
+        batch = []
+        parsed = 0
+        try:
+            try:
+                for record in PARSERS[file_format](stream):
+                    batch.append((parsed, record))
+                    parsed += 1
+                    if len(batch) == self.batch_size:
+                        self._import_batch(batch)
+                        batch = []
+            except (json.JSONDecodeError, csv.Error, UnicodeDecodeError) as e:
+                self.result["parse_error"] = {
+                    "record": parsed,
+                    "detail": f"Could not parse the file: {e}",
+                }
+            # The records read before a parse error are imported too
+            if batch:
+                self._import_batch(batch)
+        finally:
+            if self.result["trips_created"] or self.result["flights_created"]:
+                # bulk_create does not send post_save signals
+                invalidate_user_responses(self.user.pk)
+        return self.result
+
+    def _import_batch(self, batch):
+        valid = []
+        for position, record in batch:
+            try:
+                valid.append(self._serializer.run_validation(record))
+            except ValidationError as e:
+                self.result["errors"].append({"record": position, "errors": e.detail})
+
+        if valid:
+            with transaction.atomic():
+                self._write(valid)
+
+    def _write(self, records):
+        trips = self._match_or_create_trips(records)
+
+        keys = {
+            (flight["flight_number"], flight["departure_time"])
+            for record in records
+            for flight in record.get("flights", [])
+        }
+        existing = set(
+            Flight.objects.filter(
+                created_by=self.user,
+                flight_number__in={number for number, _ in keys},
+                departure_time__in={time for _, time in keys},
+            ).values_list("flight_number", "departure_time")
+        )
+
+        flights = []
+        for trip, record in zip(trips, records):
+            for flight in record.get("flights", []):
+                key = (flight["flight_number"], flight["departure_time"])
+                if key in existing or key in self._seen_flights:
+                    self.result["flights_skipped"] += 1
+                    continue
+                self._seen_flights.add(key)
+                flights.append(Flight(created_by=self.user, trip=trip, **flight))
+
+        Flight.objects.bulk_create(flights)
+        self.result["flights_created"] += len(flights)
+        if flights:
+            refresh_flight_summaries({flight.trip_id for flight in flights})
+
+    def _match_or_create_trips(self, records):
+        """Return the trip of every record, creating the missing ones."""
+
+        def trip_key(trip):
+            return tuple(trip[name] for name in TRIP_FIELDS if name != "description")
+
+        existing = {
+            trip_key(vars(trip)): trip
+            for trip in Trip.objects.filter(
+                created_by=self.user,
+                name__in={record["name"] for record in records},
+            )
+        }
+
+        new_trips = {}
+        for record in records:
+            key = trip_key(record)
+            if key not in existing and key not in new_trips:
+                new_trips[key] = Trip(
+                    created_by=self.user,
+                    **{name: record.get(name) for name in TRIP_FIELDS},
+                )
+
+        Trip.objects.bulk_create(new_trips.values())
+        self.result["trips_created"] += len(new_trips)
+        self.result["trips_matched"] += sum(
+            1 for record in records if trip_key(record) in existing
+        )
+        existing.update(new_trips)
+        return [existing[trip_key(record)] for record in records]
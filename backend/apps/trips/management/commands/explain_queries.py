@@ -0,0 +1,119 @@
+# backend/apps/trips/management/commands/explain_queries.py
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from apps.trips.models import Flight, Trip
+from apps.trips.views import FlightViewSet, TripViewSet
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the database EXPLAIN plans of the hot queries run by TripViewSet "
+        "and FlightViewSet, to check that the owner-scoped indexes are used."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            help="ID of the user whose queries are explained. "
+            "Defaults to the user with the most trips.",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run the queries and include actual timings (PostgreSQL only).",
+        )
+
+    def handle(self, *args, **options):
+        user = self._get_user(options["user"])
+        explain_options = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options["analyze"] = True
+
+        trip = Trip.objects.filter(created_by=user).first()
+        trip_id = trip.id if trip else 0
+        flight = Flight.objects.filter(created_by=user).first()
+        flight_id = flight.id if flight else 0
+
+        # The list queries are built by the views and their paginators, so
+        # the plans are of the queries the endpoints run
+        trips_view = self._viewset(TripViewSet, user)
+        trip_rows = trips_view.get_list_rows(trips_view.get_queryset())
+        flights_view = self._viewset(FlightViewSet, user)
+        trip_flights_view = self._viewset(FlightViewSet, user, {"trip_id": trip_id})
+        trip_queryset = self._viewset(TripViewSet, user, action="retrieve")
+        trip_queryset = trip_queryset.get_queryset()
+
+        queries = [
+            ("TripViewSet.list", self._page(trips_view, trip_rows)),
+            (
+                "TripViewSet.list?cursor=",
+                self._page(trips_view, trip_rows, trip_rows.first()),
+            ),
+            ("TripViewSet.retrieve", trip_queryset.filter(pk=trip_id)),
+            (
+                "TripViewSet flights prefetch",
+                Flight.objects.filter(trip_id__in=[trip_id]),
+            ),
+            ("FlightViewSet.list", self._page(flights_view)),
+            ("FlightViewSet.list?cursor=", self._page(flights_view, after=flight)),
+            ("FlightViewSet.list?trip_id=", self._page(trip_flights_view)),
+            (
+                "FlightViewSet.retrieve",
+                flights_view.get_queryset().filter(pk=flight_id),
+            ),
+        ]
+
+        for name, queryset in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write("")
+
+    @staticmethod
+    def _get_user(user_id):
+        if user_id is not None:
+            try:
+                return User.objects.get(pk=user_id)
+            except User.DoesNotExist:
+                raise CommandError(f"User id {user_id} does not exist.")
+
+        user = (
+            User.objects.annotate(trip_count=Count("created_trips"))
+            .order_by("-trip_count")
+            .first()
+        )
+        if user is None:
+            raise CommandError("No users found. Pass --user to pick one.")
+        return user
+
+    @staticmethod
+    def _viewset(viewset_class, user, query_params=None, action="list"):
+        """Instantiate the viewset for a request of the given user."""
+        request = Request(RequestFactory().get("/", query_params or {}))
+        request.user = user
+        return viewset_class(
+            request=request, kwargs={}, format_kwarg=None, action=action
+        )
+
+    @staticmethod
+    def _page(view, rows=None, after=None):
+        """
+        Return the query of a list page as the view's paginator reads it, the
+        first page or the one following the `after` row.
+        """
+        paginator = view.paginator
+        if rows is None:
+            rows = view.get_queryset()
+        position = None
+        if after is not None:
+            position = paginator._get_position_from_instance(after, paginator.ordering)
+        return paginator.get_page_queryset(rows, position)[: paginator.page_size + 1]
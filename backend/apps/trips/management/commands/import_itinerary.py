@@ -0,0 +1,71 @@
+# backend/apps/trips/management/commands/import_itinerary.py
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.trips.importers import FORMATS, ItineraryImporter, detect_format
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import trips and flights from a CSV, ICS or JSON itinerary file, "
+        "e.g. an export, into a user's account."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The file to import.")
+        parser.add_argument(
+            "--user",
+            type=int,
+            required=True,
+            help="Id of the user the trips are imported for.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Format of the file. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of trips validated and written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(pk=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"User id {options['user']} does not exist.")
+
+        file_format = options["format"] or detect_format(options["path"])
+        if file_format is None:
+            raise CommandError("Unknown file format. Pass --format to pick one.")
+
+        importer = ItineraryImporter(user, batch_size=options["batch_size"])
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as f:
+                result = importer.run(f, file_format)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in result["errors"]:
+            self.stderr.write(
+                f"Record {error['record']}: {json.dumps(error['errors'])}"
+            )
+        self.stdout.write(
+            f"Created {result['trips_created']} trip(s) and "
+            f"{result['flights_created']} flight(s), matched "
+            f"{result['trips_matched']} existing trip(s), skipped "
+            f"{result['flights_skipped']} existing flight(s), "
+            f"{len(result['errors'])} invalid record(s)."
+        )
+        if result["parse_error"] is not None:
+            raise CommandError(
+                f"Stopped at record {result['parse_error']['record']}: "
+                f"{result['parse_error']['detail']}"
+            )
@@ -0,0 +1,52 @@
+# backend/apps/trips/management/commands/rebuild_trip_summaries.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.trips.models import Trip
+from apps.trips.summaries import refresh_flight_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the flight summary columns of trips from their flights in "
+        "bounded batches, e.g. to backfill them after adding the columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            help="Only rebuild the trips of the user with this id.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Maximum number of trips updated per statement.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches to spread out the writes.",
+        )
+
+    def handle(self, *args, **options):
+        trips = Trip.all_objects.order_by("pk")
+        if options["user"] is not None:
+            trips = trips.filter(created_by_id=options["user"])
+
+        rebuilt, last_pk = 0, None
+        while True:
+            batch = trips if last_pk is None else trips.filter(pk__gt=last_pk)
+            pks = list(batch.values_list("pk", flat=True)[: options["batch_size"]])
+            if not pks:
+                break
+            rebuilt += refresh_flight_summaries(pks)
+            last_pk = pks[-1]
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(f"Rebuilt the flight summaries of {rebuilt} trip(s).")
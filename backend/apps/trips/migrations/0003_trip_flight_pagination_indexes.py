@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0002_flight"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["created_by", "departure_time", "id"],
+                name="flight_owner_departure_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["created_by", "start_date", "id"],
+                name="trip_owner_start_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0003_trip_flight_pagination_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="flight",
+            name="flight_owner_departure_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="trip",
+            name="trip_owner_start_date_idx",
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["created_by", "departure_time", "id"],
+                name="flight_owner_departure_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["trip", "departure_time", "id"],
+                name="flight_trip_departure_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["created_by", "start_date", "id"],
+                name="trip_owner_start_date_idx",
+            ),
+        ),
+    ]
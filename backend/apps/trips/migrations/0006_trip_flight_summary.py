@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:30
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def backfill_flight_summaries(apps, schema_editor):
+    """
+    Fill the summary columns of existing trips from their active flights, like
+    summaries.refresh_flight_summaries as of this migration, one UPDATE per
+    BATCH_SIZE trips.
+    """
+    Trip = apps.get_model("trips", "Trip")
+    Flight = apps.get_model("trips", "Flight")
+
+    flights = Flight.objects.filter(trip=OuterRef("pk"), is_deleted=False).order_by()
+    first = flights.order_by("departure_time", "id")
+    last = flights.order_by("-arrival_time", "-id")
+    count = flights.values("trip").annotate(count=Count("pk")).values("count")
+
+    trip_ids = Trip.objects.order_by("pk").values_list("pk", flat=True)
+    last_id = None
+    while True:
+        batch = trip_ids if last_id is None else trip_ids.filter(pk__gt=last_id)
+        batch = list(batch[:BATCH_SIZE])
+        if not batch:
+            break
+        Trip.objects.filter(pk__in=batch).update(
+            flight_count=Coalesce(Subquery(count), 0),
+            first_departure_time=Subquery(first.values("departure_time")[:1]),
+            first_departure_airport=Subquery(first.values("departure_airport")[:1]),
+            last_arrival_time=Subquery(last.values("arrival_time")[:1]),
+            last_arrival_airport=Subquery(last.values("arrival_airport")[:1]),
+            updated_at=timezone.now(),
+        )
+        last_id = batch[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0005_calendarfeed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trip",
+            name="first_departure_airport",
+            field=models.CharField(editable=False, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="first_departure_time",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="flight_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="last_arrival_airport",
+            field=models.CharField(editable=False, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="last_arrival_time",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_flight_summaries, migrations.RunPython.noop),
+    ]
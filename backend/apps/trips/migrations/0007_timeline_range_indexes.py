@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:42
+
+import apps.core.indexes
+from django.conf import settings
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0006_trip_flight_summary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # For the owner column of the GiST indexes, a no-op on other databases
+        BtreeGistExtension(),
+        migrations.AddIndex(
+            model_name="flight",
+            index=apps.core.indexes.RangeIndex(
+                condition=models.Q(("is_deleted", False)),
+                fields=["created_by", "departure_time", "arrival_time"],
+                name="flight_owner_times_range_idx",
+                range_function="tstzrange",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=apps.core.indexes.RangeIndex(
+                condition=models.Q(("is_deleted", False)),
+                fields=["created_by", "start_date", "end_date"],
+                name="trip_owner_dates_range_idx",
+                range_function="daterange",
+            ),
+        ),
+    ]
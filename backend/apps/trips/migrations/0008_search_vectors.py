@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:58
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import BtreeGinExtension
+from django.db import migrations
+
+# A copy of search.SEARCH_CONFIG and SEARCH_FIELDS as of this migration
+CONFIG = "simple"
+FIELDS = {
+    "trips_trip": {"name": "A", "destination": "A", "description": "C"},
+    "trips_flight": {
+        "flight_number": "A",
+        "confirmation_number": "A",
+        "airline": "B",
+        "departure_airport": "B",
+        "arrival_airport": "B",
+    },
+}
+
+
+def vector(table, prefix):
+    return " || ".join(
+        f"setweight(to_tsvector('{CONFIG}', coalesce({prefix}{column}, '')), "
+        f"'{weight}')"
+        for column, weight in FIELDS[table].items()
+    )
+
+
+def create_search_triggers(apps, schema_editor):
+    """
+    Fill search_vector with a trigger on every insert and every update of the
+    searched columns, backfill it, and index it with GIN after the owner, so
+    searches only read the user's matching rows. PostgreSQL only.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, fields in FIELDS.items():
+        columns = ", ".join(fields)
+        schema_editor.execute(
+            f"CREATE FUNCTION {table}_search_vector() RETURNS trigger AS $$ "
+            f"BEGIN NEW.search_vector := {vector(table, 'NEW.')}; RETURN NEW; END "
+            f"$$ LANGUAGE plpgsql"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {table}_search_vector "
+            f"BEFORE INSERT OR UPDATE OF {columns} ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {table}_search_vector()"
+        )
+        schema_editor.execute(f"UPDATE {table} SET search_vector = {vector(table, '')}")
+        schema_editor.execute(
+            f"CREATE INDEX {table}_search_idx ON {table} "
+            f"USING gin (created_by_id, search_vector) WHERE NOT is_deleted"
+        )
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in FIELDS:
+        schema_editor.execute(f"DROP INDEX {table}_search_idx")
+        schema_editor.execute(f"DROP TRIGGER {table}_search_vector ON {table}")
+        schema_editor.execute(f"DROP FUNCTION {table}_search_vector()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0007_timeline_range_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        # For the owner column of the GIN indexes, a no-op on other databases
+        BtreeGinExtension(),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
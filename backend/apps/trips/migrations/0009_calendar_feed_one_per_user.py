@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:22
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+from django.utils import timezone
+
+
+def delete_duplicate_feeds(apps, schema_editor):
+    """Keep the oldest active feed of every user, revoking the others."""
+    CalendarFeed = apps.get_model("trips", "CalendarFeed")
+    active = CalendarFeed.objects.filter(is_deleted=False)
+    first_ids = active.values("created_by").annotate(first_id=Min("id"))
+    active.exclude(id__in=first_ids.values("first_id")).update(
+        is_deleted=True, deleted_at=timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0008_search_vectors"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_feeds, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="calendarfeed",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_deleted", False)),
+                fields=("created_by",),
+                name="calendar_feed_one_per_user",
+            ),
+        ),
+    ]
@@ -1,6 +1,27 @@
+import secrets
+
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 import apps.core.models
+from apps.core.indexes import RangeIndex
+
+
+class SearchableManager(
+    models.Manager.from_queryset(apps.core.models.SoftDeleteQuerySet)
+):
+    """
+    Rows without their search_vector, which only search.search() reads, so
+    other queries don't load it into every instance.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
+
+
+class ActiveSearchableManager(SearchableManager):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
 
 
 class Trip(apps.core.models.BaseModel):
@@ -14,6 +35,40 @@ class Trip(apps.core.models.BaseModel):
     start_date = models.DateField()
     end_date = models.DateField()
 
+    # Summary of the trip's active flights, kept up to date by
+    # summaries.refresh_flight_summaries so lists don't read the flights
+    flight_count = models.PositiveIntegerField(default=0, editable=False)
+    first_departure_time = models.DateTimeField(null=True, editable=False)
+    first_departure_airport = models.CharField(
+        max_length=255, null=True, editable=False
+    )
+    last_arrival_time = models.DateTimeField(null=True, editable=False)
+    last_arrival_airport = models.CharField(max_length=255, null=True, editable=False)
+
+    # Filled by a trigger on PostgreSQL and indexed with GIN, see search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ActiveSearchableManager()
+    all_objects = SearchableManager()
+    active = ActiveSearchableManager()
+
+    class Meta:
+        indexes = [
+            # Matches the owner-scoped, keyset-paginated TripViewSet queries
+            models.Index(
+                fields=["created_by", "start_date", "id"],
+                name="trip_owner_start_date_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+            # Matches the date window queries of the timeline
+            RangeIndex(
+                fields=["created_by", "start_date", "end_date"],
+                range_function="daterange",
+                name="trip_owner_dates_range_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -32,7 +87,72 @@ class Flight(apps.core.models.BaseModel):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
 
+    # Filled by a trigger on PostgreSQL and indexed with GIN, see search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ActiveSearchableManager()
+    all_objects = SearchableManager()
+    active = ActiveSearchableManager()
+
+    class Meta:
+        indexes = [
+            # Matches the owner-scoped, keyset-paginated FlightViewSet queries
+            models.Index(
+                fields=["created_by", "departure_time", "id"],
+                name="flight_owner_departure_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+            # Matches `?trip_id=` filtering and the nested flights prefetch
+            models.Index(
+                fields=["trip", "departure_time", "id"],
+                name="flight_trip_departure_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+            # Matches the time window queries of the timeline
+            RangeIndex(
+                fields=["created_by", "departure_time", "arrival_time"],
+                range_function="tstzrange",
+                name="flight_owner_times_range_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so moving a flight also refreshes its previous trip
+        instance._loaded_trip_id = instance.__dict__.get("trip_id")
+        return instance
+
     def __str__(self):
         return (
             f"{self.flight_number}: {self.departure_airport} → {self.arrival_airport}"
         )
+
+
+def new_calendar_feed_token():
+    return secrets.token_urlsafe(32)
+
+
+class CalendarFeed(apps.core.models.BaseModel):
+    """
+    Secret token of a user's iCalendar feed of their trips and flights.
+    Calendar clients poll the feed URL without any other authentication.
+    """
+
+    token = models.CharField(
+        max_length=64, unique=True, default=new_calendar_feed_token, editable=False
+    )
+
+    class Meta:
+        constraints = [
+            # One feed per user, so rotating its token revokes the only URL
+            models.UniqueConstraint(
+                fields=["created_by"],
+                condition=models.Q(is_deleted=False),
+                name="calendar_feed_one_per_user",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Calendar feed of {self.created_by}"
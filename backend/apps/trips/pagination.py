@@ -0,0 +1,131 @@
+# backend/apps/trips/pagination.py
+
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class OwnerCursorPagination(CursorPagination):
+    """
+    Keyset pagination with opaque cursors. Clients can request a smaller or
+    larger page with `?page_size=`, capped at API_MAX_PAGE_SIZE.
+
+    DRF's cursors only hold the first ordering field and an offset into the
+    rows sharing it, so pages within many rows on the same date are OFFSET
+    scans, and rows are skipped or repeated when the tied rows change. These
+    cursors hold every ordering field of the row they continue from, and the
+    next page is read with `(start_date, id) > (last_start_date, last_id)`
+    from the owner-scoped index on the ordering. The ordering must be
+    ascending and end with a unique field, so positions are unique and DRF's
+    links never need an offset.
+    """
+
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Like CursorPagination.paginate_queryset, filtering on all fields of
+        # the position instead of the first one plus an offset
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor is not None else None
+
+        queryset = self.get_page_queryset(queryset, position, reverse)
+        # The extra row tells whether a page follows this one
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = following_position is not None
+            self.next_position = position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = position is not None
+            self.next_position = following_position
+            self.previous_position = position
+
+        self.display_page_controls = self.has_previous or self.has_next
+        return self.page
+
+    def get_page_queryset(self, queryset, position=None, reverse=False):
+        """
+        Return the rows of the page at a cursor position, in page order and
+        not sliced yet.
+
+        Args:
+            queryset: The rows to paginate.
+            position: The position the page continues from, or None for the
+                first page.
+            reverse: Whether the page is before the position.
+        """
+        if reverse:
+            queryset = queryset.order_by(*[f"-{field}" for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self._beyond(queryset.model, position, reverse))
+        return queryset
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = [
+            instance[field] if isinstance(instance, dict) else getattr(instance, field)
+            for field in ordering
+        ]
+        return json.dumps([str(value) for value in values])
+
+    def _beyond(self, model, position, reverse):
+        """
+        Return the filter for the rows after a position, or before it when
+        paging backwards, e.g. for (start_date, id):
+        `start_date >= x AND (start_date > x OR (start_date = x AND id > y))`.
+        The leading bound lets the index seek straight to the position.
+
+        Raises:
+            NotFound: If the position doesn't match the ordering.
+        """
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError(position)
+            values = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        lookup = "lt" if reverse else "gt"
+        fields = list(zip(self.ordering, values))
+        beyond = Q()
+        for i, (field, value) in enumerate(fields):
+            beyond |= Q(*fields[:i], **{f"{field}__{lookup}": value})
+        first, value = fields[0]
+        return Q(**{f"{first}__{lookup}e": value}) & beyond
+
+
+class TripCursorPagination(OwnerCursorPagination):
+    ordering = ("start_date", "id")
+
+
+class FlightCursorPagination(OwnerCursorPagination):
+    ordering = ("departure_time", "id")
@@ -0,0 +1,100 @@
+# backend/apps/trips/search.py
+
+import functools
+import operator
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+from .models import Flight, Trip
+
+# The text search configuration of the search_vector columns. "simple"
+# doesn't stem or drop stop words, so names, codes and airports match as
+# typed, in any language.
+SEARCH_CONFIG = "simple"
+
+# The searched columns with their weight, from "A" (highest) to "D". On
+# PostgreSQL the triggers of migration 0008 build the search_vector columns
+# from a copy of these, so changing them needs a new migration.
+SEARCH_FIELDS = {
+    Trip: {"name": "A", "destination": "A", "description": "C"},
+    Flight: {
+        "flight_number": "A",
+        "confirmation_number": "A",
+        "airline": "B",
+        "departure_airport": "B",
+        "arrival_airport": "B",
+    },
+}
+
+# The default weights of PostgreSQL's ts_rank, used by the fallback ranking
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+# Terms beyond this are ignored
+MAX_TERMS = 10
+
+
+def search_terms(query) -> list[str]:
+    """
+    Split a search query into lowercase terms of letters and digits, so they
+    are safe to use in a raw tsquery.
+
+    Args:
+        query: The search query as typed, e.g. "ua 123".
+
+    Returns:
+        list: At most MAX_TERMS terms.
+    """
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def search(queryset, terms):
+    """
+    Filter trips or flights to the ones matching all of the terms, and
+    annotate them with their `rank`, higher for better matches.
+
+    On PostgreSQL each term matches the start of a word, e.g. "ber" matches
+    "Berlin", with the owner-scoped GIN index of the search_vector column
+    and ranked with ts_rank. Other databases match the terms anywhere in
+    the fields with LIKE, which scans the user's rows, and rank with the
+    same weights.
+
+    Args:
+        queryset: The trips or flights to search.
+        terms: The terms from search_terms(), at least one.
+
+    Returns:
+        QuerySet: The matching rows, with a `rank` annotation.
+    """
+    fields = SEARCH_FIELDS[queryset.model]
+    if connections[queryset.db].vendor == "postgresql":
+        query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            config=SEARCH_CONFIG,
+            search_type="raw",
+        )
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F("search_vector"), query)
+        )
+
+    for term in terms:
+        queryset = queryset.filter(
+            functools.reduce(
+                operator.or_, [Q(**{f"{field}__icontains": term}) for field in fields]
+            )
+        )
+    rank = sum(
+        (
+            Case(
+                When(Q(**{f"{field}__icontains": term}), then=Value(WEIGHTS[weight])),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+            for term in terms
+            for field, weight in fields.items()
+        ),
+        Value(0.0),
+    )
+    return queryset.annotate(rank=rank)
@@ -2,6 +2,40 @@
 
 from rest_framework import serializers
 from .models import Trip, Flight
+from .summaries import SUMMARY_FIELDS, refresh_flight_summaries
+
+
+def validate_flight_times(data, instance=None):
+    """
+    Validate that a flight doesn't arrive before it departs.
+
+    Args:
+        data: The validated fields, which may be partial.
+        instance: The flight being updated, for the fields missing from data.
+
+    Raises:
+        ValidationError: If the arrival is before the departure.
+    """
+    departure_time = data.get(
+        "departure_time", getattr(instance, "departure_time", None)
+    )
+    arrival_time = data.get("arrival_time", getattr(instance, "arrival_time", None))
+    if departure_time and arrival_time and arrival_time < departure_time:
+        raise serializers.ValidationError(
+            {"arrival_time": "Ensure the arrival is not before the departure."}
+        )
+
+
+class FlightListSerializer(serializers.ListSerializer):
+    """Creates a list of validated flights with a single bulk INSERT."""
+
+    def create(self, validated_data):
+        user = self.context["request"].user
+        flights = [Flight(created_by=user, **item) for item in validated_data]
+        flights = Flight.objects.bulk_create(flights)
+        # bulk_create does not send post_save signals
+        refresh_flight_summaries({flight.trip_id for flight in flights})
+        return flights
 
 
 class FlightSerializer(serializers.ModelSerializer):
@@ -25,9 +59,14 @@ class FlightSerializer(serializers.ModelSerializer):
             "arrival_time",
         ]
         read_only_fields = ["created_at", "updated_at", "created_by"]
+        list_serializer_class = FlightListSerializer
 
     def validate(self, data):
-        """Validate the entire object."""
+        """
+        Validate the entire object.
+        When the context provides `owned_trip_ids`, e.g. for bulk creation,
+        trip_id is checked against that set instead of querying the database.
+        """
         # Validate that either trip or trip_id is provided
         if "trip" not in data and "trip_id" not in data:
             raise serializers.ValidationError(
@@ -35,11 +74,12 @@ class FlightSerializer(serializers.ModelSerializer):
             )
 
         # Validate trip_id if provided
-        if "trip_id" in data and not Trip.objects.filter(id=data["trip_id"]).exists():
+        if "trip_id" in data and not self._trip_exists(data["trip_id"]):
             raise serializers.ValidationError(
                 {"trip_id": f"Trip id {data['trip_id']} does not exist."}
             )
 
+        validate_flight_times(data, self.instance)
         return data
 
     def create(self, validated_data):
@@ -47,18 +87,31 @@ class FlightSerializer(serializers.ModelSerializer):
         user = self.context["request"].user
         validated_data["created_by"] = user
 
-        # Get the trip object using the trip_id if provided
-        if "trip_id" in validated_data:
-            trip_id = validated_data.pop("trip_id")
-            trip = Trip.objects.get(id=trip_id)
-            validated_data["trip"] = trip
-
+        # The trip_id was validated, so it is passed to the model as-is
+        # instead of loading the Trip again
         return super().create(validated_data)
 
+    def _trip_exists(self, trip_id):
+        owned_trip_ids = self.context.get("owned_trip_ids")
+        if owned_trip_ids is not None:
+            return trip_id in owned_trip_ids
+        return Trip.objects.filter(id=trip_id).exists()
+
 
 class TripSerializer(serializers.ModelSerializer):
     flights = FlightSerializer(many=True, read_only=True)
 
+    def __init__(self, *args, fields=None, **kwargs):
+        """
+        Args:
+            fields: Optional names of the fields to include in the
+                representation, e.g. from a `?fields=` query parameter.
+        """
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     class Meta:
         model = Trip
         fields = [
@@ -70,6 +123,7 @@ class TripSerializer(serializers.ModelSerializer):
             "end_date",
             "created_at",
             "updated_at",
+            *SUMMARY_FIELDS,
             "flights",
         ]
         read_only_fields = ["created_at", "updated_at", "created_by"]
@@ -80,3 +134,40 @@ class TripSerializer(serializers.ModelSerializer):
         validated_data["created_by"] = user
 
         return super().create(validated_data)
+
+
+class FlightImportSerializer(serializers.ModelSerializer):
+    """Validates an imported flight, which gets its trip from the import."""
+
+    class Meta:
+        model = Flight
+        fields = [
+            "airline",
+            "confirmation_number",
+            "flight_number",
+            "departure_airport",
+            "arrival_airport",
+            "departure_time",
+            "arrival_time",
+        ]
+
+    def validate(self, data):
+        validate_flight_times(data)
+        return data
+
+
+class TripImportSerializer(serializers.ModelSerializer):
+    """Validates an imported trip with its flights."""
+
+    flights = FlightImportSerializer(many=True, required=False)
+
+    class Meta:
+        model = Trip
+        fields = [
+            "name",
+            "description",
+            "destination",
+            "start_date",
+            "end_date",
+            "flights",
+        ]
@@ -0,0 +1,51 @@
+# backend/apps/trips/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.signals import bulk_changed
+from .cache import invalidate_user_responses
+from .models import Flight, Trip
+from .summaries import refresh_flight_summaries
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Trip)
+@receiver(post_delete, sender=Flight)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    """
+    Invalidate the owner's cached responses when a trip or flight changes.
+    Soft deletion and restoration go through save() and are covered too.
+    """
+    invalidate_user_responses(instance.created_by_id)
+
+
+@receiver(bulk_changed, sender=Trip)
+@receiver(bulk_changed, sender=Flight)
+def invalidate_cached_responses_in_bulk(sender, created_by_ids, **kwargs):
+    """
+    Invalidate the owners' cached responses after a queryset-level soft
+    delete, restore or erase, e.g. the flights of a deleted trip.
+    """
+    for user_id in created_by_ids:
+        invalidate_user_responses(user_id)
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def refresh_trip_summary(sender, instance, **kwargs):
+    """
+    Refresh the flight summary of the flight's trip, and of its previous trip
+    when the flight was moved. Soft deletion and restoration are saves too.
+    """
+    trip_ids = {instance.trip_id, getattr(instance, "_loaded_trip_id", None)}
+    refresh_flight_summaries(trip_ids - {None})
+    instance._loaded_trip_id = instance.trip_id
+
+
+@receiver(bulk_changed, sender=Flight)
+def refresh_trip_summaries_in_bulk(sender, parent_ids, **kwargs):
+    """Refresh the flight summaries of the trips of bulk changed flights."""
+    if parent_ids["trip"]:
+        refresh_flight_summaries(parent_ids["trip"])
@@ -0,0 +1,45 @@
+# backend/apps/trips/summaries.py
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Flight, Trip
+
+SUMMARY_FIELDS = [
+    "flight_count",
+    "first_departure_time",
+    "first_departure_airport",
+    "last_arrival_time",
+    "last_arrival_airport",
+]
+
+
+def refresh_flight_summaries(trip_ids) -> int:
+    """
+    Recompute the flight summary columns of the given trips from their active
+    flights, with a single UPDATE of correlated subqueries.
+
+    The trips' updated_at is bumped too, so the ETags of trip lists, which
+    don't read the flights table, change with the summaries.
+
+    Args:
+        trip_ids: The ids of the trips, as an iterable or a `values("pk")`
+            queryset.
+
+    Returns:
+        int: The number of trips updated.
+    """
+    flights = Flight.objects.filter(trip=OuterRef("pk")).order_by()
+    first = flights.order_by("departure_time", "id")
+    last = flights.order_by("-arrival_time", "-id")
+    count = flights.values("trip").annotate(count=Count("pk")).values("count")
+
+    return Trip.all_objects.filter(pk__in=trip_ids).update(
+        flight_count=Coalesce(Subquery(count), 0),
+        first_departure_time=Subquery(first.values("departure_time")[:1]),
+        first_departure_airport=Subquery(first.values("departure_airport")[:1]),
+        last_arrival_time=Subquery(last.values("arrival_time")[:1]),
+        last_arrival_airport=Subquery(last.values("arrival_airport")[:1]),
+        updated_at=timezone.now(),
+    )
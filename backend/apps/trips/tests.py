@@ -1,11 +1,47 @@
+import base64
+import csv
+import importlib
+import itertools
+import json
+import random
+
 import pytest
+from asgiref.sync import async_to_sync
+from django.apps import apps as django_apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Prefetch
+from django.http import Http404
+from django.test import AsyncRequestFactory, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIRequestFactory, force_authenticate
-from datetime import date
-
-from .models import Trip, Flight
+import time
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from io import StringIO
+from urllib.parse import urlencode
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from apps.core.indexes import RangeIndex
+
+from .cache import response_cache
+from .calendar import build_feed, get_or_create_feed
+from .conflicts import flight_conflicts, overlapping_flights, overlapping_pairs
+from .fast_serializers import FastSerializer
+from .importers import ItineraryImporter
+from .models import CalendarFeed, Trip, Flight
+from .pagination import TripCursorPagination
+from .search import SEARCH_CONFIG, SEARCH_FIELDS, search, search_terms
 from .serializers import TripSerializer, FlightSerializer
-from .views import TripViewSet, FlightViewSet
+from .timeline import flights_in_window, merge_timeline, trips_in_window, window_times
+from .views import TripViewSet, FlightViewSet, calendar_ics
+from .async_views import AsyncTripView, AsyncFlightView
 
 User = get_user_model()
 
@@ -46,6 +82,32 @@ def api_request_factory():
     return APIRequestFactory()
 
 
+@pytest.fixture
+def postgresql():
+    """
+    Register a PostgreSQL connection that is never opened, to compile the
+    queries of the PostgreSQL-only code paths with `.using(postgresql)`.
+    """
+    pytest.importorskip("psycopg")
+    from django.db.backends.postgresql.base import DatabaseWrapper
+
+    alias = "compile-postgresql"
+    settings_dict = {
+        **connections["default"].settings_dict,
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": "travel_stream",
+        "OPTIONS": {},
+    }
+    connections[alias] = DatabaseWrapper(settings_dict, alias=alias)
+    yield alias
+    del connections[alias]
+
+
+def compile_sql(queryset):
+    """Return the SQL and parameters of a queryset, without running it."""
+    return queryset.query.get_compiler(using=queryset.db).as_sql()
+
+
 class TestTripViewSet:
     @pytest.mark.django_db
     def test_list_requires_authentication(self, api_request_factory):
@@ -68,8 +130,12 @@ class TestTripViewSet:
         response = view(request)
 
         assert response.status_code == 200, "Authenticated request should return 200"
-        assert len(response.data) == 1, "Should only return trips owned by the user"
-        assert response.data[0]["id"] == trip.id, "Should return the correct trip"
+        assert (
+            len(response.data["results"]) == 1
+        ), "Should only return trips owned by the user"
+        assert (
+            response.data["results"][0]["id"] == trip.id
+        ), "Should return the correct trip"
 
     @pytest.mark.django_db
     def test_retrieve_own_trip(self, user, trip, api_request_factory):
@@ -93,6 +159,413 @@ class TestTripViewSet:
             response.status_code == 404
         ), "User should not be able to retrieve other user's trip"
 
+    @pytest.mark.django_db
+    def test_list_query_count_is_constant(
+        self, user, trip_data, api_request_factory, django_assert_num_queries
+    ):
+        """Test that listing trips does not run one flight query per trip."""
+        view = TripViewSet.as_view({"get": "list"})
+
+        def create_trips_with_flights(count):
+            for _ in range(count):
+                new_trip = Trip.objects.create(created_by=user, **trip_data)
+                Flight.objects.create(
+                    created_by=user,
+                    trip=new_trip,
+                    airline="Test Airline",
+                    flight_number="TA123",
+                    departure_airport="SFO",
+                    arrival_airport="JFK",
+                    departure_time="2023-01-01T08:00:00Z",
+                    arrival_time="2023-01-01T16:00:00Z",
+                )
+
+        create_trips_with_flights(2)
+        request = api_request_factory.get("/api/trips/?expand=flights")
+        force_authenticate(request, user=user)
+        # Validator aggregate, trips page and prefetched flights
+        with django_assert_num_queries(3):
+            response = view(request)
+        assert len(response.data["results"]) == 2
+
+        create_trips_with_flights(8)
+        request = api_request_factory.get("/api/trips/?expand=flights")
+        force_authenticate(request, user=user)
+        with django_assert_num_queries(3):
+            response = view(request)
+        assert len(response.data["results"]) == 10
+
+    @pytest.mark.django_db
+    def test_retrieve_excludes_deleted_flights(
+        self, user, trip, flight, api_request_factory
+    ):
+        """Test that soft-deleted flights are not nested in the trip."""
+        flight.delete()
+
+        request = api_request_factory.get(f"/api/trips/{trip.id}/")
+        force_authenticate(request, user=user)
+        view = TripViewSet.as_view({"get": "retrieve"})
+        response = view(request, pk=trip.id)
+
+        assert response.status_code == 200
+        assert response.data["flights"] == [], "Deleted flights should be excluded"
+
+    @pytest.mark.django_db
+    def test_list_is_cursor_paginated(self, user, trip_data, api_request_factory):
+        """Test that trips are paginated by start date with opaque cursors."""
+        for day in range(1, 6):
+            Trip.objects.create(
+                created_by=user, **{**trip_data, "start_date": date(2023, 1, day)}
+            )
+        view = TripViewSet.as_view({"get": "list"})
+
+        request = api_request_factory.get("/api/trips/?page_size=3")
+        force_authenticate(request, user=user)
+        first_page = view(request)
+
+        assert [t["start_date"] for t in first_page.data["results"]] == [
+            "2023-01-01",
+            "2023-01-02",
+            "2023-01-03",
+        ]
+        assert first_page.data["next"] is not None
+
+        request = api_request_factory.get(first_page.data["next"])
+        force_authenticate(request, user=user)
+        second_page = view(request)
+
+        assert [t["start_date"] for t in second_page.data["results"]] == [
+            "2023-01-04",
+            "2023-01-05",
+        ]
+        assert second_page.data["next"] is None
+
+    @pytest.mark.django_db
+    def test_list_pages_through_trips_on_the_same_date(
+        self, user, trip_data, api_request_factory
+    ):
+        """Test that the cursor holds (start_date, id), not an offset."""
+        trips = [Trip.objects.create(created_by=user, **trip_data) for _ in range(10)]
+        view = TripViewSet.as_view({"get": "list"})
+
+        def get(url):
+            request = api_request_factory.get(url)
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as queries:
+                response = view(request)
+            assert response.status_code == 200, response.data
+            assert not any("OFFSET" in q["sql"] for q in queries.captured_queries)
+            return response.data
+
+        first_page = get("/api/trips/?page_size=3")
+        # Rows deleted behind the cursor don't shift the next page
+        trips[0].delete()
+        second_page = get(first_page["next"])
+
+        assert [t["id"] for t in first_page["results"]] == [t.id for t in trips[:3]]
+        assert [t["id"] for t in second_page["results"]] == [t.id for t in trips[3:6]]
+
+        ids = [t["id"] for t in second_page["results"]]
+        page = second_page
+        while page["next"]:
+            page = get(page["next"])
+            ids.extend(t["id"] for t in page["results"])
+        assert ids == [t.id for t in trips[3:]]
+
+        previous_page = get(second_page["previous"])
+        assert [t["id"] for t in previous_page["results"]] == [t.id for t in trips[1:3]]
+
+    @pytest.mark.django_db
+    def test_list_rejects_invalid_cursor_positions(
+        self, user, trip, api_request_factory
+    ):
+        """Test that cursors with a malformed position are rejected."""
+        view = TripViewSet.as_view({"get": "list"})
+        for position in ["2023-01-01", '["2023-01-01"]', '["not a date", "1"]']:
+            cursor = base64.b64encode(urlencode({"p": position}).encode()).decode()
+            request = api_request_factory.get(f"/api/trips/?cursor={cursor}")
+            force_authenticate(request, user=user)
+
+            assert view(request).status_code == 404, position
+
+    @pytest.mark.django_db
+    def test_list_page_size_is_capped(self, user, trip_data, api_request_factory):
+        """Test that clients cannot request more than the maximum page size."""
+        for _ in range(3):
+            Trip.objects.create(created_by=user, **trip_data)
+        request = api_request_factory.get("/api/trips/?page_size=1000")
+        force_authenticate(request, user=user)
+        view = TripViewSet.as_view({"get": "list"})
+
+        with patch.object(TripCursorPagination, "max_page_size", 2):
+            response = view(request)
+
+        assert len(response.data["results"]) == 2
+
+
+class TestTripRepresentationFields:
+    @staticmethod
+    def get(api_request_factory, user, path, pk=None):
+        request = api_request_factory.get(path)
+        force_authenticate(request, user=user)
+        action = "list" if pk is None else "retrieve"
+        view = TripViewSet.as_view({"get": action})
+        return view(request) if pk is None else view(request, pk=pk)
+
+    @pytest.mark.django_db
+    def test_list_omits_flights_by_default(
+        self, user, trip, flight, api_request_factory, django_assert_num_queries
+    ):
+        """Test that lists skip the nested flights and their prefetch query."""
+        # Validator aggregate and trips page
+        with django_assert_num_queries(2):
+            response = self.get(api_request_factory, user, "/api/trips/")
+
+        assert "flights" not in response.data["results"][0]
+        assert response.data["results"][0]["name"] == trip.name
+
+    @pytest.mark.django_db
+    def test_expand_flights(self, user, trip, flight, api_request_factory):
+        """Test that `?expand=flights` nests the flights in lists."""
+        response = self.get(api_request_factory, user, "/api/trips/?expand=flights")
+
+        assert [f["id"] for f in response.data["results"][0]["flights"]] == [flight.id]
+
+    @pytest.mark.django_db
+    def test_retrieve_includes_flights_by_default(
+        self, user, trip, flight, api_request_factory
+    ):
+        """Test that single trips keep their full representation."""
+        response = self.get(
+            api_request_factory, user, f"/api/trips/{trip.id}/", trip.id
+        )
+
+        assert set(response.data) == set(TripSerializer.Meta.fields)
+
+    @pytest.mark.django_db
+    def test_sparse_fieldset_narrows_sql(
+        self, user, trip, api_request_factory, django_assert_num_queries
+    ):
+        """Test that `?fields=` narrows both the payload and the selected columns."""
+        with django_assert_num_queries(2) as captured:
+            response = self.get(
+                api_request_factory, user, "/api/trips/?fields=name,destination"
+            )
+
+        assert set(response.data["results"][0]) == {"name", "destination"}
+        select = captured.captured_queries[-1]["sql"]
+        assert '"description"' not in select, "Unrequested columns are deferred"
+
+    @pytest.mark.django_db
+    def test_unknown_field_is_rejected(self, user, trip, api_request_factory):
+        """Test that unknown fields and expansions return 400."""
+        for query in ("fields=name,password", "expand=trip"):
+            response = self.get(api_request_factory, user, f"/api/trips/?{query}")
+
+            assert response.status_code == 400, query
+
+
+class TestConditionalGet:
+    @staticmethod
+    def get(api_request_factory, user, viewset, action, path, pk=None, **headers):
+        request = api_request_factory.get(path, **headers)
+        force_authenticate(request, user=user)
+        view = viewset.as_view({"get": action})
+        return view(request) if pk is None else view(request, pk=pk)
+
+    @pytest.mark.django_db
+    def test_responses_carry_validators(self, user, trip, api_request_factory):
+        """Test that list and detail responses have ETag and Last-Modified."""
+        for action, pk in (("list", None), ("retrieve", trip.id)):
+            response = self.get(
+                api_request_factory, user, TripViewSet, action, "/api/trips/", pk
+            )
+
+            assert response.status_code == 200
+            assert response.headers["ETag"].startswith('"')
+            assert "Last-Modified" in response.headers
+            assert "no-cache" in response.headers["Cache-Control"]
+
+    @pytest.mark.django_db
+    def test_matching_etag_returns_not_modified(
+        self, user, trip, flight, api_request_factory, django_assert_num_queries
+    ):
+        """Test that a matching If-None-Match skips serialization."""
+        etag = self.get(
+            api_request_factory, user, TripViewSet, "list", "/api/trips/"
+        ).headers["ETag"]
+
+        # Only the validator aggregate runs
+        with django_assert_num_queries(1):
+            response = self.get(
+                api_request_factory,
+                user,
+                TripViewSet,
+                "list",
+                "/api/trips/",
+                HTTP_IF_NONE_MATCH=etag,
+            )
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert not response.content
+
+    @pytest.mark.django_db
+    def test_if_modified_since_returns_not_modified(
+        self, user, flight, api_request_factory
+    ):
+        """Test that an unchanged flight is not sent again."""
+        last_modified = self.get(
+            api_request_factory,
+            user,
+            FlightViewSet,
+            "retrieve",
+            f"/api/flights/{flight.id}/",
+            flight.id,
+        ).headers["Last-Modified"]
+
+        response = self.get(
+            api_request_factory,
+            user,
+            FlightViewSet,
+            "retrieve",
+            f"/api/flights/{flight.id}/",
+            flight.id,
+            HTTP_IF_MODIFIED_SINCE=last_modified,
+        )
+
+        assert response.status_code == 304
+
+    @pytest.mark.django_db
+    def test_nested_flight_changes_invalidate_trip_etag(
+        self, user, trip, flight, api_request_factory
+    ):
+        """Test that updating or deleting a nested flight changes the trip ETag."""
+        etags = set()
+        for change in (None, "update", "delete"):
+            if change == "update":
+                flight.airline = "Other Airline"
+                flight.save()
+            elif change == "delete":
+                flight.delete()
+            for action, pk in (("list", None), ("retrieve", trip.id)):
+                response = self.get(
+                    api_request_factory, user, TripViewSet, action, "/api/trips/", pk
+                )
+                etags.add(response.headers["ETag"])
+
+        assert len(etags) == 6, "Every change should produce new validators"
+
+    @pytest.mark.django_db
+    def test_etag_depends_on_query_string(self, user, trip, api_request_factory):
+        """Test that different pages of the same list have different ETags."""
+        first = self.get(api_request_factory, user, TripViewSet, "list", "/api/trips/")
+        second = self.get(
+            api_request_factory, user, TripViewSet, "list", "/api/trips/?page_size=1"
+        )
+
+        assert first.headers["ETag"] != second.headers["ETag"]
+
+    @pytest.mark.django_db
+    def test_missing_object_is_not_found(self, user, another_trip, api_request_factory):
+        """Test that conditional headers don't hide other users' trips."""
+        response = self.get(
+            api_request_factory,
+            user,
+            TripViewSet,
+            "retrieve",
+            f"/api/trips/{another_trip.id}/",
+            another_trip.id,
+            HTTP_IF_NONE_MATCH="*",
+        )
+
+        assert response.status_code == 404
+
+
+@pytest.fixture
+def clear_response_cache():
+    cache.clear()
+    response_cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.usefixtures("clear_response_cache")
+class TestResponseCache:
+    @staticmethod
+    def list_trips(api_request_factory, user):
+        request = api_request_factory.get("/api/trips/?expand=flights")
+        force_authenticate(request, user=user)
+        return TripViewSet.as_view({"get": "list"})(request)
+
+    @pytest.mark.django_db
+    def test_repeated_list_is_served_from_cache(
+        self, user, trip, flight, api_request_factory, django_assert_num_queries
+    ):
+        """Test that re-opening the same list only runs the validator query."""
+        first = self.list_trips(api_request_factory, user)
+
+        with django_assert_num_queries(1):
+            second = self.list_trips(api_request_factory, user)
+
+        assert second.data == first.data
+        assert response_cache.stats()["hits"] == 1
+        assert response_cache.stats()["misses"] == 1
+        assert response_cache.stats()["hit_rate"] == 0.5
+
+    @pytest.mark.django_db
+    def test_writes_invalidate_cached_list(
+        self, user, trip, flight, flight_data, api_request_factory
+    ):
+        """Test that saves, soft deletes, restores and bulk creates invalidate."""
+        self.list_trips(api_request_factory, user)
+
+        def nested_flight_ids():
+            response = self.list_trips(api_request_factory, user)
+            return [f["id"] for f in response.data["results"][0]["flights"]]
+
+        flight.delete()
+        assert nested_flight_ids() == []
+
+        flight.restore()
+        assert nested_flight_ids() == [flight.id]
+
+        request = api_request_factory.post(
+            "/api/flights/bulk/", [flight_data], format="json"
+        )
+        force_authenticate(request, user=user)
+        FlightViewSet.as_view({"post": "bulk_create"})(request)
+        assert len(nested_flight_ids()) == 2
+
+        stats = response_cache.stats()
+        assert stats["hits"] == 0, "Every write should invalidate"
+        assert stats["invalidations"] >= 3, "Signals should bump the version"
+
+    @pytest.mark.django_db
+    def test_stale_entry_is_not_served_without_invalidation(
+        self, user, trip, api_request_factory
+    ):
+        """Test that entries are checked against the current ETag."""
+        self.list_trips(api_request_factory, user)
+
+        # A queryset update sends no signals, like a write in another worker
+        Trip.objects.filter(pk=trip.pk).update(
+            name="Renamed Trip", updated_at=timezone.now()
+        )
+        response = self.list_trips(api_request_factory, user)
+
+        assert response.data["results"][0]["name"] == "Renamed Trip"
+
+    @pytest.mark.django_db
+    def test_users_do_not_share_entries(
+        self, user, another_user, trip, another_trip, api_request_factory
+    ):
+        """Test that cached responses are per user."""
+        self.list_trips(api_request_factory, user)
+        response = self.list_trips(api_request_factory, another_user)
+
+        assert [t["id"] for t in response.data["results"]] == [another_trip.id]
+
 
 class TestTripSerializer:
     @pytest.mark.django_db
@@ -180,7 +653,7 @@ class TestFlightViewSet:
 
         assert response.status_code == 200, "Authenticated request should return 200"
         # Get all IDs from the response
-        flight_ids = [f["id"] for f in response.data]
+        flight_ids = [f["id"] for f in response.data["results"]]
 
         # Ensure our flight is included
         assert flight.id in flight_ids, "Should include the user's flight"
@@ -247,9 +720,89 @@ class TestFlightViewSet:
 
         assert response.status_code == 200
         assert (
-            len(response.data) == 1
+            len(response.data["results"]) == 1
         ), "Should only return flights for the specified trip"
-        assert response.data[0]["id"] == flight.id, "Should return the correct flight"
+        assert (
+            response.data["results"][0]["id"] == flight.id
+        ), "Should return the correct flight"
+
+
+class TestFlightBulkCreate:
+    @staticmethod
+    def post(api_request_factory, user, data):
+        request = api_request_factory.post("/api/flights/bulk/", data, format="json")
+        force_authenticate(request, user=user)
+        view = FlightViewSet.as_view({"post": "bulk_create"})
+        return view(request)
+
+    @pytest.mark.django_db
+    def test_creates_flights_for_multiple_trips(
+        self,
+        user,
+        trip,
+        flight_data,
+        api_request_factory,
+        django_assert_max_num_queries,
+    ):
+        """Test that a list of flights is created with a constant query count."""
+        second_trip = Trip.objects.create(
+            created_by=user,
+            name="Second Trip",
+            destination="Another Destination",
+            start_date=date(2023, 2, 1),
+            end_date=date(2023, 2, 7),
+        )
+        data = [flight_data] * 5 + [{**flight_data, "trip_id": second_trip.id}] * 5
+
+        # Ownership check, INSERT, the trips' summary UPDATE and the
+        # transaction's savepoint queries
+        with django_assert_max_num_queries(5):
+            response = self.post(api_request_factory, user, data)
+
+        assert response.status_code == 201, response.data
+        assert len(response.data) == 10
+        assert Flight.objects.filter(trip=trip, created_by=user).count() == 5
+        assert Flight.objects.filter(trip=second_trip, created_by=user).count() == 5
+
+    @pytest.mark.django_db
+    def test_accepts_trip_as_alias_of_trip_id(
+        self, user, trip, flight_data, api_request_factory
+    ):
+        """Test that items can reference their trip with `trip`."""
+        item = {k: v for k, v in flight_data.items() if k != "trip_id"}
+        item["trip"] = trip.id
+
+        response = self.post(api_request_factory, user, [item])
+
+        assert response.status_code == 201, response.data
+        assert response.data[0]["trip"] == trip.id
+
+    @pytest.mark.django_db
+    def test_returns_per_item_errors_and_creates_nothing(
+        self, user, flight_data, another_trip, api_request_factory
+    ):
+        """Test that invalid items are reported by position and nothing is saved."""
+        data = [
+            flight_data,
+            {**flight_data, "trip_id": another_trip.id},
+            {**flight_data, "airline": ""},
+        ]
+
+        response = self.post(api_request_factory, user, data)
+
+        assert response.status_code == 400, response.data
+        assert len(response.data) == len(data)
+        assert response.data[0] == {}, "Valid items have no errors"
+        assert set(response.data[1]) == {"trip_id"}, "Other users' trips are rejected"
+        assert set(response.data[2]) == {"airline"}
+        assert not Flight.objects.exists()
+
+    @pytest.mark.django_db
+    def test_rejects_non_list_payload(self, user, flight_data, api_request_factory):
+        """Test that the endpoint only accepts a list of flights."""
+        response = self.post(api_request_factory, user, flight_data)
+
+        assert response.status_code == 400
 
 
 class TestFlightSerializer:
@@ -342,3 +895,1536 @@ class TestFlightSerializer:
         assert (
             "trip_id" in serializer.errors
         ), "Serializer should have an error for trip_id"
+
+
+def create_trips_with_flights(user, trip_count, flights_per_trip):
+    """Bulk create trips with flights for serializer comparisons."""
+    trips = Trip.objects.bulk_create(
+        Trip(
+            created_by=user,
+            name=f"Trip {i}",
+            description=None if i % 2 else f"Description {i}",
+            destination="Test Destination",
+            start_date=date(2023, 1, 1) + timedelta(days=i % 365),
+            end_date=date(2023, 1, 8) + timedelta(days=i % 365),
+        )
+        for i in range(trip_count)
+    )
+    departure = timezone.make_aware(datetime(2023, 1, 1, 8, 0, 0, 123456))
+    Flight.objects.bulk_create(
+        Flight(
+            created_by=user,
+            trip=trip,
+            airline="Test Airline",
+            confirmation_number=None if j % 2 else "ABC123",
+            flight_number=f"TA{j}",
+            departure_airport="SFO",
+            arrival_airport="JFK",
+            departure_time=departure + timedelta(hours=j),
+            arrival_time=departure + timedelta(hours=j + 8),
+            is_deleted=j == 2,
+        )
+        for trip in trips
+        for j in range(flights_per_trip)
+    )
+    return trips
+
+
+def flights_queryset():
+    return Flight.objects.order_by("departure_time", "id")
+
+
+def drf_trips(queryset, fields=None):
+    queryset = queryset.prefetch_related(
+        Prefetch("flights", queryset=flights_queryset())
+    )
+    return TripSerializer(queryset, many=True, fields=fields).data
+
+
+def fast_trips(queryset, fields=None):
+    fast = FastSerializer(
+        TripSerializer(fields=fields), {"flights": flights_queryset()}
+    )
+    return fast.serialize(fast.values(queryset))
+
+
+class TestFastSerializer:
+    @pytest.mark.django_db
+    def test_trips_output_is_identical(self, user):
+        """Test that the fast path renders byte-identical trips and flights."""
+        create_trips_with_flights(user, 5, 4)
+        queryset = Trip.objects.order_by("id")
+
+        assert JSONRenderer().render(fast_trips(queryset)) == JSONRenderer().render(
+            drf_trips(queryset)
+        )
+
+    @pytest.mark.django_db
+    def test_sparse_fieldset_output_is_identical(self, user):
+        """Test that the fast path honours the requested fields."""
+        create_trips_with_flights(user, 3, 1)
+        queryset = Trip.objects.order_by("id")
+        fields = ["name", "start_date", "updated_at"]
+
+        assert fast_trips(queryset, fields) == drf_trips(queryset, fields)
+
+    @pytest.mark.django_db
+    def test_flights_output_is_identical(self, user):
+        """Test that the fast path renders flights like FlightSerializer."""
+        create_trips_with_flights(user, 2, 3)
+        queryset = Flight.objects.order_by("id")
+        fast = FastSerializer(FlightSerializer())
+
+        assert JSONRenderer().render(
+            fast.serialize(fast.values(queryset))
+        ) == JSONRenderer().render(FlightSerializer(queryset, many=True).data)
+
+    @pytest.mark.django_db
+    def test_nested_flights_use_one_query(self, user, django_assert_num_queries):
+        """Test that trips and their nested flights take two queries."""
+        create_trips_with_flights(user, 10, 3)
+
+        with django_assert_num_queries(2):
+            data = fast_trips(Trip.objects.all())
+
+        assert all(len(trip["flights"]) == 2 for trip in data)
+
+    @pytest.mark.benchmark
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("row_count", [10, 1_000, 10_000])
+    def test_benchmark_against_drf(self, user, row_count):
+        """Benchmark the fast path against TripSerializer for a trip list."""
+        # One flight per trip, so row_count trips and row_count flights
+        create_trips_with_flights(user, row_count, 1)
+        queryset = Trip.objects.order_by("id")
+
+        timings = {}
+        for name, serialize in (("drf", drf_trips), ("fast", fast_trips)):
+            start = time.perf_counter()
+            serialize(queryset)
+            timings[name] = time.perf_counter() - start
+
+        print(
+            f"{row_count} trips: drf {timings['drf']:.3f}s, "
+            f"fast {timings['fast']:.3f}s, "
+            f"{timings['drf'] / timings['fast']:.1f}x"
+        )
+        # Small lists are dominated by query overhead and too noisy to compare
+        if row_count >= 1_000:
+            assert timings["fast"] < timings["drf"]
+
+
+class TestTripExport:
+    @staticmethod
+    def export(api_request_factory, user, path="/api/trips/export/", **headers):
+        request = api_request_factory.get(path, **headers)
+        force_authenticate(request, user=user)
+        view = TripViewSet.as_view({"get": "export"}, **TripViewSet.export.kwargs)
+        response = view(request)
+        return response, b"".join(response.streaming_content).decode("utf-8")
+
+    @pytest.mark.django_db
+    def test_streams_ndjson(self, user, another_trip, api_request_factory):
+        """Test that every trip is one NDJSON line, with its flights nested."""
+        create_trips_with_flights(user, 3, 2)
+
+        response, content = self.export(api_request_factory, user)
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert "attachment" in response["Content-Disposition"]
+        trips = [json.loads(line) for line in content.splitlines()]
+        expected = drf_trips(
+            Trip.objects.filter(created_by=user).order_by("start_date", "id")
+        )
+        assert trips == json.loads(JSONRenderer().render(expected))
+
+    @pytest.mark.django_db
+    def test_reads_trips_in_chunks(
+        self, user, api_request_factory, django_assert_num_queries
+    ):
+        """Test that trips are read from one cursor, with a flight query per chunk."""
+        create_trips_with_flights(user, 5, 1)
+
+        with patch.object(TripViewSet, "export_chunk_size", 2):
+            # One trips query and three chunks of flights
+            with django_assert_num_queries(4):
+                response, content = self.export(api_request_factory, user)
+
+        assert len(content.splitlines()) == 5
+
+    @pytest.mark.django_db
+    def test_streams_under_asgi(self, user):
+        """Test that ASGI responses send chunks before the cursor is exhausted."""
+        create_trips_with_flights(user, 5, 1)
+        request = AsyncRequestFactory().get("/api/trips/export/")
+        force_authenticate(request, user=user)
+        view = TripViewSet.as_view({"get": "export"}, **TripViewSet.export.kwargs)
+        read = []
+        export_chunks = TripViewSet._export_chunks
+
+        def recording_chunks(viewset):
+            for chunk in export_chunks(viewset):
+                read.append(len(chunk))
+                yield chunk
+
+        with (
+            patch.object(TripViewSet, "export_chunk_size", 2),
+            patch.object(TripViewSet, "_export_chunks", recording_chunks),
+        ):
+            response = view(request)
+            assert response.is_async
+
+            async def consume():
+                chunks = aiter(response)
+                first = await anext(chunks)
+                read_before_rest = list(read)
+                rest = [chunk async for chunk in chunks]
+                return first, read_before_rest, rest
+
+            first, read_before_rest, rest = async_to_sync(consume)()
+
+        assert len(first.splitlines()) == 2
+        assert read_before_rest == [2]
+        assert read == [2, 2, 1]
+        assert len(b"".join(rest).splitlines()) == 3
+
+    @pytest.mark.django_db
+    def test_streams_csv(self, user, trip, api_request_factory):
+        """Test that CSV has one row per flight and per trip without flights."""
+        create_trips_with_flights(user, 2, 3)
+
+        for path, headers in (
+            ("/api/trips/export/?format=csv", {}),
+            ("/api/trips/export/", {"HTTP_ACCEPT": "text/csv"}),
+        ):
+            response, content = self.export(api_request_factory, user, path, **headers)
+
+            assert response["Content-Type"] == "text/csv"
+            rows = list(csv.DictReader(StringIO(content)))
+            # 2 active flights for each generated trip, none for `trip`
+            assert len(rows) == 5
+            assert len([row for row in rows if row["flight_flight_number"]]) == 4
+            assert any(
+                row["trip_id"] == str(trip.id) and not row["flight_id"] for row in rows
+            ), "Trips without flights should have a row"
+
+    @pytest.mark.django_db
+    def test_requires_authentication(self, api_request_factory):
+        """Test that unauthenticated requests are denied."""
+        request = api_request_factory.get("/api/trips/export/")
+        view = TripViewSet.as_view({"get": "export"}, **TripViewSet.export.kwargs)
+        response = view(request)
+
+        assert response.status_code == 403
+
+
+@pytest.mark.usefixtures("clear_response_cache")
+class TestCalendarFeed:
+    @staticmethod
+    def feed_token(api_request_factory, user, method="get"):
+        request = getattr(api_request_factory, method)("/api/trips/calendar/")
+        force_authenticate(request, user=user)
+        view = TripViewSet.as_view(
+            {"get": "calendar_feed", "post": "calendar_feed"},
+            **TripViewSet.calendar_feed.kwargs,
+        )
+        response = view(request)
+        assert response.status_code == 200
+        return response.data["url"].rsplit("/", 1)[1].removesuffix(".ics")
+
+    @staticmethod
+    def get_feed(token, **headers):
+        request = RequestFactory().get(f"/calendar/{token}.ics", **headers)
+        return calendar_ics(request, token=token)
+
+    @pytest.mark.django_db
+    def test_one_active_feed_per_user(self, user):
+        """Test that the database allows only one active feed per user."""
+        feed = get_or_create_feed(user)
+        assert get_or_create_feed(user) == feed
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            CalendarFeed.objects.create(created_by=user)
+
+        feed.delete()
+        assert get_or_create_feed(user) != feed
+
+    @pytest.mark.django_db
+    def test_concurrent_first_requests_share_the_feed(self, user):
+        """Test that a request losing the race to create the feed reads it."""
+        created = []
+        queryset_class = type(CalendarFeed.objects.all())
+        original_get = queryset_class.get
+
+        def racing_get(self, *args, **kwargs):
+            if not created:
+                # Another request creates the feed after this one's lookup
+                created.append(CalendarFeed.objects.create(created_by=user))
+                raise CalendarFeed.DoesNotExist
+            return original_get(self, *args, **kwargs)
+
+        with patch.object(queryset_class, "get", racing_get):
+            feed = get_or_create_feed(user)
+
+        assert feed == created[0]
+        assert CalendarFeed.objects.filter(created_by=user).count() == 1
+
+    @pytest.mark.django_db
+    def test_feed_contains_trips_and_flights(
+        self, user, trip, flight, another_trip, api_request_factory
+    ):
+        """Test that the feed has an event for each of the user's trips and flights."""
+        token = self.feed_token(api_request_factory, user)
+
+        response = self.get_feed(token)
+        content = response.content.decode("utf-8")
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/calendar; charset=utf-8"
+        assert content.startswith("BEGIN:VCALENDAR\r\n")
+        assert content.count("BEGIN:VEVENT") == 2
+        assert f"UID:trip-{trip.id}@travel-stream" in content
+        assert f"UID:trip-{another_trip.id}@" not in content
+        assert "DTSTART;VALUE=DATE:20230101" in content
+        assert "DTEND;VALUE=DATE:20230108" in content, "End dates are exclusive"
+        assert f"X-TRAVEL-STREAM-FLIGHT-NUMBER:{flight.flight_number}" in content
+        assert all(len(line.encode()) <= 75 for line in content.split("\r\n"))
+
+    @pytest.mark.django_db
+    def test_unchanged_feed_costs_one_query(
+        self, user, trip, flight, api_request_factory, django_assert_num_queries
+    ):
+        """Test that polling an unchanged feed only runs the validator query."""
+        token = self.feed_token(api_request_factory, user)
+        etag = self.get_feed(token)["ETag"]
+
+        with django_assert_num_queries(1):
+            response = self.get_feed(token, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        with django_assert_num_queries(1):
+            response = self.get_feed(token)
+        assert response.status_code == 200, "Clients without an ETag hit the cache"
+
+    @pytest.mark.django_db
+    def test_only_changed_events_are_rendered(
+        self, user, trip, flight, api_request_factory
+    ):
+        """Test that event fragments are rebuilt only when their row changes."""
+        Trip.objects.create(
+            created_by=user,
+            name="Unchanged Trip",
+            destination="Test Destination",
+            start_date=date(2023, 2, 1),
+            end_date=date(2023, 2, 8),
+        )
+        token = self.feed_token(api_request_factory, user)
+        self.get_feed(token)
+
+        flight.flight_number = "TA999"
+        flight.save()
+        with (
+            patch("apps.trips.calendar.render_trip", return_value="") as render_trip,
+            patch(
+                "apps.trips.calendar.render_flight", return_value=""
+            ) as render_flight,
+        ):
+            self.get_feed(token)
+
+        # The flight's trip changed too, its flight summary was refreshed
+        render_trip.assert_called_once()
+        assert render_trip.call_args.args[0]["id"] == trip.id
+        render_flight.assert_called_once()
+
+    @pytest.mark.django_db
+    def test_deleted_flights_are_removed(self, user, trip, flight, api_request_factory):
+        """Test that soft-deleted flights disappear from the feed."""
+        token = self.feed_token(api_request_factory, user)
+        self.get_feed(token)
+
+        flight.delete()
+        content = self.get_feed(token).content.decode("utf-8")
+
+        assert f"UID:flight-{flight.id}@" not in content
+
+    @pytest.mark.django_db
+    def test_rotating_the_token_revokes_the_old_url(self, user, api_request_factory):
+        """Test that POST issues a new token and the old one stops working."""
+        old_token = self.feed_token(api_request_factory, user)
+        self.get_feed(old_token)
+
+        new_token = self.feed_token(api_request_factory, user, method="post")
+
+        assert new_token != old_token
+        assert CalendarFeed.objects.filter(created_by=user).count() == 1
+        assert self.get_feed(new_token).status_code == 200
+        with pytest.raises(Http404):
+            self.get_feed(old_token)
+
+
+class TestItineraryImport:
+    @staticmethod
+    def create_itinerary(user):
+        for i in range(3):
+            trip = Trip.objects.create(
+                created_by=user,
+                name=f"Trip, {i}",
+                description=None if i % 2 else f"Line one\nLine; {i}",
+                destination="Test Destination",
+                start_date=date(2023, 1, 1) + timedelta(days=i * 10),
+                end_date=date(2023, 1, 8) + timedelta(days=i * 10),
+            )
+            for j in range(2):
+                departure = timezone.make_aware(datetime(2023, 1, 1 + i * 10, 8 + j))
+                Flight.objects.create(
+                    created_by=user,
+                    trip=trip,
+                    airline="Test Airline",
+                    confirmation_number=None if j else "ABC123",
+                    flight_number=f"TA{j}",
+                    departure_airport="SFO",
+                    arrival_airport="JFK",
+                    departure_time=departure,
+                    arrival_time=departure + timedelta(hours=8),
+                )
+
+    @staticmethod
+    def export(api_request_factory, user, file_format):
+        request = api_request_factory.get(f"/api/trips/export/?format={file_format}")
+        force_authenticate(request, user=user)
+        view = TripViewSet.as_view({"get": "export"}, **TripViewSet.export.kwargs)
+        return b"".join(view(request).streaming_content).decode("utf-8")
+
+    @staticmethod
+    def summary(user):
+        return sorted(
+            Flight.objects.filter(created_by=user).values_list(
+                "trip__name",
+                "trip__description",
+                "trip__start_date",
+                "trip__end_date",
+                "flight_number",
+                "departure_time",
+                "arrival_time",
+                "confirmation_number",
+            )
+        )
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("file_format", ["json", "csv", "ics"])
+    def test_round_trips_exports(
+        self, user, another_user, api_request_factory, file_format
+    ):
+        """Test that exports import into another account and re-imports skip."""
+        self.create_itinerary(user)
+        if file_format == "ics":
+            content = build_feed(user.id)
+        else:
+            export_format = "ndjson" if file_format == "json" else file_format
+            content = self.export(api_request_factory, user, export_format)
+
+        result = ItineraryImporter(another_user).run(
+            StringIO(content, newline=""), file_format
+        )
+
+        assert result["errors"] == []
+        assert result["trips_created"] == 3
+        assert result["flights_created"] == 6
+        assert self.summary(another_user) == self.summary(user)
+
+        result = ItineraryImporter(another_user).run(
+            StringIO(content, newline=""), file_format
+        )
+
+        assert result["trips_created"] == 0
+        assert result["trips_matched"] == 3
+        assert result["flights_created"] == 0
+        assert result["flights_skipped"] == 6
+
+    @pytest.mark.django_db
+    def test_invalid_records_are_reported(self, user):
+        """Test that invalid records don't stop the import."""
+        records = [
+            {
+                "name": "Valid",
+                "destination": "Paris",
+                "start_date": "2023-01-01",
+                "end_date": "2023-01-02",
+            },
+            {"name": "No dates", "destination": "Paris"},
+            "not a trip",
+        ]
+        content = "\n".join(json.dumps(record) for record in records)
+
+        result = ItineraryImporter(user).run(StringIO(content), "json")
+
+        assert result["trips_created"] == 1
+        assert [error["record"] for error in result["errors"]] == [1, 2]
+        assert "start_date" in result["errors"][0]["errors"]
+
+    @pytest.mark.django_db
+    def test_large_import_uses_batched_queries(
+        self, user, django_assert_max_num_queries
+    ):
+        """Test that 5,000 flights are written with a few queries per batch."""
+        flight = {
+            "airline": "Test Airline",
+            "flight_number": "TA1",
+            "departure_airport": "SFO",
+            "arrival_airport": "JFK",
+        }
+        records = [
+            {
+                "name": f"Trip {i}",
+                "destination": "Test Destination",
+                "start_date": "2023-01-01",
+                "end_date": "2023-01-08",
+                "flights": [
+                    {
+                        **flight,
+                        "departure_time": f"2023-01-01T{j:02}:{i % 60:02}:00Z",
+                        "arrival_time": f"2023-01-01T{j:02}:{i % 60:02}:30Z",
+                        "flight_number": f"TA{i}",
+                    }
+                    for j in range(10)
+                ],
+            }
+            for i in range(500)
+        ]
+        content = json.dumps(records)
+
+        # A few queries per batch, SQLite splits the INSERTs by its variable limit
+        with django_assert_max_num_queries(5_000 // 40):
+            result = ItineraryImporter(user, batch_size=100).run(
+                StringIO(content), "json"
+            )
+
+        assert result["flights_created"] == 5_000
+        assert Flight.objects.filter(created_by=user).count() == 5_000
+
+    @pytest.mark.django_db
+    def test_import_endpoint(self, user, api_request_factory):
+        """Test that files can be uploaded to the import endpoint."""
+        content = "trip_name,trip_destination,trip_start_date,trip_end_date\n"
+        content += "Imported,Paris,2023-01-01,2023-01-02\n"
+
+        def post(name, data=None):
+            upload = SimpleUploadedFile(name, content.encode("utf-8"))
+            request = api_request_factory.post(
+                "/api/trips/import/", {"file": upload, **(data or {})}
+            )
+            force_authenticate(request, user=user)
+            view = TripViewSet.as_view(
+                {"post": "import_trips"}, **TripViewSet.import_trips.kwargs
+            )
+            return view(request)
+
+        response = post("trips.csv")
+        assert response.status_code == 200, response.data
+        assert response.data["trips_created"] == 1
+        assert Trip.objects.filter(created_by=user, name="Imported").exists()
+
+        assert post("trips.txt").status_code == 400
+        assert post("trips.txt", {"format": "csv"}).data["trips_matched"] == 1
+
+    @pytest.mark.django_db
+    def test_truncated_file_returns_partial_result(self, user, api_request_factory):
+        """Test that a file cut off after the first batch reports what was saved."""
+        records = [
+            {
+                "name": f"Trip {i}",
+                "destination": "Paris",
+                "start_date": "2023-01-01",
+                "end_date": "2023-01-02",
+            }
+            for i in range(3)
+        ]
+        lines = [json.dumps(record) for record in records]
+        content = "\n".join(lines[:2] + [lines[2][:20]])
+
+        result = ItineraryImporter(user, batch_size=1).run(StringIO(content), "json")
+
+        assert result["trips_created"] == 2
+        assert result["parse_error"]["record"] == 2
+        assert result["parse_error"]["detail"].startswith("Could not parse the file")
+        assert Trip.objects.filter(created_by=user).count() == 2
+
+        request = api_request_factory.post(
+            "/api/trips/import/",
+            {"file": SimpleUploadedFile("trips.ndjson", content.encode("utf-8"))},
+        )
+        force_authenticate(request, user=user)
+        view = TripViewSet.as_view(
+            {"post": "import_trips"}, **TripViewSet.import_trips.kwargs
+        )
+        response = view(request)
+
+        # The retry matches the saved trips and writes nothing
+        assert response.status_code == 400, response.data
+        assert response.data["trips_matched"] == 2
+        assert response.data["parse_error"]["record"] == 2
+
+        Trip.objects.all().delete()
+        request = api_request_factory.post(
+            "/api/trips/import/",
+            {"file": SimpleUploadedFile("trips.ndjson", content.encode("utf-8"))},
+        )
+        force_authenticate(request, user=user)
+        response = view(request)
+
+        assert response.status_code == 207, response.data
+        assert response.data["trips_created"] == 2
+        assert response.data["parse_error"]["record"] == 2
+
+    @pytest.mark.django_db
+    def test_import_command(self, user, tmp_path):
+        """Test that the management command imports a file for a user."""
+        path = tmp_path / "trips.ndjson"
+        path.write_text(
+            json.dumps(
+                {
+                    "name": "Imported",
+                    "destination": "Paris",
+                    "start_date": "2023-01-01",
+                    "end_date": "2023-01-02",
+                }
+            )
+        )
+        out = StringIO()
+
+        call_command("import_itinerary", str(path), user=user.id, stdout=out)
+
+        assert "Created 1 trip(s)" in out.getvalue()
+        assert Trip.objects.filter(created_by=user, name="Imported").exists()
+
+
+class TestSoftDeleteCascade:
+    @pytest.mark.django_db
+    def test_deleting_a_trip_deletes_its_flights(self, user, api_request_factory):
+        """Test that the destroy endpoint soft deletes the trip's flights."""
+        trip = create_trips_with_flights(user, 1, 3)[0]
+
+        request = api_request_factory.delete(f"/api/trips/{trip.id}/")
+        force_authenticate(request, user=user)
+        response = TripViewSet.as_view({"delete": "destroy"})(request, pk=trip.id)
+
+        assert response.status_code == 204
+        trip.refresh_from_db()
+        assert not Flight.objects.filter(trip=trip).exists()
+        # Flight 2 was created soft deleted, without a deletion time
+        deleted_at = Flight.all_objects.filter(trip=trip).exclude(flight_number="TA2")
+        assert set(deleted_at.values_list("deleted_at", flat=True)) == {trip.deleted_at}
+
+    @pytest.mark.django_db
+    def test_restore_keeps_earlier_deletions(self, user):
+        """Test that restoring a trip only restores flights deleted with it."""
+        trip = create_trips_with_flights(user, 1, 3)[0]
+        # Flight 2 was soft deleted on its own before the trip
+
+        trip.delete()
+        trip.restore()
+
+        assert list(
+            Flight.objects.filter(trip=trip)
+            .order_by("flight_number")
+            .values_list("flight_number", flat=True)
+        ) == ["TA0", "TA1"]
+        assert Flight.all_objects.filter(trip=trip, is_deleted=True).count() == 1
+
+    @pytest.mark.django_db
+    def test_bulk_methods_use_constant_queries(
+        self, user, another_user, django_assert_num_queries
+    ):
+        """Test that bulk deletes cascade with one statement per table."""
+        create_trips_with_flights(user, 50, 4)
+        create_trips_with_flights(another_user, 1, 1)
+
+        # Savepoint, trip rows, flight rows, flight UPDATE, the trips' flight
+        # summary UPDATE and trip UPDATE
+        with django_assert_num_queries(7):
+            assert Trip.objects.filter(created_by=user).soft_delete() == 50
+        assert not Flight.objects.filter(created_by=user).exists()
+
+        with django_assert_num_queries(7):
+            assert Trip.all_objects.filter(created_by=user).restore() == 50
+        assert Flight.objects.filter(created_by=user).count() == 150
+
+        with django_assert_num_queries(7):
+            total, counts = Trip.all_objects.filter(created_by=user).erase()
+        assert counts == {"trips.Flight": 200, "trips.Trip": 50}
+        assert Flight.all_objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_bulk_changes_invalidate_cached_responses(self, user, trip, flight):
+        """Test that queryset-level changes invalidate the owner's responses."""
+        with patch("apps.trips.signals.invalidate_user_responses") as invalidate:
+            Trip.objects.filter(pk=trip.pk).soft_delete()
+
+        assert invalidate.call_count == 2
+        invalidate.assert_called_with(user.id)
+
+    @pytest.mark.django_db
+    def test_purge_tombstones_command(self, user):
+        """Test that old trip tombstones are purged with all of their flights."""
+        old, recent = create_trips_with_flights(user, 2, 3)
+        old.delete()
+        recent.delete()
+        Trip.all_objects.filter(pk=old.pk).update(
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+
+        out = StringIO()
+        call_command("purge_tombstones", "trips.Trip", stdout=out)
+
+        assert "Deleted 3 trips.Flight row(s)." in out.getvalue()
+        assert "Deleted 1 trips.Trip row(s)." in out.getvalue()
+        assert list(Trip.all_objects.values_list("pk", flat=True)) == [recent.pk]
+        assert Flight.all_objects.filter(trip=recent).count() == 3
+
+
+class TestFlightSummaries:
+    @staticmethod
+    def summary(trip):
+        trip.refresh_from_db()
+        return (
+            trip.flight_count,
+            trip.first_departure_airport,
+            trip.last_arrival_airport,
+        )
+
+    @staticmethod
+    def add_flight(trip, departure_airport, arrival_airport, hour):
+        return Flight.objects.create(
+            created_by=trip.created_by,
+            trip=trip,
+            airline="Test Airline",
+            flight_number=f"TA{hour}",
+            departure_airport=departure_airport,
+            arrival_airport=arrival_airport,
+            departure_time=timezone.make_aware(datetime(2023, 1, 1, hour)),
+            arrival_time=timezone.make_aware(datetime(2023, 1, 1, hour + 1)),
+        )
+
+    @pytest.mark.django_db
+    def test_summary_follows_flight_changes(self, user, trip, another_trip):
+        """Test that saves, moves, deletes and restores refresh the summary."""
+        assert self.summary(trip) == (0, None, None)
+
+        outbound = self.add_flight(trip, "SFO", "JFK", 8)
+        inbound = self.add_flight(trip, "JFK", "SFO", 18)
+        assert self.summary(trip) == (2, "SFO", "SFO")
+        assert trip.first_departure_time == outbound.departure_time
+        assert trip.last_arrival_time == inbound.arrival_time
+
+        inbound = Flight.objects.get(pk=inbound.pk)
+        inbound.trip = another_trip
+        inbound.save()
+        assert self.summary(trip) == (1, "SFO", "JFK")
+        assert self.summary(another_trip) == (1, "JFK", "SFO")
+
+        outbound.delete()
+        assert self.summary(trip) == (0, None, None)
+        outbound.restore()
+        assert self.summary(trip) == (1, "SFO", "JFK")
+
+        Flight.objects.filter(trip=trip).soft_delete()
+        assert self.summary(trip) == (0, None, None)
+        Flight.all_objects.filter(trip=trip).restore()
+        assert self.summary(trip) == (1, "SFO", "JFK")
+
+    @pytest.mark.django_db
+    def test_bulk_created_flights_are_summarized(
+        self, user, trip, flight_data, api_request_factory
+    ):
+        """Test that the bulk endpoint refreshes the summaries of its trips."""
+        request = api_request_factory.post(
+            "/api/flights/bulk/", [flight_data] * 3, format="json"
+        )
+        force_authenticate(request, user=user)
+        response = FlightViewSet.as_view({"post": "bulk_create"})(request)
+
+        assert response.status_code == 201, response.data
+        assert self.summary(trip) == (3, "SFO", "JFK")
+
+    @pytest.mark.django_db
+    def test_list_does_not_read_flights(self, user, trip, api_request_factory):
+        """Test that trip lists serve the summary without the flights table."""
+        self.add_flight(trip, "SFO", "JFK", 8)
+        request = api_request_factory.get("/api/trips/")
+        force_authenticate(request, user=user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = TripViewSet.as_view({"get": "list"})(request)
+
+        assert response.status_code == 200
+        result = response.data["results"][0]
+        assert result["flight_count"] == 1
+        assert result["first_departure_airport"] == "SFO"
+        assert result["last_arrival_time"] == "2023-01-01T09:00:00Z"
+        assert "flights" not in result
+        assert not any("trips_flight" in query["sql"] for query in queries)
+
+    @pytest.mark.django_db
+    def test_list_etag_changes_with_summary(self, user, trip, api_request_factory):
+        """Test that a flight change gives the trip list a new ETag."""
+
+        def etag():
+            request = api_request_factory.get("/api/trips/")
+            force_authenticate(request, user=user)
+            return TripViewSet.as_view({"get": "list"})(request)["ETag"]
+
+        before = etag()
+        time.sleep(1)  # Last-Modified has a resolution of seconds
+        self.add_flight(trip, "SFO", "JFK", 8)
+
+        assert etag() != before
+
+    @pytest.mark.django_db
+    def test_rebuild_command(self, user, another_user):
+        """Test that the command backfills the summaries in batches."""
+        create_trips_with_flights(user, 3, 3)
+        create_trips_with_flights(another_user, 1, 1)
+        assert set(Trip.objects.values_list("flight_count", flat=True)) == {0}
+
+        out = StringIO()
+        call_command("rebuild_trip_summaries", user=user.id, batch_size=2, stdout=out)
+
+        assert "Rebuilt the flight summaries of 3 trip(s)." in out.getvalue()
+        # Flight 2 of every trip is soft deleted
+        assert set(
+            Trip.objects.filter(created_by=user).values_list("flight_count", flat=True)
+        ) == {2}
+        assert Trip.objects.get(created_by=another_user).flight_count == 0
+
+    @pytest.mark.django_db
+    def test_migration_backfills_summaries(self, user):
+        """Test that migration 0006 fills the summaries of existing trips."""
+        migration = importlib.import_module(
+            "apps.trips.migrations.0006_trip_flight_summary"
+        )
+        create_trips_with_flights(user, 3, 3)
+        assert set(Trip.objects.values_list("flight_count", flat=True)) == {0}
+
+        with patch.object(migration, "BATCH_SIZE", 2):
+            migration.backfill_flight_summaries(django_apps, None)
+
+        # Flight 2 of every trip is soft deleted
+        assert set(Trip.objects.values_list("flight_count", flat=True)) == {2}
+        for trip in Trip.objects.all():
+            first = trip.flights.filter(is_deleted=False).earliest("departure_time")
+            assert trip.first_departure_time == first.departure_time
+            assert trip.first_departure_airport == first.departure_airport
+
+
+class TestTimeline:
+    @staticmethod
+    def get(user, api_request_factory, **params):
+        request = api_request_factory.get("/api/trips/timeline/", params)
+        force_authenticate(request, user=user)
+        return TripViewSet.as_view({"get": "timeline"})(request)
+
+    @staticmethod
+    def add_trip(user, start_date, end_date):
+        return Trip.objects.create(
+            created_by=user,
+            name=f"Trip {start_date}",
+            destination="Test Destination",
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    @staticmethod
+    def add_flight(trip, departure_time, arrival_time):
+        return Flight.objects.create(
+            created_by=trip.created_by,
+            trip=trip,
+            airline="Test Airline",
+            flight_number="TA123",
+            departure_airport="SFO",
+            arrival_airport="JFK",
+            departure_time=departure_time,
+            arrival_time=arrival_time,
+        )
+
+    @pytest.mark.django_db
+    def test_merges_trips_and_flights_in_window(
+        self, user, another_user, api_request_factory, django_assert_num_queries
+    ):
+        """Test that the window's trips and flights are merged in order."""
+        utc = timezone.get_current_timezone()
+        june = self.add_trip(user, date(2024, 6, 10), date(2024, 6, 20))
+        may = self.add_trip(user, date(2024, 5, 25), date(2024, 6, 2))
+        self.add_trip(user, date(2024, 5, 1), date(2024, 5, 31))
+        self.add_trip(user, date(2024, 7, 1), date(2024, 7, 5))
+        self.add_trip(another_user, date(2024, 6, 1), date(2024, 6, 30))
+        self.add_trip(user, date(2024, 6, 5), date(2024, 6, 6)).delete()
+        # Departs before the window and lands in it
+        red_eye = self.add_flight(
+            may,
+            datetime(2024, 5, 31, 22, tzinfo=utc),
+            datetime(2024, 6, 1, 6, tzinfo=utc),
+        )
+        outbound = self.add_flight(
+            june,
+            datetime(2024, 6, 10, tzinfo=utc),
+            datetime(2024, 6, 10, 5, tzinfo=utc),
+        )
+        inbound = self.add_flight(
+            june,
+            datetime(2024, 6, 30, 23, tzinfo=utc),
+            datetime(2024, 7, 1, 4, tzinfo=utc),
+        )
+        # Lands the moment the window starts
+        landing = self.add_flight(
+            may,
+            datetime(2024, 5, 31, 20, tzinfo=utc),
+            datetime(2024, 6, 1, tzinfo=utc),
+        )
+        # Departs the moment the window ends
+        self.add_flight(
+            june,
+            datetime(2024, 7, 1, tzinfo=utc),
+            datetime(2024, 7, 1, 5, tzinfo=utc),
+        )
+
+        with django_assert_num_queries(2):
+            response = self.get(
+                user, api_request_factory, start="2024-06-01", end="2024-06-30"
+            )
+
+        assert response.status_code == 200, response.data
+        assert response.data["start"] == "2024-06-01"
+        assert response.data["end"] == "2024-06-30"
+        results = [(r["type"], r["data"]["id"]) for r in response.data["results"]]
+        assert results == [
+            ("trip", may.id),
+            ("flight", landing.id),
+            ("flight", red_eye.id),
+            ("trip", june.id),
+            ("flight", outbound.id),
+            ("flight", inbound.id),
+        ]
+        assert (
+            response.data["results"][0]["data"]
+            == TripSerializer(
+                Trip.objects.get(pk=may.pk),
+                fields=[f for f in TripSerializer.Meta.fields if f != "flights"],
+            ).data
+        )
+        assert response.data["results"][2]["data"] == FlightSerializer(red_eye).data
+
+    @pytest.mark.django_db
+    def test_trip_ending_before_it_starts(self, user, api_request_factory):
+        """Test that a trip ending before its start is matched on its start."""
+        trip = self.add_trip(user, date(2024, 6, 10), date(2024, 6, 1))
+
+        response = self.get(
+            user, api_request_factory, start="2024-06-05", end="2024-06-09"
+        )
+        assert response.data["results"] == []
+
+        response = self.get(
+            user, api_request_factory, start="2024-06-10", end="2024-06-10"
+        )
+        assert [r["data"]["id"] for r in response.data["results"]] == [trip.id]
+
+    def test_trip_comes_before_flight_at_same_time(self):
+        """Test that a trip starting when a flight departs is listed first."""
+        utc = timezone.get_current_timezone()
+        trips = [{"start_date": date(2024, 6, 1)}, {"start_date": date(2024, 6, 2)}]
+        flights = [
+            {"departure_time": datetime(2024, 6, 1, tzinfo=utc)},
+            {"departure_time": datetime(2024, 6, 1, 12, tzinfo=utc)},
+        ]
+
+        kinds = [kind for kind, _ in merge_timeline(iter(trips), iter(flights))]
+
+        assert kinds == ["trip", "flight", "flight", "trip"]
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "params, field",
+        [
+            ({"end": "2024-06-30"}, "start"),
+            ({"start": "2024-06-01"}, "end"),
+            ({"start": "June 1st", "end": "2024-06-30"}, "start"),
+            ({"start": "2024-06-01", "end": "2024-06-31"}, "end"),
+            ({"start": "2024-06-30", "end": "2024-06-01"}, "end"),
+            ({"start": "2024-01-01", "end": "2025-01-01"}, "end"),
+        ],
+    )
+    def test_invalid_window(self, user, api_request_factory, params, field):
+        """Test that missing, invalid, reversed and long windows are rejected."""
+        response = self.get(user, api_request_factory, **params)
+
+        assert response.status_code == 400
+        assert field in response.data
+
+
+class TestFlightConflicts:
+    @staticmethod
+    def add_flight(trip, departure_hour, arrival_hour, day=1):
+        return Flight.objects.create(
+            created_by=trip.created_by,
+            trip=trip,
+            airline="Test Airline",
+            flight_number=f"TA{departure_hour}",
+            departure_airport="SFO",
+            arrival_airport="JFK",
+            departure_time=datetime(2023, 1, day, tzinfo=dt_timezone.utc)
+            + timedelta(hours=departure_hour),
+            arrival_time=datetime(2023, 1, day, tzinfo=dt_timezone.utc)
+            + timedelta(hours=arrival_hour),
+        )
+
+    @pytest.mark.django_db
+    def test_create_reports_conflicts(
+        self, user, flight, flight_data, api_request_factory
+    ):
+        """Test that a created flight reports the flights it overlaps."""
+        view = FlightViewSet.as_view({"post": "create"})
+
+        def create(**times):
+            request = api_request_factory.post(
+                "/api/flights/", {**flight_data, **times}, format="json"
+            )
+            force_authenticate(request, user=user)
+            return view(request)
+
+        response = create(
+            departure_time="2023-01-01T12:00:00Z", arrival_time="2023-01-01T20:00:00Z"
+        )
+        assert response.status_code == 201, response.data
+        assert response.data["conflicts"] == [
+            {"type": "overlap", "flight": response.data["id"], "other": flight.id}
+        ]
+
+        # A connection departing when the previous flight arrives
+        response = create(
+            departure_time="2023-01-01T20:00:00Z", arrival_time="2023-01-01T22:00:00Z"
+        )
+        assert response.data["conflicts"] == []
+
+        response = create(
+            departure_time="2023-01-07T23:00:00Z", arrival_time="2023-01-08T07:00:00Z"
+        )
+        assert response.data["conflicts"] == [
+            {
+                "type": "outside_trip",
+                "flight": response.data["id"],
+                "trip": flight.trip_id,
+            }
+        ]
+
+    @pytest.mark.django_db
+    def test_update_reports_conflicts(self, user, trip, api_request_factory):
+        """Test that moving a flight onto another one reports the overlap."""
+        first = self.add_flight(trip, 8, 10)
+        second = self.add_flight(trip, 12, 14)
+        request = api_request_factory.patch(
+            f"/api/flights/{second.id}/",
+            {"trip_id": trip.id, "departure_time": "2023-01-01T09:00:00Z"},
+            format="json",
+        )
+        force_authenticate(request, user=user)
+        response = FlightViewSet.as_view({"patch": "partial_update"})(
+            request, pk=second.id
+        )
+
+        assert response.status_code == 200, response.data
+        assert response.data["conflicts"] == [
+            {"type": "overlap", "flight": second.id, "other": first.id}
+        ]
+
+    @pytest.mark.django_db
+    def test_instant_flight_conflicts_match_account(
+        self, user, trip, api_request_factory
+    ):
+        """Test that zero-length flights get the conflicts of the account check."""
+        enclosing = self.add_flight(trip, 8, 12)
+        instant = self.add_flight(trip, 10, 10)
+        edge = self.add_flight(trip, 8, 8)
+        request = api_request_factory.get("/api/flights/conflicts/")
+        force_authenticate(request, user=user)
+        response = FlightViewSet.as_view({"get": "conflicts"})(request)
+
+        assert flight_conflicts(instant) == [
+            {"type": "overlap", "flight": instant.id, "other": enclosing.id}
+        ]
+        assert flight_conflicts(edge) == []
+        assert response.data["results"] == [
+            {"type": "overlap", "flight": enclosing.id, "other": instant.id}
+        ]
+
+    def test_instant_flight_queries_closed_range(self, postgresql):
+        """Test that PostgreSQL looks up zero-length flights as closed ranges."""
+        from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+
+        departure_time = datetime(2023, 1, 1, 10, tzinfo=dt_timezone.utc)
+        instant = Flight(
+            pk=1,
+            created_by_id=1,
+            departure_time=departure_time,
+            arrival_time=departure_time,
+        )
+
+        with patch.object(Flight.objects, "get_queryset") as get_queryset:
+            get_queryset.return_value = Flight.all_objects.using(postgresql)
+            sql, params = compile_sql(overlapping_flights(instant))
+
+        assert "tstzrange(" in sql and " && " in sql
+        ranges = [p for p in params if isinstance(p, DateTimeTZRange)]
+        assert ranges == [DateTimeTZRange(departure_time, departure_time, "[]")]
+
+    @pytest.mark.django_db
+    def test_arrival_before_departure_is_rejected(
+        self, user, flight, flight_data, api_request_factory
+    ):
+        """Test that flights arriving before they depart are invalid."""
+        request = api_request_factory.post(
+            "/api/flights/",
+            {**flight_data, "arrival_time": "2023-01-01T07:00:00Z"},
+            format="json",
+        )
+        force_authenticate(request, user=user)
+        response = FlightViewSet.as_view({"post": "create"})(request)
+
+        assert response.status_code == 400
+        assert "arrival_time" in response.data
+
+        # Checked against the saved departure on partial updates
+        request = api_request_factory.patch(
+            f"/api/flights/{flight.id}/",
+            {"trip_id": flight.trip_id, "arrival_time": "2023-01-01T07:00:00Z"},
+            format="json",
+        )
+        force_authenticate(request, user=user)
+        response = FlightViewSet.as_view({"patch": "partial_update"})(
+            request, pk=flight.id
+        )
+
+        assert response.status_code == 400
+        assert "arrival_time" in response.data
+
+    @pytest.mark.django_db
+    def test_account_conflicts(
+        self, user, trip, another_trip, api_request_factory, django_assert_num_queries
+    ):
+        """Test that the endpoint reports every conflict of the account."""
+        first = self.add_flight(trip, 8, 12)
+        second = self.add_flight(trip, 10, 14)
+        third = self.add_flight(trip, 11, 13)
+        self.add_flight(trip, 14, 15)  # Connects to the second flight
+        backwards = self.add_flight(trip, 30, 20)
+        outside = self.add_flight(trip, 8, 9, day=9)
+        self.add_flight(trip, 16, 18).delete()
+        self.add_flight(another_trip, 8, 12)
+        # Shares its first day with the last day of the trip
+        next_trip = Trip.objects.create(
+            created_by=user,
+            name="Next Trip",
+            destination="Test Destination",
+            start_date=date(2023, 1, 7),
+            end_date=date(2023, 1, 9),
+        )
+        Trip.objects.create(
+            created_by=user,
+            name="Later Trip",
+            destination="Test Destination",
+            start_date=date(2023, 1, 10),
+            end_date=date(2023, 1, 12),
+        )
+
+        request = api_request_factory.get("/api/flights/conflicts/")
+        force_authenticate(request, user=user)
+        with django_assert_num_queries(2):
+            response = FlightViewSet.as_view({"get": "conflicts"})(request)
+
+        assert response.status_code == 200
+        assert response.data["results"] == [
+            {"type": "arrival_before_departure", "flight": backwards.id},
+            {"type": "outside_trip", "flight": outside.id, "trip": trip.id},
+            {"type": "overlap", "flight": first.id, "other": second.id},
+            {"type": "overlap", "flight": first.id, "other": third.id},
+            {"type": "overlap", "flight": second.id, "other": third.id},
+            {"type": "trip_overlap", "trip": trip.id, "other": next_trip.id},
+        ]
+        assert response.data["count"] == 6
+
+    @pytest.mark.parametrize("closed", [False, True])
+    def test_sweep_matches_pairwise_comparison(self, closed):
+        """Test that the sweep finds the same pairs as comparing every pair."""
+        rng = random.Random(42)
+        intervals = []
+        for key in range(200):
+            start = rng.randrange(1000)
+            intervals.append((start, start + rng.randrange(30), key))
+        # Ordered by start only, like flights by departure time and id
+        intervals.sort(key=lambda interval: (interval[0], interval[2]))
+
+        def overlap(a, b):
+            if closed:
+                return a[0] <= b[1] and b[0] <= a[1]
+            return a[0] < b[1] and b[0] < a[1]
+
+        expected = {
+            (a[2], b[2])
+            for a, b in itertools.combinations(intervals, 2)
+            if overlap(a, b)
+        }
+
+        pairs = list(overlapping_pairs(intervals, closed=closed))
+
+        assert len(pairs) == len(expected)
+        assert set(pairs) == expected
+
+
+class TestSearch:
+    @staticmethod
+    def get(user, api_request_factory, query):
+        request = api_request_factory.get("/api/trips/search/", {"q": query})
+        force_authenticate(request, user=user)
+        return TripViewSet.as_view({"get": "search_trips"})(request)
+
+    @staticmethod
+    def add_trip(user, name, description=None):
+        return Trip.objects.create(
+            created_by=user,
+            name=name,
+            description=description,
+            destination="Germany",
+            start_date=date(2024, 6, 1),
+            end_date=date(2024, 6, 7),
+        )
+
+    @pytest.mark.django_db
+    def test_ranks_trips_and_flights_together(
+        self, user, another_user, trip, api_request_factory, django_assert_num_queries
+    ):
+        """Test that matches are ranked by the weight of the matching field."""
+        named = self.add_trip(user, "Berlin Weekend")
+        described = self.add_trip(user, "Summer", "Two days in Berlin")
+        self.add_trip(user, "Berlin Again").delete()
+        self.add_trip(another_user, "Berlin Weekend")
+        flight = Flight.objects.create(
+            created_by=user,
+            trip=trip,
+            airline="Lufthansa",
+            flight_number="LH455",
+            departure_airport="SFO",
+            arrival_airport="BER",
+            departure_time=timezone.make_aware(datetime(2024, 6, 1, 8)),
+            arrival_time=timezone.make_aware(datetime(2024, 6, 1, 20)),
+        )
+
+        with django_assert_num_queries(2):
+            response = self.get(user, api_request_factory, "ber")
+
+        assert response.status_code == 200
+        results = [(r["type"], r["data"]["id"]) for r in response.data["results"]]
+        assert results == [
+            ("trip", named.id),
+            ("flight", flight.id),
+            ("trip", described.id),
+        ]
+        assert response.data["results"][1]["data"] == FlightSerializer(flight).data
+
+    @pytest.mark.django_db
+    def test_every_term_must_match(self, user, api_request_factory):
+        """Test that a row must match all of the terms, in any field."""
+        weekend = self.add_trip(user, "Berlin Weekend", "Museums")
+        self.add_trip(user, "Summer", "Two days in Berlin")
+
+        response = self.get(user, api_request_factory, "BERLIN  museums!")
+
+        assert [r["data"]["id"] for r in response.data["results"]] == [weekend.id]
+
+    @pytest.mark.django_db
+    def test_limit(self, user, api_request_factory):
+        """Test that only the best `search_limit` matches are returned."""
+        for i in range(3):
+            self.add_trip(user, f"Berlin {i}")
+
+        with patch.object(TripViewSet, "search_limit", 2):
+            response = self.get(user, api_request_factory, "berlin")
+
+        assert len(response.data["results"]) == 2
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("query", ["", "  ", "?!"])
+    def test_query_is_required(self, user, api_request_factory, query):
+        """Test that a query without any terms is rejected."""
+        response = self.get(user, api_request_factory, query)
+
+        assert response.status_code == 400
+        assert "q" in response.data
+
+    def test_search_terms(self):
+        """Test that queries are split into lowercase words and numbers."""
+        assert search_terms("UA-123  Zürich's") == ["ua", "123", "zürich", "s"]
+        assert len(search_terms("a " * 50)) == 10
+
+
+class TestPostgreSQL:
+    """
+    The PostgreSQL-only code paths, compiled against a connection that is
+    never opened, since the suite runs on SQLite.
+    """
+
+    def test_range_indexes(self, postgresql):
+        """Test that the range indexes are GiST indexes of the owner and span."""
+        schema_editor = connections[postgresql].schema_editor(collect_sql=True)
+        sql = {
+            index.name: str(index.create_sql(model, schema_editor))
+            for model in (Trip, Flight)
+            for index in model._meta.indexes
+            if isinstance(index, RangeIndex)
+        }
+
+        assert sql == {
+            "trip_owner_dates_range_idx": (
+                'CREATE INDEX "trip_owner_dates_range_idx" ON "trips_trip" '
+                'USING gist ("created_by_id", (daterange("start_date", '
+                'GREATEST("start_date", "end_date"), \'[]\'))) '
+                'WHERE NOT "is_deleted"'
+            ),
+            "flight_owner_times_range_idx": (
+                'CREATE INDEX "flight_owner_times_range_idx" ON "trips_flight" '
+                'USING gist ("created_by_id", (tstzrange("departure_time", '
+                'GREATEST("departure_time", "arrival_time"), \'[]\'))) '
+                'WHERE NOT "is_deleted"'
+            ),
+        }
+
+    def test_range_indexes_fall_back_to_btree(self):
+        """Test that other databases get a btree index of the fields."""
+        schema_editor = connection.schema_editor(collect_sql=True)
+        index = next(i for i in Trip._meta.indexes if isinstance(i, RangeIndex))
+        sql = str(index.create_sql(Trip, schema_editor))
+
+        assert "gist" not in sql.lower()
+        assert '"created_by_id", "start_date", "end_date"' in sql
+
+    def test_window_queries_use_indexed_spans(self, postgresql):
+        """Test that the timeline queries overlap the indexed expressions."""
+        from django.db.backends.postgresql.psycopg_any import (
+            DateRange,
+            DateTimeTZRange,
+        )
+
+        start, end = date(2024, 6, 1), date(2024, 6, 30)
+        trips_sql, trips_params = compile_sql(
+            trips_in_window(Trip.objects.using(postgresql), start, end)
+        )
+        flights_sql, flights_params = compile_sql(
+            flights_in_window(Flight.objects.using(postgresql), start, end)
+        )
+
+        assert (
+            'daterange("trips_trip"."start_date", GREATEST("trips_trip"."start_date", '
+            '"trips_trip"."end_date"), \'[]\') && %s'
+        ) in trips_sql
+        assert DateRange(start, end, "[]") in trips_params
+        assert (
+            'tstzrange("trips_flight"."departure_time", '
+            'GREATEST("trips_flight"."departure_time", '
+            '"trips_flight"."arrival_time"), \'[]\') && %s'
+        ) in flights_sql
+        assert DateTimeTZRange(*window_times(start, end), "[)") in flights_params
+
+    def test_search_uses_prefix_tsquery(self, postgresql):
+        """Test that search matches and ranks with a raw prefix tsquery."""
+        queryset = search(Trip.objects.using(postgresql), ["ber", "2024"])
+        sql, params = compile_sql(queryset.values("pk", "rank"))
+
+        assert '"trips_trip"."search_vector" @@ (to_tsquery(%s::regconfig, %s))' in sql
+        assert 'ts_rank("trips_trip"."search_vector", to_tsquery(' in sql
+        assert list(params).count("ber:* & 2024:*") == 2
+        assert SEARCH_CONFIG in params
+
+    def test_search_triggers(self, postgresql):
+        """Test that migration 0008 builds the vectors like search.py."""
+        migration = importlib.import_module("apps.trips.migrations.0008_search_vectors")
+        assert migration.CONFIG == SEARCH_CONFIG
+        assert migration.FIELDS == {
+            model._meta.db_table: fields for model, fields in SEARCH_FIELDS.items()
+        }
+
+        # PostgreSQL's schema editor needs a cursor even to collect SQL
+        statements = []
+        schema_editor = SimpleNamespace(
+            connection=connections[postgresql], execute=statements.append
+        )
+        migration.create_search_triggers(None, schema_editor)
+        sql = "\n".join(statements)
+
+        assert (
+            "BEFORE INSERT OR UPDATE OF name, destination, description ON trips_trip"
+        ) in sql
+        assert (
+            "setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(NEW.destination, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C')"
+        ) in sql
+        assert "UPDATE trips_flight SET search_vector = " in sql
+        assert (
+            "CREATE INDEX trips_flight_search_idx ON trips_flight "
+            "USING gin (created_by_id, search_vector) WHERE NOT is_deleted"
+        ) in sql
+
+        schema_editor.connection = connection
+        statements.clear()
+        migration.create_search_triggers(None, schema_editor)
+        assert statements == []
+
+    def test_default_queries_defer_search_vector(self):
+        """Test that only search() reads the search_vector columns."""
+        trip = Trip(pk=1)
+        for queryset in (
+            Trip.objects.all(),
+            Trip.active.all(),
+            Trip.all_objects.filter(is_deleted=True),
+            Flight.objects.all(),
+            Flight.active.all(),
+            Flight.all_objects.all(),
+            Flight._default_manager.all(),
+            trip.flights.all(),
+        ):
+            assert "search_vector" not in str(queryset.query)
+        assert "WHERE" not in str(Flight.all_objects.all().query)
+
+
+class TestExplainQueriesCommand:
+    @pytest.mark.django_db
+    def test_prints_plan_for_each_viewset_query(self, user, flight):
+        """Test that the command explains the hot queries of both viewsets."""
+        out = StringIO()
+        call_command("explain_queries", user=user.id, stdout=out)
+        output = out.getvalue()
+
+        for name in [
+            "TripViewSet.list",
+            "TripViewSet.list?cursor=",
+            "TripViewSet.retrieve",
+            "TripViewSet flights prefetch",
+            "FlightViewSet.list",
+            "FlightViewSet.list?cursor=",
+            "FlightViewSet.list?trip_id=",
+            "FlightViewSet.retrieve",
+        ]:
+            assert name in output, f"Missing plan for {name}"
+
+    @pytest.mark.django_db
+    def test_explains_the_list_query_of_the_view(self, user, trip, api_request_factory):
+        """Test that the explained trip list is the query the view runs."""
+        request = api_request_factory.get("/api/trips/")
+        force_authenticate(request, user=user)
+        with CaptureQueriesContext(connection) as queries:
+            TripViewSet.as_view({"get": "list"})(request)
+        out = StringIO()
+
+        call_command("explain_queries", user=user.id, stdout=out)
+
+        list_sql = out.getvalue().split("TripViewSet.list")[1].splitlines()[1]
+        assert list_sql.split(" FROM ")[0] in queries.captured_queries[-1]["sql"]
+        assert "search_vector" not in list_sql
+
+
+@pytest.fixture
+def async_request_factory():
+    return AsyncRequestFactory()
+
+
+class TestAsyncViews:
+    @pytest.mark.django_db
+    def test_list_requires_authentication(self, async_request_factory):
+        """Test that unauthenticated requests are denied."""
+        request = async_request_factory.get("/async/trips/")
+        response = async_to_sync(AsyncTripView.as_view())(request)
+
+        assert response.status_code == 403
+
+    @pytest.mark.django_db
+    def test_invalid_token_is_rejected(self, async_request_factory):
+        """Test that an invalid Bearer token returns 401."""
+        request = async_request_factory.get(
+            "/async/trips/", headers={"Authorization": "Bearer invalid_token"}
+        )
+        with patch("apps.users.backends._verify_token", return_value=None):
+            response = async_to_sync(AsyncTripView.as_view())(request)
+
+        assert response.status_code == 401
+
+    @pytest.mark.django_db
+    def test_list_matches_sync_viewset(
+        self, user, trip, flight, another_trip, async_request_factory
+    ):
+        """Test that the async list returns the same payload as TripViewSet."""
+        user.firebase_uid = "firebase123"
+        user.save()
+        request = async_request_factory.get(
+            "/async/trips/?expand=flights",
+            headers={"Authorization": "Bearer valid_token"},
+        )
+        with patch(
+            "apps.users.backends._verify_token", return_value={"uid": "firebase123"}
+        ):
+            response = async_to_sync(AsyncTripView.as_view())(request)
+
+        assert response.status_code == 200
+        results = json.loads(response.content)["results"]
+        assert [t["id"] for t in results] == [trip.id]
+        assert results[0]["flights"][0]["id"] == flight.id
+
+    @pytest.mark.django_db
+    def test_invalid_cursor_returns_404(self, user, trip, async_request_factory):
+        """Test that an invalid cursor is answered like the sync list."""
+        user.firebase_uid = "firebase123"
+        user.save()
+        request = async_request_factory.get(
+            "/async/trips/?cursor=garbage",
+            headers={"Authorization": "Bearer valid_token"},
+        )
+        with patch(
+            "apps.users.backends._verify_token", return_value={"uid": "firebase123"}
+        ):
+            response = async_to_sync(AsyncTripView.as_view())(request)
+
+        assert response.status_code == 404
+        assert json.loads(response.content) == {"detail": "Invalid cursor"}
+
+    @pytest.mark.django_db
+    def test_invalid_field_returns_400(self, user, async_request_factory):
+        """Test that validation errors keep their field keys."""
+        user.firebase_uid = "firebase123"
+        user.save()
+        request = async_request_factory.get(
+            "/async/trips/?fields=secret",
+            headers={"Authorization": "Bearer valid_token"},
+        )
+        with patch(
+            "apps.users.backends._verify_token", return_value={"uid": "firebase123"}
+        ):
+            response = async_to_sync(AsyncTripView.as_view())(request)
+
+        assert response.status_code == 400
+        assert "fields" in json.loads(response.content)
+
+    @pytest.mark.django_db
+    def test_retrieve_other_user_flight(
+        self, user, another_flight, async_request_factory
+    ):
+        """Test that a user cannot retrieve another user's flight."""
+        user.firebase_uid = "firebase123"
+        user.save()
+        request = async_request_factory.get(
+            f"/async/flights/{another_flight.id}/",
+            headers={"Authorization": "Bearer valid_token"},
+        )
+        view = AsyncFlightView.as_view()
+        with patch(
+            "apps.users.backends._verify_token", return_value={"uid": "firebase123"}
+        ):
+            with pytest.raises(Http404):
+                async_to_sync(view)(request, pk=another_flight.id)
@@ -0,0 +1,137 @@
+# backend/apps/trips/timeline.py
+
+import heapq
+from datetime import datetime, time, timedelta
+from operator import itemgetter
+
+from django.db import connections
+from django.db.backends.postgresql.psycopg_any import DateRange, DateTimeTZRange
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.core.indexes import span
+
+
+def window_times(start, end):
+    """
+    Return the times bounding a window of days in the current time zone.
+
+    Args:
+        start: The first day of the window.
+        end: The last day of the window, included.
+
+    Returns:
+        tuple: The start of the first day and the start of the day after the
+            last one.
+    """
+    tz = timezone.get_current_timezone()
+    return (
+        datetime.combine(start, time.min, tzinfo=tz),
+        datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz),
+    )
+
+
+def trips_in_window(queryset, start, end):
+    """
+    Filter trips to the ones with at least one day in a window of days.
+
+    On PostgreSQL this is an overlap query on the range of the trip's dates,
+    served by the GiST `trip_owner_dates_range_idx`. Elsewhere the bounds are
+    compared, served by the btree index with the same name.
+
+    Args:
+        queryset: The trips to filter.
+        start: The first day of the window.
+        end: The last day of the window, included.
+
+    Returns:
+        QuerySet: The trips intersecting the window.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        return queryset.alias(dates=span("start_date", "end_date", "daterange")).filter(
+            dates__overlap=DateRange(start, end, "[]")
+        )
+
+    # Clamped like the range, for trips ending before they start
+    return (
+        queryset.filter(start_date__lte=end)
+        .alias(until=Greatest("start_date", "end_date"))
+        .filter(until__gte=start)
+    )
+
+
+def flights_in_window(queryset, start, end):
+    """
+    Filter flights to the ones departing, in the air or arriving during a
+    window of days.
+
+    Args:
+        queryset: The flights to filter.
+        start: The first day of the window.
+        end: The last day of the window, included.
+
+    Returns:
+        QuerySet: The flights intersecting the window.
+    """
+    return flights_overlapping(queryset, *window_times(start, end), "[)")
+
+
+def flights_overlapping(queryset, lower, upper, bounds):
+    """
+    Filter flights to the ones whose time from departure to arrival overlaps
+    a range of times.
+
+    Like trips_in_window, this is an overlap query served by the GiST
+    `flight_owner_times_range_idx` on PostgreSQL, and compares the bounds
+    elsewhere.
+
+    Args:
+        queryset: The flights to filter.
+        lower: The lower bound of the range.
+        upper: The upper bound of the range.
+        bounds: Whether the bounds are included, like PostgreSQL ranges:
+            "[)" includes the lower bound only, "()" neither of them.
+
+    Returns:
+        QuerySet: The overlapping flights.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        return queryset.alias(
+            times=span("departure_time", "arrival_time", "tstzrange")
+        ).filter(times__overlap=DateTimeTZRange(lower, upper, bounds))
+
+    lower_lookup = "until__gte" if bounds[0] == "[" else "until__gt"
+    upper_lookup = "departure_time__lte" if bounds[1] == "]" else "departure_time__lt"
+    return (
+        queryset.filter(**{upper_lookup: upper})
+        .alias(until=Greatest("departure_time", "arrival_time"))
+        .filter(**{lower_lookup: lower})
+    )
+
+
+def merge_timeline(trips, flights):
+    """
+    Merge trips ordered by start date and flights ordered by departure time
+    into one chronological sequence.
+
+    The inputs are consumed lazily, one row at a time, so they can be
+    database cursors. A trip starts at midnight of its first day in the
+    current time zone, and comes before flights departing at the same time.
+
+    Args:
+        trips: `values()` rows of trips, ordered by `start_date` and `id`.
+        flights: `values()` rows of flights, ordered by `departure_time` and
+            `id`.
+
+    Yields:
+        tuple: The kind of row, "trip" or "flight", and the row.
+    """
+    tz = timezone.get_current_timezone()
+    trip_entries = (
+        ((datetime.combine(row["start_date"], time.min, tzinfo=tz), 0), "trip", row)
+        for row in trips
+    )
+    flight_entries = (((row["departure_time"], 1), "flight", row) for row in flights)
+
+    for _, kind, row in heapq.merge(trip_entries, flight_entries, key=itemgetter(0)):
+        yield kind, row
@@ -1,14 +1,47 @@
 # backend/apps/trips/views.py
 
+import heapq
+import io
+import itertools
+
+from django.conf import settings
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Max, Prefetch, Q
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import viewsets
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_safe
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
-from .models import Trip
+from rest_framework.response import Response
+from apps.core.http import iterate_in_thread
+from apps.core.renderers import CSVRenderer, NDJSONRenderer
+from .calendar import (
+    feed_validators,
+    get_feed,
+    get_feed_user_id,
+    get_or_create_feed,
+    rotate_feed_token,
+)
+from .cache import CachedResponseMixin, invalidate_user_responses
+from .conditional import ConditionalGetMixin
+from .conflicts import account_conflicts, flight_conflicts
+from .importers import FORMATS, ItineraryImporter, detect_format
+from .fast_serializers import FastListSerializer, FastSerializer
+from .models import Trip, Flight
+from .pagination import TripCursorPagination, FlightCursorPagination
+from .search import search, search_terms
 from .serializers import TripSerializer, FlightSerializer
+from .timeline import flights_in_window, merge_timeline, trips_in_window
 from apps.users.permissions import IsOwner
 
 
-class OwnerViewSet(viewsets.ModelViewSet):
+class OwnerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsOwner]
     owner_field = "created_by"
 
@@ -31,13 +64,377 @@ class OwnerViewSet(viewsets.ModelViewSet):
         return context
 
 
-class TripViewSet(OwnerViewSet):
+class TripViewSet(CachedResponseMixin, OwnerViewSet):
     serializer_class = TripSerializer
+    pagination_class = TripCursorPagination
     queryset = Trip.objects.all()
+    # Nested flights, when requested, are part of the representation.
+    # Soft-deleting a flight bumps its updated_at, so the latest update
+    # includes deleted flights. The flight summary columns are covered by
+    # the trips' own updated_at.
+    validator_aggregates = {
+        "flights_last_modified": Max("flights__updated_at"),
+        "flights_count": Count(
+            "flights", filter=Q(flights__is_deleted=False), distinct=True
+        ),
+    }
+
+    # Fields that are only included in lists when requested with `?expand=`
+    expandable_fields = ["flights"]
+    # Number of trips read from the database cursor at a time by the export
+    export_chunk_size = 500
+    # Longest window of days the timeline returns at once
+    timeline_max_days = 366
+    # Number of best matches returned by the search
+    search_limit = 20
+
+    def get_queryset(self):
+        """
+        Load the nested flights of all returned trips in a single query,
+        excluding soft-deleted flights.
+
+        For lists and single trips only the columns of the requested fields
+        are loaded, and the flights are not loaded at all unless requested.
+        """
+        queryset = super().get_queryset()
+        if self.action not in ("list", "retrieve"):
+            return queryset.prefetch_related(
+                Prefetch("flights", queryset=self.get_flights_queryset())
+            )
+
+        fields = self.get_representation_fields()
+        # The cursor pagination and the ownership check read these columns
+        columns = {"id", "start_date", "created_by"}
+        columns.update(f for f in fields if f not in self.expandable_fields)
+        queryset = queryset.only(*sorted(columns))
+        if "flights" in fields:
+            queryset = queryset.prefetch_related(
+                Prefetch("flights", queryset=self.get_flights_queryset())
+            )
+        return queryset
+
+    @action(detail=False, renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Stream all of the user's trips with their flights.
+
+        NDJSON has one trip per line with its flights nested like in
+        TripSerializer. CSV (`?format=csv` or `Accept: text/csv`) has one
+        row per flight, with the trip fields repeated, and one row for each
+        trip without flights. Trips are read from a database cursor in
+        chunks, so memory use doesn't grow with the size of the account.
+        Under ASGI the chunks are read as the client receives them, through
+        an async iterator.
+        """
+        renderer = request.accepted_renderer
+        chunks = self._export_chunks()
+        if renderer.format == "csv":
+            content = renderer.stream(
+                map(self._flatten_trips, chunks), self._export_csv_fields()
+            )
+        else:
+            content = renderer.stream(chunks)
+        if isinstance(request._request, ASGIRequest):
+            content = iterate_in_thread(content)
+
+        response = StreamingHttpResponse(content, content_type=renderer.media_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="travel-stream-trips.{renderer.format}"'
+        )
+        return response
+
+    @action(detail=False, methods=["get", "post"], url_path="calendar")
+    def calendar_feed(self, request):
+        """
+        Return the URL of the user's iCalendar feed. POST rotates the feed's
+        token, so the previous URL stops working.
+        """
+        if request.method == "POST":
+            feed = rotate_feed_token(request.user)
+        else:
+            feed = get_or_create_feed(request.user)
+        url = request.build_absolute_uri(reverse("calendar-ics", args=[feed.token]))
+        return Response({"url": url})
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_trips(self, request):
+        """
+        Import trips and flights from an uploaded CSV, ICS or JSON file, e.g.
+        an export. The format is taken from the `format` form field or the file
+        name. Existing flights are skipped, and the response has the number of
+        imported rows and the errors of invalid records.
+
+        A file that can't be parsed to the end stops the import, with its
+        `parse_error` in the response. The status is 207 if rows were written
+        from the records before the error, and 400 if nothing was.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["No file was submitted."]})
+        file_format = request.data.get("format") or detect_format(upload.name)
+        if file_format not in FORMATS:
+            raise ValidationError(
+                {"format": [f"Expected one of: {', '.join(FORMATS)}."]}
+            )
+
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        result = ItineraryImporter(request.user).run(stream, file_format)
+        if result["parse_error"] is None:
+            return Response(result)
+        if result["trips_created"] or result["flights_created"]:
+            return Response(result, status=status.HTTP_207_MULTI_STATUS)
+        return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False)
+    def timeline(self, request):
+        """
+        Return the user's trips and flights intersecting a window of days, in
+        chronological order.
+
+        `?start=` and `?end=` are the first and last day of the window, as
+        ISO dates. Trips are matched on their dates, flights on the time
+        from departure to arrival. Each table is read with one indexed
+        range query, and the two ordered cursors are merged as they are read.
+        """
+        start, end = self._timeline_window()
+        context = self.get_serializer_context()
+        trip_fields = [f for f in TripSerializer.Meta.fields if f != "flights"]
+        trips = FastSerializer(TripSerializer(fields=trip_fields, context=context))
+        flights = FastSerializer(FlightSerializer(context=context))
+        by_kind = {"trip": trips, "flight": flights}
+
+        trip_rows = trips.values(
+            trips_in_window(Trip.objects.filter(created_by=request.user), start, end),
+            ["start_date"],
+        ).order_by("start_date", "id")
+        flight_rows = flights.values(
+            flights_in_window(
+                Flight.objects.filter(created_by=request.user), start, end
+            ),
+            ["departure_time"],
+        ).order_by("departure_time", "id")
+
+        results = [
+            {"type": kind, "data": by_kind[kind].serialize([row])[0]}
+            for kind, row in merge_timeline(
+                trip_rows.iterator(chunk_size=self.export_chunk_size),
+                flight_rows.iterator(chunk_size=self.export_chunk_size),
+            )
+        ]
+        return Response(
+            {"start": start.isoformat(), "end": end.isoformat(), "results": results}
+        )
+
+    @action(detail=False, url_path="search")
+    def search_trips(self, request):
+        """
+        Search the user's trips by name, destination and description, and
+        their flights by flight and confirmation number, airline and
+        airports, e.g. `?q=berlin` or `?q=ua 123`.
+
+        Every term must match, as the start of a word on PostgreSQL. The best
+        `search_limit` trips and flights are returned together, best first.
+        """
+        terms = search_terms(request.query_params.get("q", ""))
+        if not terms:
+            raise ValidationError({"q": ["This query parameter is required."]})
+
+        context = self.get_serializer_context()
+        trip_fields = [f for f in TripSerializer.Meta.fields if f != "flights"]
+        trips = FastSerializer(TripSerializer(fields=trip_fields, context=context))
+        flights = FastSerializer(FlightSerializer(context=context))
+
+        matches = []
+        for kind, fast, model in (
+            ("trip", trips, Trip),
+            ("flight", flights, Flight),
+        ):
+            queryset = search(model.objects.filter(created_by=request.user), terms)
+            queryset = queryset.order_by("-rank", "id")[: self.search_limit]
+            rows = list(fast.values(queryset, ["rank"]))
+            items = fast.serialize(rows)
+            matches.append(
+                [(row["rank"], kind, item) for row, item in zip(rows, items)]
+            )
+
+        best = heapq.merge(*matches, key=lambda match: -match[0])
+        results = [
+            {"type": kind, "data": item}
+            for _, kind, item in itertools.islice(best, self.search_limit)
+        ]
+        return Response({"results": results})
+
+    def _timeline_window(self):
+        """
+        Parse the window of the timeline from the query parameters.
+
+        Returns:
+            tuple: The first and last day of the window.
+
+        Raises:
+            ValidationError: If a day is missing or invalid, or the window is
+                empty or longer than `timeline_max_days`.
+        """
+        days = {}
+        for name in ("start", "end"):
+            value = self.request.query_params.get(name)
+            if not value:
+                raise ValidationError({name: ["This query parameter is required."]})
+            try:
+                days[name] = parse_date(value)
+            except ValueError:
+                days[name] = None
+            if days[name] is None:
+                raise ValidationError(
+                    {name: ["Date has wrong format. Use YYYY-MM-DD."]}
+                )
+
+        start, end = days["start"], days["end"]
+        if end < start:
+            raise ValidationError({"end": ["Ensure this day is not before start."]})
+        if (end - start).days >= self.timeline_max_days:
+            raise ValidationError(
+                {
+                    "end": [
+                        f"Ensure the window has at most "
+                        f"{self.timeline_max_days} days."
+                    ]
+                }
+            )
+        return start, end
+
+    def _export_chunks(self):
+        """Yield the serialized trips, `export_chunk_size` trips at a time."""
+        fast = self.get_fast_serializer()
+        queryset = self.get_queryset().order_by(*self.pagination_class.ordering)
+        rows = fast.values(queryset).iterator(chunk_size=self.export_chunk_size)
+        while chunk := list(itertools.islice(rows, self.export_chunk_size)):
+            yield fast.serialize(chunk)
+
+    def _export_csv_fields(self):
+        trip_fields = TripSerializer(fields=self.get_representation_fields()).fields
+        flight_fields = FlightSerializer().fields
+        return [f"trip_{name}" for name in trip_fields if name != "flights"] + [
+            f"flight_{name}"
+            for name, field in flight_fields.items()
+            if not field.write_only and name != "trip"
+        ]
+
+    @staticmethod
+    def _flatten_trips(trips):
+        """Return one CSV row per flight, or per trip without flights."""
+        rows = []
+        for trip in trips:
+            flights = trip.pop("flights", [])
+            trip_row = {f"trip_{name}": value for name, value in trip.items()}
+            rows.extend(
+                {**trip_row, **{f"flight_{k}": v for k, v in flight.items()}}
+                for flight in flights
+            )
+            if not flights:
+                rows.append(trip_row)
+        return rows
+
+    def get_validator_aggregates(self):
+        """
+        Only aggregate over the flights when they are nested in the response,
+        so trip lists don't read the flights table at all.
+        """
+        if self.action in ("list", "retrieve"):
+            if "flights" not in self.get_representation_fields():
+                return {}
+        return super().get_validator_aggregates()
+
+    def get_flights_queryset(self):
+        """Return the nested flights of a trip, in the order they are listed."""
+        return Flight.objects.order_by("departure_time", "id")
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action == "list" and kwargs.get("many"):
+            return FastListSerializer(self.get_fast_serializer(), *args)
+        if self.action in ("list", "retrieve"):
+            kwargs.setdefault("fields", self.get_representation_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def paginate_queryset(self, queryset):
+        """Paginate lists as `values()` rows for the fast serializer."""
+        if self.action == "list":
+            queryset = self.get_list_rows(queryset)
+        return super().paginate_queryset(queryset)
+
+    def get_list_rows(self, queryset):
+        """Return the `values()` rows lists are paginated from."""
+        return self.get_fast_serializer().values(queryset, self.paginator.ordering)
+
+    def get_fast_serializer(self):
+        """
+        Return the read-only serializer used for lists. It produces the same
+        output as TripSerializer from `values()` rows, at a fraction of the CPU.
+        """
+        if not hasattr(self, "_fast_serializer"):
+            serializer = TripSerializer(
+                fields=self.get_representation_fields(),
+                context=self.get_serializer_context(),
+            )
+            self._fast_serializer = FastSerializer(
+                serializer, {"flights": self.get_flights_queryset()}
+            )
+        return self._fast_serializer
+
+    def get_representation_fields(self):
+        """
+        Return the names of the fields to include in list and detail
+        responses.
+
+        `?fields=name,destination` selects a subset of the fields and
+        `?expand=flights` adds the nested flights. Lists omit the flights
+        unless they are requested, single trips include all fields.
+
+        Returns:
+            list: The names of the serializer fields to include.
+
+        Raises:
+            ValidationError: If an unknown field is requested.
+        """
+        all_fields = TripSerializer.Meta.fields
+        fields = self._split_query_param("fields")
+        expand = self._split_query_param("expand") or []
+
+        unknown = set(fields or []) - set(all_fields)
+        if unknown:
+            raise ValidationError(
+                {"fields": [f"Unknown fields: {', '.join(sorted(unknown))}."]}
+            )
+        unknown = set(expand) - set(self.expandable_fields)
+        if unknown:
+            raise ValidationError(
+                {"expand": [f"Unknown fields: {', '.join(sorted(unknown))}."]}
+            )
+
+        if fields is None:
+            fields = [
+                f
+                for f in all_fields
+                if self.action != "list" or f not in self.expandable_fields
+            ]
+        return [f for f in all_fields if f in fields or f in expand]
+
+    def _split_query_param(self, name):
+        """Parse a comma-separated query parameter, None if it is missing."""
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return [v.strip() for v in value.split(",") if v.strip()]
 
 
 class FlightViewSet(OwnerViewSet):
     serializer_class = FlightSerializer
+    pagination_class = FlightCursorPagination
 
     def get_queryset(self):
         """
@@ -54,3 +451,133 @@ class FlightViewSet(OwnerViewSet):
                 # Optionally log the error or handle it as needed
                 pass
         return queryset
+
+    def create(self, request, *args, **kwargs):
+        """Create a flight, and report its conflicts with the user's schedule."""
+        response = super().create(request, *args, **kwargs)
+        response.data["conflicts"] = self._conflicts
+        return response
+
+    def update(self, request, *args, **kwargs):
+        """Update a flight, and report its conflicts with the user's schedule."""
+        response = super().update(request, *args, **kwargs)
+        response.data["conflicts"] = self._conflicts
+        return response
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self._conflicts = flight_conflicts(serializer.instance)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self._conflicts = flight_conflicts(serializer.instance)
+
+    @action(detail=False)
+    def conflicts(self, request):
+        """
+        Return all conflicts in the user's schedule: flights arriving before
+        they depart or outside the dates of their trip, overlapping flights
+        and trips sharing a day. Writes only report the conflicts of the
+        flight they save, so this also finds the ones of imported flights
+        and of trips whose dates changed.
+        """
+        conflicts = account_conflicts(request.user)
+        return Response({"count": len(conflicts), "results": conflicts})
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request):
+        """
+        Create a list of flights for one or more of the user's trips.
+
+        Trip ownership is validated with a single query and the flights are
+        inserted with one bulk INSERT inside a transaction. If any item is
+        invalid nothing is created, and the response is a list with the
+        errors of each item at its position, empty for valid items.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of flights."]})
+        if len(items) > settings.API_MAX_BULK_SIZE:
+            raise ValidationError(
+                {
+                    "non_field_errors": [
+                        f"Ensure this list has at most "
+                        f"{settings.API_MAX_BULK_SIZE} flights."
+                    ]
+                }
+            )
+
+        items = [self._normalize_bulk_item(item) for item in items]
+
+        context = self.get_serializer_context()
+        context["owned_trip_ids"] = self._owned_trip_ids(items)
+        serializer = FlightSerializer(data=items, many=True, context=context)
+        if not serializer.is_valid():
+            errors = serializer.errors
+            # DRF 3.17+ keys the errors by position, earlier versions list them
+            if isinstance(errors, dict) and all(isinstance(k, int) for k in errors):
+                errors = [errors.get(index, {}) for index in range(len(items))]
+            raise ValidationError(errors)
+
+        with transaction.atomic():
+            flights = serializer.save()
+        # bulk_create does not send post_save signals
+        invalidate_user_responses(request.user.pk)
+
+        return Response(
+            FlightSerializer(flights, many=True, context=context).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @staticmethod
+    def _normalize_bulk_item(item):
+        """
+        Accept `trip` as an alias of `trip_id` in bulk items, so that no item
+        needs its own Trip lookup during validation.
+        """
+        if not isinstance(item, dict) or "trip" not in item or "trip_id" in item:
+            return item
+        item = dict(item)
+        item["trip_id"] = item.pop("trip")
+        return item
+
+    def _owned_trip_ids(self, items):
+        """Return the ids of the referenced trips owned by the current user."""
+        trip_ids = set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                trip_ids.add(int(item.get("trip_id")))
+            except (TypeError, ValueError):
+                continue
+        return set(
+            Trip.objects.filter(
+                created_by=self.request.user, id__in=trip_ids
+            ).values_list("id", flat=True)
+        )
+
+
+@require_safe
+def calendar_ics(request, token):
+    """
+    Serve a user's trips and flights as an iCalendar feed.
+
+    The secret token in the URL authenticates the request, so polling calendar
+    clients skip Firebase token verification. An unchanged feed costs one
+    aggregate query and is answered with 304 Not Modified if the client sent
+    its ETag, or from the cache otherwise.
+    """
+    user_id = get_feed_user_id(token)
+    if user_id is None:
+        raise Http404
+
+    validators = feed_validators(user_id)
+    return ConditionalGetMixin.conditional_response(
+        request,
+        validators,
+        lambda: HttpResponse(
+            get_feed(user_id, validators.etag),
+            content_type="text/calendar; charset=utf-8",
+        ),
+    )
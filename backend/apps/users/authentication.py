@@ -18,6 +18,43 @@ class FirebaseAuthentication(authentication.BaseAuthentication):
     keyword = "Bearer"
 
     def authenticate(self, request):
+        firebase_token = self.get_token(request)
+        if firebase_token is None:
+            return None
+
+        # Use the existing authentication backend
+        backend = FirebaseAuthenticationBackend()
+        user = backend.authenticate(request, firebase_token=firebase_token)
+
+        if not user:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+
+        return user, firebase_token
+
+    async def aauthenticate(self, request):
+        """
+        Asynchronous version of `authenticate` for async views.
+        Accepts either a DRF Request or a plain Django HttpRequest.
+        """
+        firebase_token = self.get_token(request)
+        if firebase_token is None:
+            return None
+
+        backend = FirebaseAuthenticationBackend()
+        user = await backend.aauthenticate(request, firebase_token=firebase_token)
+
+        if not user:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+
+        return user, firebase_token
+
+    def get_token(self, request):
+        """
+        Extract the Firebase ID token from the Authorization header.
+
+        Returns:
+            The token, or None if the request does not use Bearer authentication.
+        """
         auth_header = request.META.get("HTTP_AUTHORIZATION")
         if not auth_header:
             return None
@@ -35,13 +72,4 @@ class FirebaseAuthentication(authentication.BaseAuthentication):
             msg = "Invalid token header. Token string should not contain spaces."
             raise exceptions.AuthenticationFailed(msg)
 
-        firebase_token = parts[1]
-
-        # Use the existing authentication backend
-        backend = FirebaseAuthenticationBackend()
-        user = backend.authenticate(request, firebase_token=firebase_token)
-
-        if not user:
-            raise exceptions.AuthenticationFailed("Invalid token.")
-
-        return user, firebase_token
+        return parts[1]
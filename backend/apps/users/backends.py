@@ -1,14 +1,25 @@
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.backends import BaseBackend
+from django.contrib.auth.hashers import make_password
 from django.utils import timezone
-from firebase_admin import auth
 from django.http import HttpRequest
 
+from apps.core.instrumentation import timer
+
+from .firebase import get_firebase_app
 from .models import User
+from .token_cache import token_cache
 
 
+@timer("auth")
 def _verify_token(firebase_token: str) -> dict | None:
     """
     Verify the given Firebase ID token using the Firebase Admin SDK.
+    Verified claims are cached in-process until the token expires, so repeated
+    requests with the same token skip the signature check.
 
     Args:
         firebase_token: The Firebase ID token.
@@ -18,9 +29,16 @@ def _verify_token(firebase_token: str) -> dict | None:
             parsed from the decoded JWT.
         None: If the token is invalid or expired.
     """
+    decoded_token = token_cache.get(firebase_token)
+    if decoded_token is not None:
+        return decoded_token
+
+    # Deferred so the Firebase Admin SDK is only loaded when first needed
+    from firebase_admin import auth
+
+    get_firebase_app()
     try:
         decoded_token = auth.verify_id_token(firebase_token)
-        return decoded_token
     except (
         ValueError,
         auth.InvalidIdTokenError,
@@ -31,6 +49,9 @@ def _verify_token(firebase_token: str) -> dict | None:
     ):
         return None
 
+    token_cache.set(firebase_token, decoded_token)
+    return decoded_token
+
 
 def _parse_http_x_forwarded_for_header(request: HttpRequest) -> str | None:
     """
@@ -50,6 +71,30 @@ def _parse_http_x_forwarded_for_header(request: HttpRequest) -> str | None:
     return None
 
 
+def _login_metadata_is_stale(user: User, ip: str | None, user_agent: str, now) -> bool:
+    """
+    Check whether the user's login metadata should be written to the database.
+    Writes are coalesced: the metadata is only persisted when the IP address
+    or user agent changed, or when LAST_LOGIN_UPDATE_INTERVAL seconds have
+    passed since the last recorded login. An interval of 0 disables coalescing.
+
+    Args:
+        user: The authenticated user.
+        ip: The client's IP address for the current request.
+        user_agent: The client's user agent for the current request.
+        now: The current time.
+
+    Returns:
+        bool: True if the login metadata should be saved, False otherwise.
+    """
+    interval = settings.LAST_LOGIN_UPDATE_INTERVAL
+    if interval <= 0 or user.last_login_at is None:
+        return True
+    if user.last_login_ip != ip or user.last_login_user_agent != user_agent:
+        return True
+    return now - user.last_login_at >= timedelta(seconds=interval)
+
+
 class FirebaseAuthenticationBackend(BaseBackend):
     """
     Custom authentication backend for Firebase Authentication.
@@ -78,19 +123,92 @@ class FirebaseAuthenticationBackend(BaseBackend):
             return None
 
         firebase_uid = decoded_token.get("uid")
+        login_metadata = self._login_metadata(request)
 
-        user, created = User.objects.get_or_create(firebase_uid=firebase_uid)
-        if created:
-            user.email = decoded_token.get("email", "")
-            user.set_unusable_password()
+        user, created = User.objects.get_or_create(
+            firebase_uid=firebase_uid,
+            defaults=self._new_user_defaults(decoded_token, login_metadata),
+        )
 
-        user.last_login_at = timezone.now()
-        user.last_login_ip = _parse_http_x_forwarded_for_header(request)
-        user.last_login_user_agent = request.META.get("HTTP_USER_AGENT", "unknown")
-        user.save()
+        if not created and self._update_login_metadata(user, login_metadata):
+            user.save(update_fields=list(login_metadata))
 
         return user
 
+    async def aauthenticate(
+        self, request: HttpRequest | None, firebase_token=None
+    ) -> User | None:
+        """
+        Asynchronous version of `authenticate`. The blocking token
+        verification, which may fetch Google's signing certificates, runs in a
+        worker thread so it does not block the event loop.
+
+        Args:
+            request: The HTTP request object or None if called from the backend.
+            firebase_token: The Firebase ID token containing the Firebase uid.
+
+        Returns:
+            User instance if authentication is successful, None otherwise.
+        """
+        if not firebase_token:
+            return None
+
+        decoded_token = await sync_to_async(_verify_token, thread_sensitive=False)(
+            firebase_token
+        )
+        if not decoded_token:
+            return None
+
+        firebase_uid = decoded_token.get("uid")
+        login_metadata = self._login_metadata(request)
+
+        user, created = await User.objects.aget_or_create(
+            firebase_uid=firebase_uid,
+            defaults=self._new_user_defaults(decoded_token, login_metadata),
+        )
+
+        if not created and self._update_login_metadata(user, login_metadata):
+            await user.asave(update_fields=list(login_metadata))
+
+        return user
+
+    @staticmethod
+    def _login_metadata(request: HttpRequest) -> dict:
+        """Collect the login metadata to record for the current request."""
+        return {
+            "last_login_at": timezone.now(),
+            "last_login_ip": _parse_http_x_forwarded_for_header(request),
+            "last_login_user_agent": request.META.get("HTTP_USER_AGENT", "unknown"),
+        }
+
+    @staticmethod
+    def _new_user_defaults(decoded_token: dict, login_metadata: dict) -> dict:
+        """Field values of a user created on their first login."""
+        return {
+            "email": decoded_token.get("email", ""),
+            "password": make_password(None),
+            **login_metadata,
+        }
+
+    @staticmethod
+    def _update_login_metadata(user: User, login_metadata: dict) -> bool:
+        """
+        Set the login metadata on the user if it is stale.
+
+        Returns:
+            bool: True if the user has to be saved, False otherwise.
+        """
+        if not _login_metadata_is_stale(
+            user,
+            login_metadata["last_login_ip"],
+            login_metadata["last_login_user_agent"],
+            login_metadata["last_login_at"],
+        ):
+            return False
+        for field, value in login_metadata.items():
+            setattr(user, field, value)
+        return True
+
     def get_user(self, user_id):
         """
         Retrieve the user by ID.
@@ -0,0 +1,90 @@
+# backend/apps/users/firebase.py
+
+import base64
+import binascii
+import json
+import logging
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_firebase_app = None
+_initialized = False
+_lock = threading.Lock()
+
+
+def get_firebase_app():
+    """
+    Return the Firebase app, initializing the Firebase Admin SDK on first use.
+
+    The SDK is only imported and initialized when a token is first verified,
+    so management commands, test runs and process startup don't pay for it.
+
+    Returns:
+        The initialized Firebase app, or None if initialization failed.
+    """
+    global _firebase_app, _initialized
+
+    if _initialized:
+        return _firebase_app
+
+    with _lock:
+        if not _initialized:
+            _firebase_app = _initialize_firebase()
+            _initialized = True
+
+    return _firebase_app
+
+
+def _initialize_firebase():
+    """
+    Initialize Firebase Admin SDK with service account credentials.
+
+    Returns:
+        The initialized Firebase app, or None if initialization failed.
+    """
+    import firebase_admin
+    from firebase_admin import credentials, exceptions
+
+    try:
+        decoded_credentials = _decode_firebase_credentials(
+            settings.GOOGLE_APPLICATION_CREDENTIALS
+        )
+        if not decoded_credentials:
+            return None
+        cred = credentials.Certificate(decoded_credentials)
+        firebase_app = firebase_admin.initialize_app(cred)
+    except exceptions.FirebaseError as e:
+        logger.error(f"Firebase initialization error: {e}")
+        return None
+
+    if settings.FIREBASE_PUBLIC_KEYS_PREFETCH:
+        from .keystore import key_store
+
+        key_store.install(firebase_app)
+
+    return firebase_app
+
+
+def _decode_firebase_credentials(encoded_credentials):
+    """
+    Decode the base64 encoded Firebase service account credentials.
+    This was added to support using JSON-formatted Firebase credentials
+    as an environment secret on Fly.io.
+
+    Args:
+        encoded_credentials:
+            Base64 encoded Firebase service account credentials string.
+    Returns:
+        Decoded Firebase service account credentials as a dictionary.
+    """
+    try:
+        decoded_bytes = base64.b64decode(encoded_credentials)
+        decoded_string = decoded_bytes.decode("utf-8")
+        decoded_credentials = json.loads(decoded_string)
+        return decoded_credentials
+    except (ValueError, json.JSONDecodeError, binascii.Error) as e:
+        logger.error(f"Error decoding Firebase credentials: {e}")
+        return None
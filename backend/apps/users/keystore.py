@@ -0,0 +1,209 @@
+# backend/apps/users/keystore.py
+
+import json
+import logging
+import re
+import threading
+import time
+
+import requests
+from google.auth import transport
+
+logger = logging.getLogger(__name__)
+
+ID_TOKEN_CERT_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/"
+    "securetoken@system.gserviceaccount.com"
+)
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class _CachedResponse(transport.Response):
+    """A google-auth transport response served from the key store."""
+
+    def __init__(self, data: bytes):
+        self._data = data
+
+    @property
+    def status(self):
+        return 200
+
+    @property
+    def headers(self):
+        return {"content-type": "application/json"}
+
+    @property
+    def data(self):
+        return self._data
+
+
+class KeyStoreRequest(transport.Request):
+    """
+    google-auth transport that serves Google's signing certificates from the
+    key store and delegates every other request to the original transport.
+    """
+
+    def __init__(self, key_store: "PublicKeyStore", delegate: transport.Request):
+        self.key_store = key_store
+        self.delegate = delegate
+
+    def __call__(self, url, method="GET", body=None, headers=None, **kwargs):
+        if method == "GET" and url == self.key_store.url:
+            data = self.key_store.get_certificates_json()
+            if data is not None:
+                return _CachedResponse(data)
+        return self.delegate(url, method=method, body=body, headers=headers, **kwargs)
+
+
+class PublicKeyStore:
+    """
+    In-process store of the public certificates used to sign Firebase ID tokens.
+
+    The certificates are loaded at startup, either from a local file or from
+    Google in a background thread, and refreshed there before they expire, so
+    token verification doesn't have to fetch them in the request path.
+    """
+
+    def __init__(
+        self,
+        url: str = ID_TOKEN_CERT_URL,
+        refresh_margin: int = 300,
+        retry_interval: int = 60,
+        timeout: int = 5,
+    ):
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self._certificates_json = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def expires_at(self) -> float:
+        return self._expires_at
+
+    def get_certificates_json(self) -> bytes | None:
+        """
+        Return the cached certificates as a JSON document.
+
+        Returns:
+            bytes: The certificates if they are loaded and not expired.
+            None: Otherwise, so the caller can fall back to fetching them.
+        """
+        with self._lock:
+            if self._certificates_json is None or self._expires_at <= time.time():
+                return None
+            return self._certificates_json
+
+    def set_certificates(self, certificates: dict, max_age: int) -> None:
+        """
+        Replace the stored certificates.
+
+        Args:
+            certificates: Mapping of key ids to PEM encoded certificates.
+            max_age: Number of seconds the certificates are valid for.
+        """
+        data = json.dumps(certificates).encode("utf-8")
+        with self._lock:
+            self._certificates_json = data
+            self._expires_at = time.time() + max_age
+
+    def load_file(self, path: str, max_age: int = 365 * 24 * 60 * 60) -> None:
+        """
+        Seed the store from a local JSON file, e.g. for offline tests.
+        Certificates loaded from a file are not refreshed in the background.
+
+        Args:
+            path: Path of a JSON file mapping key ids to PEM certificates.
+            max_age: Number of seconds the certificates are considered valid.
+        """
+        with open(path, encoding="utf-8") as f:
+            self.set_certificates(json.load(f), max_age)
+
+    def fetch(self) -> int:
+        """
+        Fetch the certificates from Google and store them for as long as the
+        response's Cache-Control max-age allows.
+
+        Returns:
+            The max-age of the fetched certificates, in seconds.
+        """
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        match = _MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+        max_age = int(match.group(1)) if match else 3600
+        self.set_certificates(response.json(), max_age)
+        return max_age
+
+    def start(self, path: str | None = None) -> None:
+        """
+        Load the certificates and schedule their background refresh.
+
+        The first fetch from Google runs in the background too, so a slow or
+        unreachable Google doesn't delay startup. Until it completes, token
+        verification fetches the certificates itself.
+
+        Args:
+            path: Optional JSON file to seed the store from instead of fetching
+                the certificates from Google.
+        """
+        if path:
+            self.load_file(path)
+            return
+        self._schedule(0)
+
+    def refresh(self) -> None:
+        """Fetch the certificates now and schedule the next refresh."""
+        try:
+            max_age = self.fetch()
+            delay = max(max_age - self.refresh_margin, self.retry_interval)
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Error fetching Firebase public keys: {e}")
+            delay = self.retry_interval
+        self._schedule(delay)
+
+    def stop(self) -> None:
+        """Cancel the scheduled background refresh."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _schedule(self, delay: float) -> None:
+        self.stop()
+        self._timer = threading.Timer(delay, self.refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def install(self, app=None) -> None:
+        """
+        Make the Firebase Admin SDK read the ID token signing certificates
+        from this store.
+
+        The SDK has no public hook for this, so the transport of the auth
+        client's token verifier is wrapped. Requests for other URLs and
+        lookups while the store is empty or expired still go to the network.
+        If a release of the SDK renames the wrapped attributes, the SDK
+        keeps fetching the certificates itself.
+
+        Args:
+            app: The Firebase app, or None for the default app.
+        """
+        from firebase_admin import auth
+
+        try:
+            token_verifier = auth._get_client(app)._token_verifier
+            request = token_verifier.request
+        except AttributeError as e:
+            logger.warning(
+                f"Firebase public key store not installed, the SDK will fetch "
+                f"the keys itself: {e}"
+            )
+            return
+        if not isinstance(request, KeyStoreRequest):
+            token_verifier.request = KeyStoreRequest(self, request)
+
+
+key_store = PublicKeyStore()
@@ -0,0 +1,24 @@
+# backend/apps/users/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User
+from .token_cache import invalidate_user_tokens
+
+
+@receiver(post_save, sender=User)
+def invalidate_tokens_of_inactive_user(sender, instance, **kwargs):
+    """
+    Drop the cached tokens of a user who was deactivated or soft deleted, so
+    they are verified with Firebase again. Soft deletion goes through save().
+    """
+    if instance.firebase_uid and (not instance.is_active or instance.is_deleted):
+        invalidate_user_tokens(instance.firebase_uid)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_tokens_of_erased_user(sender, instance, **kwargs):
+    """Drop the cached tokens of a user who was erased."""
+    if instance.firebase_uid:
+        invalidate_user_tokens(instance.firebase_uid)
@@ -1,4 +1,7 @@
+from datetime import timedelta
+
 import pytest
+from asgiref.sync import async_to_sync
 from unittest.mock import patch, MagicMock
 from django.utils import timezone
 from django.http import HttpRequest
@@ -126,3 +129,99 @@ class TestFirebaseAuthenticationBackend:
         result = backend.get_user(999)
 
         assert result is None
+
+    def test_authenticate_skips_write_when_login_metadata_is_fresh(
+        self, mock_request, settings, django_assert_num_queries
+    ):
+        """Test that unchanged login metadata is not rewritten on every request."""
+        settings.LAST_LOGIN_UPDATE_INTERVAL = 300
+        last_login_at = timezone.now()
+        User.objects.create(
+            firebase_uid="firebase123",
+            last_login_at=last_login_at,
+            last_login_ip="192.168.1.1",
+            last_login_user_agent="Test User Agent",
+        )
+
+        with patch("apps.users.backends._verify_token") as mock_verify:
+            mock_verify.return_value = {"uid": "firebase123"}
+
+            backend = FirebaseAuthenticationBackend()
+            # Only the SELECT from get_or_create, no UPDATE
+            with django_assert_num_queries(1):
+                authenticated_user = backend.authenticate(
+                    mock_request, firebase_token="valid_token"
+                )
+
+            assert authenticated_user.last_login_at == last_login_at
+
+    def test_authenticate_writes_when_user_agent_changes(self, mock_request, settings):
+        """Test that a changed user agent is persisted immediately."""
+        settings.LAST_LOGIN_UPDATE_INTERVAL = 300
+        user = User.objects.create(
+            firebase_uid="firebase123",
+            last_login_at=timezone.now(),
+            last_login_ip="192.168.1.1",
+            last_login_user_agent="Old User Agent",
+        )
+
+        with patch("apps.users.backends._verify_token") as mock_verify:
+            mock_verify.return_value = {"uid": "firebase123"}
+
+            backend = FirebaseAuthenticationBackend()
+            backend.authenticate(mock_request, firebase_token="valid_token")
+
+            user.refresh_from_db()
+            assert user.last_login_user_agent == "Test User Agent"
+
+    def test_authenticate_writes_when_interval_has_passed(self, mock_request, settings):
+        """Test that the login time is refreshed once the interval has passed."""
+        settings.LAST_LOGIN_UPDATE_INTERVAL = 300
+        old_login_time = timezone.now() - timedelta(seconds=301)
+        user = User.objects.create(
+            firebase_uid="firebase123",
+            last_login_at=old_login_time,
+            last_login_ip="192.168.1.1",
+            last_login_user_agent="Test User Agent",
+        )
+        original_updated_at = user.updated_at
+
+        with patch("apps.users.backends._verify_token") as mock_verify:
+            mock_verify.return_value = {"uid": "firebase123"}
+
+            backend = FirebaseAuthenticationBackend()
+            backend.authenticate(mock_request, firebase_token="valid_token")
+
+            user.refresh_from_db()
+            assert user.last_login_at > old_login_time
+            # Only the login metadata columns are updated
+            assert user.updated_at == original_updated_at
+
+    def test_aauthenticate_existing_user(self, mock_request):
+        """Test asynchronous authentication with a valid token."""
+        user = User.objects.create(firebase_uid="firebase123")
+
+        with patch("apps.users.backends._verify_token") as mock_verify:
+            mock_verify.return_value = {"uid": "firebase123"}
+
+            backend = FirebaseAuthenticationBackend()
+            authenticated_user = async_to_sync(backend.aauthenticate)(
+                mock_request, firebase_token="valid_token"
+            )
+
+            user.refresh_from_db()
+            assert authenticated_user.id == user.id
+            assert user.last_login_ip == "192.168.1.1"
+            mock_verify.assert_called_once_with("valid_token")
+
+    def test_aauthenticate_invalid_token(self, mock_request):
+        """Test asynchronous authentication with an invalid token."""
+        with patch("apps.users.backends._verify_token") as mock_verify:
+            mock_verify.return_value = None
+
+            backend = FirebaseAuthenticationBackend()
+            result = async_to_sync(backend.aauthenticate)(
+                mock_request, firebase_token="invalid_token"
+            )
+
+            assert result is None
@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from apps.users.keystore import KeyStoreRequest, PublicKeyStore
+
+CERTIFICATES = {"key1": "-----BEGIN CERTIFICATE-----\n..."}
+
+
+@pytest.fixture
+def key_store():
+    store = PublicKeyStore(url="https://example.com/certs")
+    yield store
+    store.stop()
+
+
+@pytest.fixture
+def certificates_file(tmp_path):
+    path = tmp_path / "public_keys.json"
+    path.write_text(json.dumps(CERTIFICATES))
+    return str(path)
+
+
+class TestPublicKeyStore:
+
+    def test_start_seeds_from_file_without_network(self, key_store, certificates_file):
+        """Test that the store can be seeded from a local file for offline use."""
+        with patch("apps.users.keystore.requests.get") as mock_get:
+            key_store.start(certificates_file)
+
+            mock_get.assert_not_called()
+        assert json.loads(key_store.get_certificates_json()) == CERTIFICATES
+
+    def test_start_fetches_in_the_background(self, key_store):
+        """Test that startup doesn't wait for the first fetch."""
+        fetching = threading.Event()
+        release = threading.Event()
+
+        def fetch():
+            fetching.set()
+            release.wait(5)
+            key_store.set_certificates(CERTIFICATES, max_age=3600)
+            return 3600
+
+        with patch.object(key_store, "fetch", side_effect=fetch):
+            key_store.start()
+
+            assert fetching.wait(5), "The first fetch is started right away"
+            assert key_store.get_certificates_json() is None
+            first_fetch = key_store._timer
+            release.set()
+            first_fetch.join(5)
+
+        assert json.loads(key_store.get_certificates_json()) == CERTIFICATES
+
+    def test_fetch_uses_cache_control_max_age(self, key_store):
+        """Test that fetched certificates expire according to Cache-Control."""
+        response = MagicMock()
+        response.headers = {"Cache-Control": "public, max-age=19000"}
+        response.json.return_value = CERTIFICATES
+
+        with patch("apps.users.keystore.requests.get", return_value=response):
+            assert key_store.fetch() == 19000
+
+        assert key_store.expires_at == pytest.approx(time.time() + 19000, abs=5)
+        assert json.loads(key_store.get_certificates_json()) == CERTIFICATES
+
+    def test_refresh_is_scheduled_before_expiry(self, key_store):
+        """Test that the next refresh happens refresh_margin before expiry."""
+        with patch.object(key_store, "fetch", return_value=3600):
+            with patch.object(key_store, "_schedule") as mock_schedule:
+                key_store.refresh()
+
+                mock_schedule.assert_called_once_with(3600 - key_store.refresh_margin)
+
+    def test_failed_refresh_is_retried(self, key_store):
+        """Test that a failed fetch is retried after retry_interval."""
+        with patch.object(
+            key_store, "fetch", side_effect=requests.ConnectionError("offline")
+        ):
+            with patch.object(key_store, "_schedule") as mock_schedule:
+                key_store.refresh()
+
+                mock_schedule.assert_called_once_with(key_store.retry_interval)
+
+    def test_expired_certificates_are_not_served(self, key_store):
+        """Test that expired certificates are not returned."""
+        key_store.set_certificates(CERTIFICATES, max_age=-1)
+
+        assert key_store.get_certificates_json() is None
+
+
+class TestKeyStoreRequest:
+
+    def test_serves_certificates_from_store(self, key_store):
+        """Test that certificate requests do not hit the network."""
+        key_store.set_certificates(CERTIFICATES, max_age=3600)
+        delegate = MagicMock()
+        request = KeyStoreRequest(key_store, delegate)
+
+        response = request(key_store.url, method="GET")
+
+        assert response.status == 200
+        assert json.loads(response.data.decode("utf-8")) == CERTIFICATES
+        delegate.assert_not_called()
+
+    def test_delegates_when_store_is_empty(self, key_store):
+        """Test that an empty store falls back to the original transport."""
+        delegate = MagicMock()
+        request = KeyStoreRequest(key_store, delegate)
+
+        request(key_store.url, method="GET")
+
+        delegate.assert_called_once()
+
+    def test_delegates_other_urls(self, key_store):
+        """Test that unrelated requests go to the original transport."""
+        key_store.set_certificates(CERTIFICATES, max_age=3600)
+        delegate = MagicMock()
+        request = KeyStoreRequest(key_store, delegate)
+
+        request("https://example.com/other", method="GET")
+
+        delegate.assert_called_once()
+
+    def test_install_wraps_token_verifier_transport(self, key_store):
+        """Test that install makes the SDK's token verifier use the store."""
+        client = MagicMock()
+        original_request = client._token_verifier.request
+
+        with patch("firebase_admin.auth._get_client", return_value=client):
+            key_store.install()
+            key_store.install()
+
+        assert isinstance(client._token_verifier.request, KeyStoreRequest)
+        assert client._token_verifier.request.delegate is original_request
+
+    def test_install_falls_back_when_sdk_changes(self, key_store, caplog):
+        """Test that install leaves the SDK alone if its internals changed."""
+        client = MagicMock(spec=[])
+
+        with patch("firebase_admin.auth._get_client", return_value=client):
+            key_store.install()
+
+        assert "not installed" in caplog.text
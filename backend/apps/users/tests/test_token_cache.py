@@ -0,0 +1,147 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from apps.users.backends import _verify_token
+from apps.users.token_cache import TokenCache, token_cache
+
+
+def make_claims(uid="firebase123", expires_in=3600):
+    return {"uid": uid, "exp": int(time.time()) + expires_in}
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+class TestTokenCache:
+
+    def test_get_returns_cached_claims(self):
+        """Test that cached claims are returned and counted as a hit."""
+        cache = TokenCache(maxsize=10)
+        claims = make_claims()
+        cache.set("token", claims)
+
+        assert cache.get("token") == claims
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 0
+
+    def test_get_unknown_token_is_a_miss(self):
+        """Test that an unknown token is counted as a miss."""
+        cache = TokenCache(maxsize=10)
+
+        assert cache.get("token") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_expired_token_is_not_returned(self):
+        """Test that entries expire at the token's exp claim."""
+        cache = TokenCache(maxsize=10)
+        claims = make_claims(expires_in=10)
+        cache.set("token", claims)
+
+        with patch("apps.users.token_cache.time.time") as mock_time:
+            mock_time.return_value = claims["exp"] + 1
+            assert cache.get("token") is None
+
+        assert cache.stats()["size"] == 0
+
+    def test_token_without_exp_is_not_cached(self):
+        """Test that claims without an exp claim are never cached."""
+        cache = TokenCache(maxsize=10)
+        cache.set("token", {"uid": "firebase123"})
+
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache is bounded and evicts the LRU entry."""
+        cache = TokenCache(maxsize=2)
+        cache.set("token1", make_claims(uid="one"))
+        cache.set("token2", make_claims(uid="two"))
+        cache.get("token1")
+        cache.set("token3", make_claims(uid="three"))
+
+        assert cache.get("token2") is None
+        assert cache.get("token1") is not None
+        assert cache.get("token3") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_zero_size_disables_cache(self):
+        """Test that a cache size of 0 disables caching."""
+        cache = TokenCache(maxsize=0)
+        cache.set("token", make_claims())
+
+        assert cache.get("token") is None
+        assert cache.stats()["size"] == 0
+
+    def test_invalidate_user(self):
+        """Test that all tokens of a revoked user are invalidated."""
+        cache = TokenCache(maxsize=10)
+        cache.set("token1", make_claims(uid="revoked"))
+        cache.set("token2", make_claims(uid="revoked"))
+        cache.set("token3", make_claims(uid="other"))
+
+        assert cache.invalidate_user("revoked") == 2
+        assert cache.get("token1") is None
+        assert cache.get("token2") is None
+        assert cache.get("token3") is not None
+
+
+class TestVerifyTokenCaching:
+
+    def test_repeated_token_is_verified_once(self):
+        """Test that a verified token skips the SDK on subsequent calls."""
+        claims = make_claims()
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify:
+            mock_verify.return_value = claims
+
+            assert _verify_token("valid_token") == claims
+            assert _verify_token("valid_token") == claims
+
+            mock_verify.assert_called_once_with("valid_token")
+
+    def test_invalid_token_is_not_cached(self):
+        """Test that failed verifications are not cached."""
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify:
+            mock_verify.side_effect = ValueError("Invalid token")
+
+            assert _verify_token("invalid_token") is None
+            assert _verify_token("invalid_token") is None
+
+            assert mock_verify.call_count == 2
+
+
+class TestUserInvalidation:
+    @pytest.fixture
+    def firebase_user(self, django_user_model):
+        user = django_user_model.objects.create_user(
+            username="firebaseuser", firebase_uid="firebase123"
+        )
+        token_cache.set("token", make_claims(uid="firebase123"))
+        return user
+
+    @pytest.mark.django_db
+    def test_saving_an_active_user_keeps_tokens(self, firebase_user):
+        """Test that ordinary saves, e.g. of login metadata, keep the tokens."""
+        firebase_user.save()
+
+        assert token_cache.get("token") is not None
+
+    @pytest.mark.django_db
+    def test_deactivating_a_user_invalidates_tokens(self, firebase_user):
+        """Test that a deactivated user's tokens are verified again."""
+        firebase_user.is_active = False
+        firebase_user.save()
+
+        assert token_cache.get("token") is None
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("method", ["delete", "erase"])
+    def test_deleting_a_user_invalidates_tokens(self, firebase_user, method):
+        """Test that soft deleted and erased users' tokens are dropped."""
+        getattr(firebase_user, method)()
+
+        assert token_cache.get("token") is None
@@ -0,0 +1,146 @@
+# backend/apps/users/token_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class TokenCache:
+    """
+    Bounded, thread-safe LRU cache of verified Firebase ID token claims.
+
+    Entries are keyed on a SHA-256 hash of the raw token, so tokens are never
+    kept in memory as-is, and they expire at the token's `exp` claim.
+    Tokens without an `exp` claim are never cached.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(firebase_token: str) -> str:
+        return hashlib.sha256(firebase_token.encode("utf-8")).hexdigest()
+
+    def get(self, firebase_token: str) -> dict | None:
+        """
+        Return the cached claims for the given token.
+
+        Args:
+            firebase_token: The Firebase ID token.
+
+        Returns:
+            dict: The decoded claims if the token is cached and not expired.
+            None: If the token is not cached or has expired.
+        """
+        if self.maxsize <= 0:
+            return None
+
+        key = self._key(firebase_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, claims = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def set(self, firebase_token: str, claims: dict) -> None:
+        """
+        Cache the decoded claims of a verified token until its `exp` claim.
+
+        Args:
+            firebase_token: The Firebase ID token.
+            claims: The decoded claims returned by the Firebase Admin SDK.
+        """
+        expires_at = claims.get("exp")
+        if self.maxsize <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        if expires_at <= time.time():
+            return
+
+        key = self._key(firebase_token)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, firebase_uid: str) -> int:
+        """
+        Drop every cached token belonging to the given Firebase user,
+        e.g. after their refresh tokens have been revoked.
+
+        Args:
+            firebase_uid: The Firebase uid of the user.
+
+        Returns:
+            The number of cached tokens that were removed.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key, (_, claims) in self._entries.items()
+                if claims.get("uid") == firebase_uid
+            ]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Return the current size and hit/miss/eviction counters, served at
+        /metrics/.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+
+token_cache = TokenCache(maxsize=settings.FIREBASE_TOKEN_CACHE_SIZE)
+
+
+def invalidate_user_tokens(firebase_uid: str) -> int:
+    """
+    Invalidate all cached tokens of a revoked or disabled Firebase user.
+    Called when a user is deactivated or deleted, see signals.py. Other
+    worker processes keep their entries until the tokens expire.
+
+    Args:
+        firebase_uid: The Firebase uid of the user.
+
+    Returns:
+        The number of cached tokens that were removed.
+    """
+    return token_cache.invalidate_user(firebase_uid)
@@ -1,7 +1,9 @@
 from django.contrib.auth import authenticate, logout
 from django.shortcuts import render  # noqa: F401
 from django.views.decorators.http import require_POST
-from django.http import HttpRequest, JsonResponse
+from django.http import HttpRequest
+
+from apps.core.http import JsonResponse
 
 
 @require_POST
@@ -0,0 +1,183 @@
+# backend/benchmarks/conftest.py
+
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from apps.trips.calendar import get_or_create_feed
+from apps.trips.models import CalendarFeed, Flight, Trip
+from apps.users.models import User
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = BENCHMARKS_DIR / "baseline.json"
+RESULTS_PATH = Path(
+    os.environ.get("BENCHMARK_RESULTS", BENCHMARKS_DIR / "results.json")
+)
+
+# Timed requests per endpoint, after one warm-up request
+ITERATIONS = int(os.environ.get("BENCHMARK_ITERATIONS", 30))
+# The p50 latency may be this many times the baseline's before the benchmark
+# fails, plus a few milliseconds so fast endpoints don't fail on scheduler
+# noise. The p99 of a few dozen requests is too noisy to fail on.
+LATENCY_TOLERANCE = float(os.environ.get("BENCHMARK_TOLERANCE", 3.0))
+LATENCY_SLACK_MS = 5.0
+# Set to record the results as the baseline of the current database vendor
+UPDATE_BASELINE = os.environ.get("BENCHMARK_UPDATE_BASELINE", "") not in ("", "0")
+
+# Name: (users, trips per user, flights per trip)
+SCALES = {
+    "small": (2, 10, 2),
+    "large": (5, 1_000, 5),
+}
+
+USER_PREFIX = "benchmark-user-"
+
+
+def seed(users: int, trips_per_user: int, flights_per_trip: int) -> list[User]:
+    """Bulk create users, each with their own trips, flights and calendar feed."""
+    accounts = User.objects.bulk_create(
+        User(
+            username=f"{USER_PREFIX}{i}",
+            email=f"{USER_PREFIX}{i}@example.com",
+            firebase_uid=f"{USER_PREFIX}{i}",
+        )
+        for i in range(users)
+    )
+    departure = timezone.make_aware(datetime(2023, 1, 1, 8))
+    for user in accounts:
+        trips = Trip.objects.bulk_create(
+            Trip(
+                created_by=user,
+                name=f"Trip {i}",
+                description=f"Description {i}" if i % 2 else None,
+                destination="Test Destination",
+                start_date=date(2023, 1, 1) + timedelta(days=i),
+                end_date=date(2023, 1, 8) + timedelta(days=i),
+            )
+            for i in range(trips_per_user)
+        )
+        Flight.objects.bulk_create(
+            (
+                Flight(
+                    created_by=user,
+                    trip=trip,
+                    airline="Test Airline",
+                    confirmation_number="ABC123" if j % 2 else None,
+                    flight_number=f"TA{j}",
+                    departure_airport="SFO",
+                    arrival_airport="JFK",
+                    departure_time=departure + timedelta(days=i, hours=j),
+                    arrival_time=departure + timedelta(days=i, hours=j + 6),
+                )
+                for i, trip in enumerate(trips)
+                for j in range(flights_per_trip)
+            ),
+            batch_size=1_000,
+        )
+        get_or_create_feed(user)
+    return accounts
+
+
+def erase(users: list[User]) -> None:
+    Flight.all_objects.filter(created_by__in=users).delete()
+    Trip.all_objects.filter(created_by__in=users).delete()
+    CalendarFeed.all_objects.filter(created_by__in=users).delete()
+    User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+
+@pytest.fixture(scope="session", params=list(SCALES))
+def dataset(request, django_db_setup, django_db_blocker):
+    """
+    Seed a scale's data once for all benchmarks. The benchmarks run in
+    transactions that are rolled back, so writes don't leak between them.
+    """
+    with django_db_blocker.unblock():
+        users = seed(*SCALES[request.param])
+    yield {"scale": request.param, "user": users[0]}
+    with django_db_blocker.unblock():
+        erase(users)
+
+
+@pytest.fixture(autouse=True)
+def stub_firebase():
+    """Accept any Bearer token as the ID token of the user with that uid."""
+    with (
+        patch("apps.users.backends.get_firebase_app"),
+        patch(
+            "firebase_admin.auth.verify_id_token",
+            side_effect=lambda token: {"uid": token, "exp": time.time() + 3600},
+        ),
+    ):
+        yield
+
+
+class Results:
+    """Collects the measurements and compares them against the baseline."""
+
+    def __init__(self):
+        self.vendor = connection.vendor
+        self.measurements = {}
+        baseline = (
+            json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+        )
+        self.all_baselines = baseline
+        self.baseline = baseline.get(self.vendor, {})
+
+    def add(self, key: str, measurement: dict) -> list[str]:
+        """
+        Store a measurement and return how it regressed against the baseline.
+        Query counts must not grow, the p50 latency is compared with tolerance.
+        """
+        self.measurements[key] = measurement
+        expected = self.baseline.get(key)
+        if UPDATE_BASELINE or expected is None:
+            return []
+
+        regressions = []
+        if measurement["queries"] > expected["queries"]:
+            regressions.append(
+                f"{measurement['queries']} queries, baseline {expected['queries']}"
+            )
+        limit = expected["p50_ms"] * LATENCY_TOLERANCE + LATENCY_SLACK_MS
+        if measurement["p50_ms"] > limit:
+            regressions.append(
+                f"p50 {measurement['p50_ms']:.1f}ms, "
+                f"baseline {expected['p50_ms']:.1f}ms"
+            )
+        return regressions
+
+    def write(self) -> None:
+        RESULTS_PATH.write_text(
+            json.dumps(
+                {"vendor": self.vendor, "results": self.measurements},
+                indent=2,
+                sort_keys=True,
+            )
+            + "\n"
+        )
+        if UPDATE_BASELINE:
+            # Merged, so a run of some of the benchmarks updates only those
+            self.all_baselines.setdefault(self.vendor, {}).update(
+                {
+                    key: {name: measurement[name] for name in ("queries", "p50_ms")}
+                    for key, measurement in self.measurements.items()
+                }
+            )
+            BASELINE_PATH.write_text(
+                json.dumps(self.all_baselines, indent=2, sort_keys=True) + "\n"
+            )
+
+
+@pytest.fixture(scope="session")
+def results(django_db_setup):
+    collected = Results()
+    yield collected
+    if collected.measurements:
+        collected.write()
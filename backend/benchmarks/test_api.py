@@ -0,0 +1,184 @@
+# backend/benchmarks/test_api.py
+
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from apps.trips.models import CalendarFeed, Flight, Trip
+
+from .conftest import ITERATIONS
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+TRIP = {
+    "name": "Benchmark Trip",
+    "description": "Created by the benchmarks",
+    "destination": "Test Destination",
+    "start_date": "2024-01-01",
+    "end_date": "2024-01-08",
+}
+
+IMPORT_CSV = "trip_name,trip_destination,trip_start_date,trip_end_date,"
+IMPORT_CSV += "flight_airline,flight_flight_number,flight_departure_airport,"
+IMPORT_CSV += "flight_arrival_airport,flight_departure_time,flight_arrival_time\n"
+IMPORT_CSV += "".join(
+    f"Imported {i},Paris,2024-02-01,2024-02-08,Test Airline,TA{i},SFO,CDG,"
+    f"2024-02-01T08:00:00Z,2024-02-01T18:00:00Z\n"
+    for i in range(10)
+)
+
+
+def restore_trip(context):
+    Trip.all_objects.filter(pk=context["trip"]).update(
+        is_deleted=False, deleted_at=None
+    )
+
+
+def flight(context):
+    return {
+        "trip_id": context["trip"],
+        "airline": "Test Airline",
+        "flight_number": "TA999",
+        "departure_airport": "SFO",
+        "arrival_airport": "JFK",
+        "departure_time": "2024-01-01T08:00:00Z",
+        "arrival_time": "2024-01-01T16:00:00Z",
+    }
+
+
+@dataclass
+class Endpoint:
+    """
+    A request to benchmark. `path` is formatted with the ids of the benchmark
+    user's first trip and flight and the user's calendar feed token, and
+    `data` may be a function of those. `after` is called with them after
+    every request, e.g. to undo a deletion.
+    """
+
+    name: str
+    method: str
+    path: str
+    data: Any = None
+    content_type: str = "application/json"
+    status: int = 200
+    headers: dict = field(default_factory=dict)
+    after: Callable[[dict], None] | None = None
+
+    def request(self, client: Client, context: dict):
+        data = self.data(context) if callable(self.data) else self.data
+        kwargs = {"headers": self.headers}
+        if data is not None:
+            kwargs["data"] = data
+            if self.content_type is not None:
+                kwargs["content_type"] = self.content_type
+        response = getattr(client, self.method)(self.path.format(**context), **kwargs)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        if self.after is not None:
+            self.after(context)
+        return response
+
+
+# Every route in travel_stream/urls.py, except the admin and /metrics/
+ENDPOINTS = [
+    Endpoint("health_check", "get", "/health_check/"),
+    Endpoint("csrf", "get", "/csrf/"),
+    Endpoint("test_post", "post", "/test_post/"),
+    Endpoint("login", "post", "/users/login/"),
+    Endpoint("logout", "post", "/users/logout/"),
+    Endpoint("trip_list", "get", "/trips/"),
+    Endpoint("trip_list_expanded", "get", "/trips/?expand=flights"),
+    Endpoint("trip_detail", "get", "/trips/{trip}/"),
+    Endpoint("trip_create", "post", "/trips/", TRIP, status=201),
+    Endpoint("trip_update", "patch", "/trips/{trip}/", {"name": "Renamed"}),
+    Endpoint("trip_delete", "delete", "/trips/{trip}/", status=204, after=restore_trip),
+    Endpoint("trip_export_ndjson", "get", "/trips/export/?format=ndjson"),
+    Endpoint("trip_export_csv", "get", "/trips/export/?format=csv"),
+    Endpoint("trip_calendar_url", "get", "/trips/calendar/"),
+    Endpoint("trip_search", "get", "/trips/search/?q=description+12"),
+    Endpoint(
+        "trip_timeline", "get", "/trips/timeline/?start=2023-01-10&end=2023-02-09"
+    ),
+    Endpoint(
+        "trip_import",
+        "post",
+        "/trips/import/",
+        lambda context: {
+            "file": SimpleUploadedFile("trips.csv", IMPORT_CSV.encode("utf-8"))
+        },
+        content_type=None,
+    ),
+    Endpoint("flight_list", "get", "/flights/"),
+    Endpoint("flight_conflicts", "get", "/flights/conflicts/"),
+    Endpoint("flight_detail", "get", "/flights/{flight}/"),
+    Endpoint("flight_create", "post", "/flights/", flight, status=201),
+    Endpoint(
+        "flight_bulk_create",
+        "post",
+        "/flights/bulk/",
+        lambda context: [flight(context)] * 10,
+        status=201,
+    ),
+    Endpoint("calendar_ics", "get", "/calendar/{token}.ics"),
+    Endpoint("async_trip_list", "get", "/async/trips/"),
+    Endpoint("async_trip_detail", "get", "/async/trips/{trip}/"),
+    Endpoint("async_flight_list", "get", "/async/flights/"),
+    Endpoint("async_flight_detail", "get", "/async/flights/{flight}/"),
+]
+
+
+def percentile(latencies: list[float], q: int) -> float:
+    return statistics.quantiles(latencies, n=100, method="inclusive")[q - 1]
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS, ids=lambda endpoint: endpoint.name)
+def test_endpoint(endpoint, dataset, results):
+    """
+    Time ITERATIONS requests to the endpoint as the benchmark user, with a
+    Bearer token verified by the stubbed Firebase SDK.
+
+    The cache is cleared before every request, so the latencies are those of
+    a full render rather than of a cached response. Writes are rolled back
+    after the benchmark, but not between its requests.
+    """
+    user = dataset["user"]
+    context = {
+        "trip": Trip.objects.filter(created_by=user).order_by("id")[0].id,
+        "flight": Flight.objects.filter(created_by=user).order_by("id")[0].id,
+        "token": CalendarFeed.objects.get(created_by=user).token,
+    }
+    client = Client(headers={"Authorization": f"Bearer {user.firebase_uid}"})
+
+    # Warm up imports, connections and the token cache
+    endpoint.request(client, context)
+
+    latencies, queries = [], 0
+    for _ in range(ITERATIONS):
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = endpoint.request(client, context)
+            latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == endpoint.status, response.content[:500]
+        queries = max(queries, len(captured))
+
+    key = f"{dataset['scale']}:{endpoint.name}"
+    regressions = results.add(
+        key,
+        {
+            "iterations": ITERATIONS,
+            "queries": queries,
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "requests_per_second": round(len(latencies) / sum(latencies) * 1000, 1),
+        },
+    )
+    assert not regressions, f"{key} regressed: {'; '.join(regressions)}"
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 """Django's command-line utility for administrative tasks."""
+
 import os
 import sys
 
@@ -7,6 +8,10 @@ import sys
 def main():
     """Run administrative tasks."""
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "travel_stream.settings")
+    if sys.argv[1:2] != ["runserver"]:
+        # Only server processes verify tokens, so don't fetch Firebase's
+        # public keys for one-off commands like migrate or collectstatic
+        os.environ.setdefault("FIREBASE_PUBLIC_KEYS_PREFETCH", "False")
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -13,7 +13,11 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 import environ
 from pathlib import Path
-from .utils import parse_comma_separated_str, parse_name_email_pair_str
+from .utils import (
+    default_session_engine,
+    parse_comma_separated_str,
+    parse_name_email_pair_str,
+)
 
 env = environ.Env(
     # set casting, default value
@@ -58,6 +62,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so the time spent in the other middleware is measured too
+    "apps.core.middleware.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -161,7 +167,21 @@ CSRF_TRUSTED_ORIGINS = env(
     "CSRF_TRUSTED_ORIGINS", cast=parse_comma_separated_str, default=[]
 )
 
-SESSION_ENGINE = "django.contrib.sessions.backends.db"
+# Cache used for sessions and other short-lived data, e.g.
+# locmemcache:// (per process), filecache:///var/tmp/travel_stream_cache
+# (shared by all processes on a single node) or redis://host:6379/0
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+# cached_db reads sessions (and the CSRF token stored in them) from the cache
+# and only falls back to the database on a cache miss. It is the default when
+# the cache is shared by all worker processes, otherwise sessions are read
+# from the database. Use django.contrib.sessions.backends.cache to skip the
+# database entirely, together with a shared cache.
+SESSION_ENGINE = env(
+    "SESSION_ENGINE", default=default_session_engine(CACHES["default"]["BACKEND"])
+)
 SESSION_COOKIE_SECURE = True  # requires HTTPS except on localhost
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = "Lax"
@@ -174,9 +194,61 @@ SERVER_EMAIL = env("SERVER_EMAIL", default="root@localhost")
 # Base64 encoded Firebase service account credentials JSON file
 GOOGLE_APPLICATION_CREDENTIALS = env("GOOGLE_APPLICATION_CREDENTIALS")
 
+# Load the public keys used to verify Firebase ID tokens at startup and refresh
+# them in the background. FIREBASE_PUBLIC_KEYS_FILE seeds them from a local JSON
+# file (key id -> PEM certificate) instead, e.g. for offline tests.
+FIREBASE_PUBLIC_KEYS_PREFETCH = env.bool("FIREBASE_PUBLIC_KEYS_PREFETCH", default=True)
+FIREBASE_PUBLIC_KEYS_FILE = env("FIREBASE_PUBLIC_KEYS_FILE", default=None)
+
+# Maximum number of verified Firebase ID tokens kept in the in-process cache.
+# Set to 0 to disable the cache.
+FIREBASE_TOKEN_CACHE_SIZE = env("FIREBASE_TOKEN_CACHE_SIZE", cast=int, default=1024)
+
+# Minimum number of seconds between writes of a user's last login metadata
+# when their IP address and user agent are unchanged.
+# Set to 0 to write the metadata on every authenticated request.
+LAST_LOGIN_UPDATE_INTERVAL = env("LAST_LOGIN_UPDATE_INTERVAL", cast=int, default=300)
+
 AUTHENTICATION_BACKENDS = ["apps.users.backends.FirebaseAuthenticationBackend"]
 
+# Default and maximum number of items per page of the cursor-paginated
+# list endpoints. Clients can choose a page size with `?page_size=`.
+API_PAGE_SIZE = env("API_PAGE_SIZE", cast=int, default=50)
+API_MAX_PAGE_SIZE = env("API_MAX_PAGE_SIZE", cast=int, default=200)
+
+# Maximum number of items accepted by the bulk creation endpoints
+API_MAX_BULK_SIZE = env("API_MAX_BULK_SIZE", cast=int, default=500)
+
+# Number of seconds serialized trip responses are kept in the cache.
+# Set to 0 to disable the response cache.
+TRIP_RESPONSE_CACHE_TIMEOUT = env("TRIP_RESPONSE_CACHE_TIMEOUT", cast=int, default=300)
+
+# Encode and decode JSON with orjson when it is installed.
+# Set to False to use the standard library json module everywhere.
+FAST_JSON = env.bool("FAST_JSON", default=True)
+
+# Record the wall time, database queries, token verification and serialization
+# time of every request. They are returned in a Server-Timing header and
+# aggregated per view at /metrics/, for the addresses in
+# REQUEST_METRICS_ALLOWED_IPS. Each worker process reports its own requests.
+# When disabled the middleware is not loaded at all.
+REQUEST_METRICS = env.bool("REQUEST_METRICS", default=False)
+REQUEST_METRICS_ALLOWED_IPS = env(
+    "REQUEST_METRICS_ALLOWED_IPS",
+    cast=parse_comma_separated_str,
+    default=["127.0.0.1", "::1"],
+)
+
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "apps.core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "apps.core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "apps.users.authentication.FirebaseAuthentication",
         "rest_framework.authentication.SessionAuthentication",
@@ -204,6 +276,12 @@ LOGGING = {
             "level": os.getenv("DJANGO_LOG_LEVEL", "INFO"),
             "propagate": False,
         },
+        # Logs the Server-Timing of every request at DEBUG level
+        "apps.core.instrumentation": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_METRICS_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
     },
 }
 
@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Generous upper bound so the test is stable on slow CI machines while still
+# catching heavy imports creeping back into startup
+STARTUP_TIME_BUDGET_SECONDS = 5.0
+
+STARTUP_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import django
+imported = time.perf_counter()
+django.setup()
+ready = time.perf_counter()
+
+print(json.dumps({
+    "import_seconds": imported - start,
+    "setup_seconds": ready - imported,
+    "total_seconds": ready - start,
+    "firebase_loaded": "firebase_admin" in sys.modules,
+}))
+"""
+
+
+def measure_startup() -> dict:
+    """Import Django and run django.setup() in a fresh interpreter."""
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "travel_stream.settings",
+        # The production default, which starts the key store
+        "FIREBASE_PUBLIC_KEYS_PREFETCH": "True",
+        "FIREBASE_PUBLIC_KEYS_FILE": "",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=Path(__file__).resolve().parent.parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_startup_does_not_load_firebase():
+    """Test that the Firebase Admin SDK is not imported at startup."""
+    timings = measure_startup()
+
+    assert not timings["firebase_loaded"], "firebase_admin should be loaded lazily"
+
+
+@pytest.mark.benchmark
+def test_startup_time_within_budget():
+    """Benchmark the wall time of importing Django and running django.setup()."""
+    timings = measure_startup()
+    print(
+        f"import: {timings['import_seconds']:.3f}s, "
+        f"setup: {timings['setup_seconds']:.3f}s, "
+        f"total: {timings['total_seconds']:.3f}s"
+    )
+
+    assert timings["total_seconds"] < STARTUP_TIME_BUDGET_SECONDS
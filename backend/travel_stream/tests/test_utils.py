@@ -1,5 +1,9 @@
 import pytest
-from travel_stream.utils import parse_comma_separated_str, parse_name_email_pair_str
+from travel_stream.utils import (
+    default_session_engine,
+    parse_comma_separated_str,
+    parse_name_email_pair_str,
+)
 
 
 @pytest.mark.parametrize(
@@ -116,3 +120,33 @@ def test_parse_name_email_pair_str_invalid(
     else:
         with pytest.raises(ValueError, match=error_message):
             parse_name_email_pair_str(input_str)
+
+
+@pytest.mark.parametrize(
+    "cache_backend,expected",
+    [
+        pytest.param(
+            "django.core.cache.backends.locmem.LocMemCache",
+            "django.contrib.sessions.backends.db",
+            id="per-process cache",
+        ),
+        pytest.param(
+            "django.core.cache.backends.dummy.DummyCache",
+            "django.contrib.sessions.backends.db",
+            id="no cache",
+        ),
+        pytest.param(
+            "django.core.cache.backends.filebased.FileBasedCache",
+            "django.contrib.sessions.backends.cached_db",
+            id="shared file cache",
+        ),
+        pytest.param(
+            "django.core.cache.backends.redis.RedisCache",
+            "django.contrib.sessions.backends.cached_db",
+            id="shared redis cache",
+        ),
+    ],
+)
+def test_default_session_engine(cache_backend: str, expected: str) -> None:
+    """Test that sessions are only cached in caches shared by all workers."""
+    assert default_session_engine(cache_backend) == expected
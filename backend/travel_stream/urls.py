@@ -19,9 +19,10 @@ from django.contrib import admin
 from django.urls import path
 from django.http import JsonResponse
 from rest_framework.routers import DefaultRouter
-from apps.core.views import test_post, get_csrf_token
+from apps.core.views import test_post, get_csrf_token, request_metrics
 from apps.users.views import login_view, logout_view
-from apps.trips.views import TripViewSet, FlightViewSet
+from apps.trips.views import TripViewSet, FlightViewSet, calendar_ics
+from apps.trips.async_views import AsyncTripView, AsyncFlightView
 
 router = DefaultRouter()
 router.register(r"trips", TripViewSet, basename="trip")
@@ -38,6 +39,17 @@ urlpatterns = [
         name="health_check",
     ),
     path("test_post/", test_post, name="test_post"),
+    path("metrics/", request_metrics, name="request_metrics"),
+    path("calendar/<str:token>.ics", calendar_ics, name="calendar-ics"),
+    # ASGI-native read-only endpoints
+    path("async/trips/", AsyncTripView.as_view(), name="async-trip-list"),
+    path("async/trips/<int:pk>/", AsyncTripView.as_view(), name="async-trip-detail"),
+    path("async/flights/", AsyncFlightView.as_view(), name="async-flight-list"),
+    path(
+        "async/flights/<int:pk>/",
+        AsyncFlightView.as_view(),
+        name="async-flight-detail",
+    ),
 ]
 
 urlpatterns += router.urls
@@ -57,3 +57,33 @@ def parse_name_email_pair_str(value: str) -> list[tuple[str, str]]:
         result.append(tuple(parts))
 
     return result
+
+
+# Cache backends whose entries are not shared between worker processes
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def default_session_engine(cache_backend: str) -> str:
+    """
+    Return the session engine to use when SESSION_ENGINE is not set.
+
+    Sessions are only read from the cache when it is shared by all worker
+    processes, otherwise a session flushed or rotated by one worker would
+    still be served from another worker's copy.
+
+    Args:
+        cache_backend: The BACKEND of the default cache
+
+    Returns:
+        The dotted path of the session engine
+
+    Example:
+        >>> default_session_engine("django.core.cache.backends.locmem.LocMemCache")
+        'django.contrib.sessions.backends.db'
+    """
+    if cache_backend in PROCESS_LOCAL_CACHE_BACKENDS:
+        return "django.contrib.sessions.backends.db"
+    return "django.contrib.sessions.backends.cached_db"
@@ -141,7 +141,11 @@ describe("createTrip", () => {
 describe("getTrips", () => {
   it("should send a GET request and return a list of trips on success", async () => {
     const mockTrips = [mockTrip];
-    mockFetchResponse(mockTrips, 200, true);
+    mockFetchResponse(
+      { next: null, previous: null, results: mockTrips },
+      200,
+      true,
+    );
 
     const result = await getTrips(mockFirebaseToken);
 
@@ -154,6 +158,43 @@ describe("getTrips", () => {
     expect(result).toEqual({ data: mockTrips });
   });
 
+  it("should follow the next cursor until all pages are loaded", async () => {
+    const secondTrip: Trip = { ...mockTrip, id: 2 };
+    vi.mocked(fetch)
+      .mockResolvedValueOnce({
+        ok: true,
+        status: 200,
+        json: () => ({
+          next: `${API_BASE_URL}/trips/?cursor=abc`,
+          previous: null,
+          results: [mockTrip],
+        }),
+      } as Response)
+      .mockResolvedValueOnce({
+        ok: true,
+        status: 200,
+        json: () => ({
+          next: null,
+          previous: `${API_BASE_URL}/trips/?cursor=def`,
+          results: [secondTrip],
+        }),
+      } as Response);
+
+    const result = await getTrips(mockFirebaseToken);
+
+    expect(fetch).toHaveBeenCalledTimes(2);
+    expect(fetch).toHaveBeenLastCalledWith(
+      `${API_BASE_URL}/trips/?cursor=abc`,
+      {
+        method: "GET",
+        headers: {
+          Authorization: `Bearer ${mockFirebaseToken}`,
+        },
+      },
+    );
+    expect(result).toEqual({ data: [mockTrip, secondTrip] });
+  });
+
   it("should return an unauthorized error for 401 status", async () => {
     const consoleErrorSpy = vi
       .spyOn(console, "error")
@@ -14,6 +14,12 @@ export interface Trip extends BaseTrip {
   id: number;
 }
 
+export interface Page<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
 export interface ApiResponse<T> {
   data?: T | null;
   error?: {
@@ -103,13 +109,36 @@ export async function createTrip(
   });
 }
 
+/**
+ * Load all of the user's trips by following the cursor-paginated list.
+ */
 export async function getTrips(
   firebaseToken: string,
 ): Promise<ApiResponse<Trip[]>> {
-  return makeRequest<Trip[]>("/trips/", {
-    method: "GET",
-    firebaseToken,
-  });
+  const trips: Trip[] = [];
+  let path: string | null = "/trips/";
+
+  while (path) {
+    const response: ApiResponse<Page<Trip>> = await makeRequest<Page<Trip>>(
+      path,
+      {
+        method: "GET",
+        firebaseToken,
+      },
+    );
+    if (!response.data) {
+      return { error: response.error };
+    }
+
+    trips.push(...response.data.results);
+
+    const next: URL | null = response.data.next
+      ? new URL(response.data.next)
+      : null;
+    path = next ? `${next.pathname}${next.search}` : null;
+  }
+
+  return { data: trips };
 }
 
 export async function getTrip(